@@ -20,6 +20,10 @@ DEFAULT_CFG = {
     "default_value_of_location_offline_attribute": False,
     "default_value_of_location_care_type": "B",
     "default_response_page_size": 10,
+    "default_pagination_mode": "page",
+    "default_search_total": "accurate",
+    "search_total_estimate_ttl": 60,
+    "validate_converted_fhir_objects": False,
     "stu3_fhir_identifier_type_config": {
         "system": "https://hl7.org/fhir/valueset-identifier-type.html",
         "fhir_code_for_imis_db_id_type": "ACSN",
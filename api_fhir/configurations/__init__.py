@@ -3,6 +3,10 @@ import sys
 
 class BaseConfiguration(object):  # pragma: no cover
 
+    # the `ConfigurationSnapshot` built by `ModuleConfiguration.build_configuration()`, kept here so reading it
+    # doesn't need the lookup of the module
+    snapshot = None
+
     @classmethod
     def build_configuration(cls, cfg):
         raise NotImplementedError('`build_configuration()` must be implemented.')
@@ -12,6 +16,10 @@ class BaseConfiguration(object):  # pragma: no cover
         module_name = "api_fhir"
         return sys.modules[module_name]
 
+    @classmethod
+    def get_snapshot(cls):
+        return BaseConfiguration.snapshot
+
 
 class IdentifierConfiguration(BaseConfiguration):  # pragma: no cover
 
@@ -408,5 +416,6 @@ from api_fhir.configurations.stu3ClaimConfig import Stu3ClaimConfig
 from api_fhir.configurations.stu3EligibilityConfiguration import Stu3EligibilityConfiguration
 from api_fhir.configurations.stu3CommunicationRequestConfig import Stu3CommunicationRequestConfig
 from api_fhir.configurations.stu3ApiFhirConfig import Stu3ApiFhirConfig
+from api_fhir.configurations.configurationSnapshot import ConfigurationSnapshot
 from api_fhir.configurations.moduleConfiguration import ModuleConfiguration
 from api_fhir.configurations.stu3CoverageConfig import Stu3CoverageConfig
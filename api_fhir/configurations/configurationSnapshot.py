@@ -0,0 +1,52 @@
+from collections import namedtuple
+
+
+class ConfigurationSnapshot(object):
+    # the values of all the configuration getters read once when the module is configured; every section is an
+    # immutable named tuple with the names of the getters without the `get_` prefix (e.g.
+    # `snapshot.claim.fhir_claim_item_code`), the converters bind the snapshot once instead of calling the getters
+
+    __slots__ = ('general', 'identifier', 'location', 'marital', 'issue_type', 'claim', 'eligibility',
+                 'communication_request', 'coverage')
+
+    __section_types = {}
+
+    def __init__(self, **sections):
+        for name in self.__slots__:
+            object.__setattr__(self, name, sections[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError('The configuration snapshot can\'t be changed, build a new one')
+
+    def __delattr__(self, name):
+        raise AttributeError('The configuration snapshot can\'t be changed, build a new one')
+
+    @classmethod
+    def build(cls, general_configuration, api_fhir_configuration):
+        return cls(
+            general=cls.build_section(general_configuration),
+            identifier=cls.build_section(api_fhir_configuration.get_identifier_configuration()),
+            location=cls.build_section(api_fhir_configuration.get_location_type_configuration()),
+            marital=cls.build_section(api_fhir_configuration.get_marital_type_configuration()),
+            issue_type=cls.build_section(api_fhir_configuration.get_issue_type_configuration()),
+            claim=cls.build_section(api_fhir_configuration.get_claim_configuration()),
+            eligibility=cls.build_section(api_fhir_configuration.get_eligibility_configuration()),
+            communication_request=cls.build_section(api_fhir_configuration.get_communication_request_configuration()),
+            coverage=cls.build_section(api_fhir_configuration.get_coverage_configuration())
+        )
+
+    @classmethod
+    def build_section(cls, configuration):
+        # the getters implemented by the configuration class itself, the base classes only declare them
+        getters = sorted(name for name in vars(configuration) if name.startswith('get_'))
+        section_type = cls.get_section_type(configuration, tuple(getter[len('get_'):] for getter in getters))
+        return section_type(*(getattr(configuration, getter)() for getter in getters))
+
+    @classmethod
+    def get_section_type(cls, configuration, fields):
+        key = (configuration, fields)
+        section_type = cls.__section_types.get(key)
+        if section_type is None:
+            section_type = namedtuple(configuration.__name__ + 'Snapshot', fields)
+            cls.__section_types[key] = section_type
+        return section_type
@@ -13,6 +13,10 @@ class GeneralConfiguration(BaseConfiguration):
         config.default_value_of_location_offline_attribute = cfg['default_value_of_location_offline_attribute']
         config.default_value_of_location_care_type = cfg['default_value_of_location_care_type']
         config.default_response_page_size = cfg['default_response_page_size']
+        config.default_pagination_mode = cfg.get('default_pagination_mode', 'page')
+        config.default_search_total = cfg.get('default_search_total', 'accurate')
+        config.search_total_estimate_ttl = cfg.get('search_total_estimate_ttl', 60)
+        config.validate_converted_fhir_objects = cfg.get('validate_converted_fhir_objects', False)
 
     @classmethod
     def get_default_audit_user_id(cls):
@@ -49,3 +53,19 @@ class GeneralConfiguration(BaseConfiguration):
     @classmethod
     def get_default_response_page_size(cls):
         return cls.get_config().default_response_page_size
+
+    @classmethod
+    def get_default_pagination_mode(cls):
+        return cls.get_config().default_pagination_mode
+
+    @classmethod
+    def get_default_search_total(cls):
+        return cls.get_config().default_search_total
+
+    @classmethod
+    def get_search_total_estimate_ttl(cls):
+        return cls.get_config().search_total_estimate_ttl
+
+    @classmethod
+    def get_validate_converted_fhir_objects(cls):
+        return cls.get_config().validate_converted_fhir_objects
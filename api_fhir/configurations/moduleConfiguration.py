@@ -1,4 +1,4 @@
-from api_fhir.configurations import BaseConfiguration, GeneralConfiguration, Stu3ApiFhirConfig
+from api_fhir.configurations import BaseConfiguration, GeneralConfiguration, Stu3ApiFhirConfig, ConfigurationSnapshot
 from django.conf import settings
 
 
@@ -12,7 +12,19 @@ class ModuleConfiguration(BaseConfiguration):
     def build_configuration(cls, cfg):
         GeneralConfiguration.build_configuration(cfg)
         cls.get_stu3().build_configuration(cfg)
+        cls.build_snapshot()
         cls.configure_api_error_handler()
+        cls.clear_fhir_flyweight_cache()
+
+    @classmethod
+    def build_snapshot(cls):
+        BaseConfiguration.snapshot = ConfigurationSnapshot.build(GeneralConfiguration, cls.get_stu3())
+
+    @classmethod
+    def clear_fhir_flyweight_cache(cls):
+        # the shared concepts are built again from the new configuration on the first use
+        from api_fhir.models import fhir_flyweight_cache
+        fhir_flyweight_cache.clear()
 
     @classmethod
     def get_stu3(cls):
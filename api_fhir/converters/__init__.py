@@ -1,20 +1,145 @@
 from abc import ABC
 
-from api_fhir.configurations import Stu3IdentifierConfig
+from django.db.models import QuerySet, prefetch_related_objects
+
+from api_fhir.configurations import BaseConfiguration
+from api_fhir.converters.codeMap import CodeMap
+from api_fhir.converters.fieldMapping import ConversionPlan, PkMapping, ValueMapping, DateMapping, IdentifierMapping, \
+    IdentifiersMapping, HumanNameMapping, ContactPointsMapping, AddressesMapping, CodeableConceptMapping, MethodMapping
 from api_fhir.exceptions import FHIRRequestProcessException
-from api_fhir.models import CodeableConcept, ContactPoint, Address, Coding, Identifier, IdentifierUse
+from api_fhir.models import CodeableConcept, ContactPoint, Address, Coding, Identifier, IdentifierUse, Meta, \
+    trusted_construction, fhir_flyweight_cache
+
+
+class ConfigurationCache(object):
+    # the objects compiled from the current configuration snapshot (e.g. the code maps or the conversion plans);
+    # an object is compiled again once the module is configured, because a new snapshot is built then
+
+    def __init__(self):
+        self.objects = dict()
+
+    def get(self, key, snapshot, factory):
+        entry = self.objects.get(key)
+        if entry is None or entry[0] is not snapshot:
+            entry = (snapshot, factory())
+            self.objects[key] = entry
+        return entry[1]
+
+    def clear(self):
+        self.objects.clear()
+
+
+configuration_cache = ConfigurationCache()
 
 
 class BaseFHIRConverter(ABC):
 
+    SUBSETTED_SYSTEM = "http://hl7.org/fhir/v3/ObservationValue"
+    SUBSETTED_CODE = "SUBSETTED"
+
     @classmethod
     def to_fhir_obj(cls, obj):
         raise NotImplementedError('`toFhirObj()` must be implemented.')  # pragma: no cover
 
+    @classmethod
+    def to_fhir_objs(cls, imis_objs, elements=None):
+        # converts a whole page of IMIS objects, the relations read by `to_fhir_obj()` are loaded for all of them
+        # at once, so the number of queries doesn't depend on the size of the page
+        imis_objs = cls.load_related_objects(imis_objs, elements)
+        to_fhir_obj = cls.get_elements_converter(elements)
+        return [to_fhir_obj(imis_obj) for imis_obj in imis_objs]
+
+    @classmethod
+    def get_elements_converter(cls, elements=None):
+        # the function converting an IMIS object to the resource restricted to the `_elements`, the converters which
+        # don't declare the elements of their steps convert the whole resources and drop the other elements
+        if elements is None:
+            return cls.to_fhir_obj
+
+        def to_fhir_obj(imis_obj):
+            return cls.build_subsetted_fhir_obj(cls.to_fhir_obj(imis_obj), elements)
+        return to_fhir_obj
+
+    @classmethod
+    def get_summary_elements(cls):
+        # the elements returned for `_summary=true`, `None` if the whole resources are returned
+        return None
+
+    @classmethod
+    def get_elements_fields(cls, elements=None):
+        # the fields of the IMIS model read by the conversion restricted to the `_elements`, `None` if it reads all
+        return None
+
+    @classmethod
+    def load_related_objects(cls, imis_objs, elements=None):
+        select_related = cls.get_select_related_fields()
+        prefetch_related = cls.get_prefetch_related_lookups()
+        fields = cls.get_elements_fields(elements)
+        if fields is not None:
+            # only the relations read by the requested elements are loaded
+            select_related = [lookup for lookup in select_related if cls.is_lookup_read(lookup, fields)]
+            prefetch_related = [lookup for lookup in prefetch_related
+                                if cls.is_lookup_read(getattr(lookup, 'prefetch_through', lookup), fields)]
+        if isinstance(imis_objs, QuerySet):
+            if fields is not None:
+                imis_objs = imis_objs.only(*fields)
+            if select_related:
+                imis_objs = imis_objs.select_related(*select_related)
+            if prefetch_related:
+                imis_objs = imis_objs.prefetch_related(*prefetch_related)
+            return imis_objs
+        imis_objs = list(imis_objs)
+        if select_related or prefetch_related:
+            # the objects of a page are already loaded, the relations already cached on them aren't loaded again
+            prefetch_related_objects(imis_objs, *select_related, *prefetch_related)
+        return imis_objs
+
+    @classmethod
+    def is_lookup_read(cls, lookup, fields):
+        return any(field == lookup or field.startswith(lookup + '__') for field in fields)
+
+    @classmethod
+    def get_select_related_fields(cls):
+        return []
+
+    @classmethod
+    def get_prefetch_related_lookups(cls):
+        return []
+
     @classmethod
     def to_imis_obj(cls, data, audit_user_id):
         raise NotImplementedError('`toImisObj()` must be implemented.')  # pragma: no cover
 
+    @classmethod
+    def trusted_construction(cls):
+        # FHIR objects converted from IMIS objects don't need the validation of every assigned value,
+        # `validate_converted_fhir_objects` can turn it back on to find the converter bugs
+        return trusted_construction(validate=cls.get_configuration().general.validate_converted_fhir_objects)
+
+    @classmethod
+    def get_configuration(cls):
+        # the immutable snapshot of the module configuration, bound once by the builders instead of calling
+        # the getters of the configuration classes for every value
+        return BaseConfiguration.get_snapshot()
+
+    @classmethod
+    def get_code_map(cls, name, factory):
+        # the `CodeMap` compiled by `factory()` from the current configuration
+        return configuration_cache.get((cls.__name__, name), cls.get_configuration(), factory)
+
+    @classmethod
+    def get_conversion_plan(cls):
+        # the `ConversionPlan` of the converters which map the fields declaratively
+        raise NotImplementedError('`get_conversion_plan()` must be implemented.')  # pragma: no cover
+
+    @classmethod
+    def get_compiled_conversion_plan(cls, elements=None):
+        # one plan is compiled for the whole resources and one for every set of the converted `_elements`
+        if elements is not None:
+            elements = cls.get_conversion_plan().get_elements(elements)
+        return configuration_cache.get((cls.__name__, 'conversion_plan', elements), cls.get_configuration(),
+                                       lambda: cls.get_conversion_plan().compile(cls, elements))
+
     @classmethod
     def build_fhir_pk(cls, fhir_obj, resource_id):
         fhir_obj.id = resource_id
@@ -51,6 +176,31 @@ class BaseFHIRConverter(ABC):
         codeable_concept.text = text
         return codeable_concept
 
+    @classmethod
+    def build_constant_simple_codeable_concept(cls, text):
+        return cls.build_constant_codeable_concept(None, None, text)
+
+    @classmethod
+    def build_constant_codeable_concept(cls, code, system=None, text=None):
+        # the concepts built from the configuration values are equal for every converted object, so they are built
+        # once and shared as frozen instances
+        return fhir_flyweight_cache.get((CodeableConcept.__name__, code, system, text),
+                                        lambda: cls.build_codeable_concept(code, system, text))
+
+    @classmethod
+    def build_subsetted_meta(cls):
+        # the `meta` of the resources restricted to the requested elements
+        return fhir_flyweight_cache.get((Meta.__name__, cls.SUBSETTED_CODE), lambda: Meta(tag=[
+            Coding(system=cls.SUBSETTED_SYSTEM, code=cls.SUBSETTED_CODE)]))
+
+    @classmethod
+    def build_subsetted_fhir_obj(cls, fhir_obj, elements):
+        values = fhir_obj._values
+        for name in [name for name in values if name != 'id' and name not in elements]:
+            del values[name]
+        fhir_obj.meta = cls.build_subsetted_meta()
+        return fhir_obj
+
     @classmethod
     def get_first_coding_from_codeable_concept(cls, codeable_concept):
         result = Coding()
@@ -63,16 +213,17 @@ class BaseFHIRConverter(ABC):
     @classmethod
     def build_fhir_uuid_identifier(cls, identifiers, imis_object):
         if imis_object.uuid is not None:
+            identifier_config = cls.get_configuration().identifier
             identifier = cls.build_fhir_identifier(imis_object.uuid,
-                                                   Stu3IdentifierConfig.get_fhir_identifier_type_system(),
-                                                   Stu3IdentifierConfig.get_fhir_uuid_type_code())
+                                                   identifier_config.fhir_identifier_type_system,
+                                                   identifier_config.fhir_uuid_type_code)
             identifiers.append(identifier)
 
     @classmethod
     def build_fhir_identifier(cls, value, type_system, type_code):
         identifier = Identifier()
         identifier.use = IdentifierUse.USUAL.value
-        type = cls.build_codeable_concept(type_code, type_system)
+        type = cls.build_constant_codeable_concept(type_code, type_system)
         identifier.type = type
         identifier.value = value
         return identifier
@@ -80,9 +231,10 @@ class BaseFHIRConverter(ABC):
     @classmethod
     def get_fhir_identifier_by_code(cls, identifiers, lookup_code):
         value = None
+        type_system = cls.get_configuration().identifier.fhir_identifier_type_system
         for identifier in identifiers or []:
             first_coding = cls.get_first_coding_from_codeable_concept(identifier.type)
-            if first_coding.system == Stu3IdentifierConfig.get_fhir_identifier_type_system() \
+            if first_coding.system == type_system \
                     and first_coding.code == lookup_code:
                     value = identifier.value
                     break
@@ -117,3 +269,4 @@ from api_fhir.converters.eligibilityRequestConverter import EligibilityRequestCo
 from api_fhir.converters.policyEligibilityRequestConverter import PolicyEligibilityRequestConverter
 from api_fhir.converters.communicationRequestConverter import CommunicationRequestConverter
 from api_fhir.converters.claimResponseConverter import ClaimResponseConverter
+from api_fhir.converters.searchInclude import SearchInclude
@@ -1,14 +1,25 @@
 from claim import ClaimItemSubmit, ClaimServiceSubmit
 from claim.models import Claim, ClaimItem, ClaimService
 from medical.models import Diagnosis
+from django.db.models import Prefetch, prefetch_related_objects
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils.translation import gettext
 
-from api_fhir.configurations import Stu3IdentifierConfig, Stu3ClaimConfig
 from api_fhir.converters import BaseFHIRConverter, LocationConverter, PatientConverter, PractitionerConverter, \
     ReferenceConverterMixin
 from api_fhir.models import Claim as FHIRClaim, ClaimItem as FHIRClaimItem, Period, ClaimDiagnosis, Money, \
     ImisClaimIcdTypes, ClaimInformation, Quantity
-from api_fhir.utils import TimeUtils, FhirUtils, DbManagerUtils
+from api_fhir.utils import TimeUtils, FhirUtils, ModelLookupCache
+
+diagnosis_by_code_cache = ModelLookupCache('diagnosis_by_code', Diagnosis, 'code')
+diagnosis_by_id_cache = ModelLookupCache('diagnosis_by_id', Diagnosis, 'pk')
+
+
+@receiver([post_save, post_delete], sender=Diagnosis)
+def invalidate_diagnosis_caches(sender, **kwargs):
+    diagnosis_by_code_cache.invalidate()
+    diagnosis_by_id_cache.invalidate()
 
 
 class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
@@ -30,6 +41,21 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
         cls.build_fhir_items(fhir_claim, imis_claim)
         return fhir_claim
 
+    @classmethod
+    def get_summary_elements(cls):
+        return frozenset(['identifier', 'status', 'type', 'use', 'patient', 'billablePeriod', 'created',
+                          'enterer', 'insurer', 'provider', 'organization', 'priority', 'facility', 'total'])
+
+    @classmethod
+    def get_select_related_fields(cls):
+        return ['health_facility', 'insuree', 'admin', 'icd']
+
+    @classmethod
+    def get_prefetch_related_lookups(cls):
+        return [Prefetch('items', queryset=ClaimItem.objects.select_related('item'), to_attr='fhir_claim_items'),
+                Prefetch('services', queryset=ClaimService.objects.select_related('service'),
+                         to_attr='fhir_claim_services')]
+
     @classmethod
     def to_imis_obj(cls, fhir_claim, audit_user_id):
         errors = []
@@ -57,9 +83,12 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
         return FHIRClaim
 
     @classmethod
-    def get_imis_obj_by_fhir_reference(cls, reference, errors=None):
-        imis_claim_code = cls.get_resource_id_from_reference(reference)
-        return DbManagerUtils.get_object_or_none(Claim, code=imis_claim_code)
+    def get_reference_imis_model(cls):
+        return Claim
+
+    @classmethod
+    def get_reference_imis_field(cls):
+        return 'code'
 
     @classmethod
     def build_imis_date_claimed(cls, imis_claim, fhir_claim, errors):
@@ -71,15 +100,17 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
     def build_fhir_identifiers(cls, fhir_claim, imis_claim):
         identifiers = []
         cls.build_fhir_uuid_identifier(identifiers, imis_claim)
+        identifier_config = cls.get_configuration().identifier
         claim_code = cls.build_fhir_identifier(imis_claim.code,
-                                               Stu3IdentifierConfig.get_fhir_identifier_type_system(),
-                                               Stu3IdentifierConfig.get_fhir_claim_code_type())
+                                               identifier_config.fhir_identifier_type_system,
+                                               identifier_config.fhir_claim_code_type)
         identifiers.append(claim_code)
         fhir_claim.identifier = identifiers
 
     @classmethod
     def build_imis_identifier(cls, imis_claim, fhir_claim, errors):
-        value = cls.get_fhir_identifier_by_code(fhir_claim.identifier, Stu3IdentifierConfig.get_fhir_claim_code_type())
+        value = cls.get_fhir_identifier_by_code(fhir_claim.identifier,
+                                                cls.get_configuration().identifier.fhir_claim_code_type)
         if value:
             imis_claim.code = value
         cls.valid_condition(imis_claim.code is None, gettext('Missing the claim code'), errors)
@@ -140,7 +171,7 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
         claim_diagnosis = ClaimDiagnosis()
         claim_diagnosis.sequence = FhirUtils.get_next_array_sequential_id(diagnoses)
         claim_diagnosis.diagnosisCodeableConcept = cls.build_codeable_concept(icd_code, None)
-        claim_diagnosis.type = [cls.build_simple_codeable_concept(icd_type)]
+        claim_diagnosis.type = [cls.build_constant_simple_codeable_concept(icd_type)]
         diagnoses.append(claim_diagnosis)
 
     @classmethod
@@ -181,13 +212,13 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def get_claim_diagnosis_by_code(cls, icd_code):
-        return Diagnosis.objects.get(code=icd_code)
+        return diagnosis_by_code_cache.get(icd_code)
 
     @classmethod
     def get_claim_diagnosis_code_by_id(cls, diagnosis_id):
         code = None
         if diagnosis_id is not None:
-            diagnosis = DbManagerUtils.get_object_or_none(Diagnosis, pk=diagnosis_id)
+            diagnosis = diagnosis_by_id_cache.get(diagnosis_id)
             if diagnosis:
                 code = diagnosis.code
         return code
@@ -241,19 +272,21 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def build_fhir_information(cls, fhir_claim, imis_claim):
-        guarantee_id_code = Stu3ClaimConfig.get_fhir_claim_information_guarantee_id_code()
-        cls.build_fhir_string_information(fhir_claim.information, guarantee_id_code, imis_claim.guarantee_id)
-        explanation_code = Stu3ClaimConfig.get_fhir_claim_information_explanation_code()
-        cls.build_fhir_string_information(fhir_claim.information, explanation_code, imis_claim.explanation)
+        claim_config = cls.get_configuration().claim
+        cls.build_fhir_string_information(fhir_claim.information, claim_config.fhir_claim_information_guarantee_id_code,
+                                          imis_claim.guarantee_id)
+        cls.build_fhir_string_information(fhir_claim.information, claim_config.fhir_claim_information_explanation_code,
+                                          imis_claim.explanation)
 
     @classmethod
     def build_imis_information(cls, imis_claim, fhir_claim):
         if fhir_claim.information:
+            claim_config = cls.get_configuration().claim
             for information in fhir_claim.information:
                 category = information.category
-                if category and category.text == Stu3ClaimConfig.get_fhir_claim_information_guarantee_id_code():
+                if category and category.text == claim_config.fhir_claim_information_guarantee_id_code:
                     imis_claim.guarantee_id = information.valueString
-                elif category and category.text == Stu3ClaimConfig.get_fhir_claim_information_explanation_code():
+                elif category and category.text == claim_config.fhir_claim_information_explanation_code:
                     imis_claim.explanation = information.valueString
 
     @classmethod
@@ -262,7 +295,7 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
         if value_string:
             information_concept = ClaimInformation()
             information_concept.sequence = FhirUtils.get_next_array_sequential_id(claim_information)
-            information_concept.category = cls.build_simple_codeable_concept(code)
+            information_concept.category = cls.build_constant_simple_codeable_concept(code)
             information_concept.valueString = value_string
             claim_information.append(information_concept)
             result = information_concept
@@ -275,16 +308,16 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def build_items_for_imis_item(cls, fhir_claim, imis_claim):
+        type = cls.get_configuration().claim.fhir_claim_item_code
         for item in cls.get_imis_items_for_claim(imis_claim):
             if item.item:
-                type = Stu3ClaimConfig.get_fhir_claim_item_code()
                 cls.build_fhir_item(fhir_claim, item.item.code, type, item)
 
     @classmethod
     def build_items_for_imis_services(cls, fhir_claim, imis_claim):
+        type = cls.get_configuration().claim.fhir_claim_service_code
         for service in cls.get_imis_services_for_claim(imis_claim):
             if service.service:
-                type = Stu3ClaimConfig.get_fhir_claim_service_code()
                 cls.build_fhir_item(fhir_claim, service.service.code, type, service)
 
     @classmethod
@@ -298,8 +331,8 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
         fhir_quantity.value = item.qty_provided
         fhir_item.quantity = fhir_quantity
         fhir_item.service = cls.build_simple_codeable_concept(code)
-        fhir_item.category = cls.build_simple_codeable_concept(item_type)
-        item_explanation_code = Stu3ClaimConfig.get_fhir_claim_item_explanation_code()
+        fhir_item.category = cls.build_constant_simple_codeable_concept(item_type)
+        item_explanation_code = cls.get_configuration().claim.fhir_claim_item_explanation_code
         information = cls.build_fhir_string_information(fhir_claim.information, item_explanation_code, item.explanation)
         if information:
             fhir_item.informationLinkId = [information.sequence]
@@ -309,14 +342,20 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
     def get_imis_items_for_claim(cls, imis_claim):
         items = []
         if imis_claim and imis_claim.id:
-            items = ClaimItem.objects.filter(claim_id=imis_claim.id)
+            items = getattr(imis_claim, 'fhir_claim_items', None)
+            if items is None:
+                items = list(ClaimItem.objects.filter(claim_id=imis_claim.id))
+                prefetch_related_objects(items, 'item')
         return items
 
     @classmethod
     def get_imis_services_for_claim(cls, imis_claim):
         services = []
         if imis_claim and imis_claim.id:
-            services = ClaimService.objects.filter(claim_id=imis_claim.id)
+            services = getattr(imis_claim, 'fhir_claim_services', None)
+            if services is None:
+                services = list(ClaimService.objects.filter(claim_id=imis_claim.id))
+                prefetch_related_objects(services, 'service')
         return services
 
     @classmethod
@@ -324,11 +363,12 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
         imis_items = []
         imis_services = []
         if fhir_claim.item:
+            claim_config = cls.get_configuration().claim
             for item in fhir_claim.item:
                 if item.category:
-                    if item.category.text == Stu3ClaimConfig.get_fhir_claim_item_code():
+                    if item.category.text == claim_config.fhir_claim_item_code:
                         cls.build_imis_submit_item(imis_items, item)
-                    elif item.category.text == Stu3ClaimConfig.get_fhir_claim_service_code():
+                    elif item.category.text == claim_config.fhir_claim_service_code:
                         cls.build_imis_submit_service(imis_services, item)
         # added additional attributes which will be used to create ClaimRequest in serializer
         imis_claim.submit_items = imis_items
@@ -1,12 +1,8 @@
-from claim.models import Feedback, ClaimItem, ClaimService
-from django.db.models import Subquery
-from medical.models import Item, Service
+from claim.models import Feedback
 
-from api_fhir.configurations import Stu3ClaimConfig
-from api_fhir.converters import BaseFHIRConverter, CommunicationRequestConverter
+from api_fhir.converters import BaseFHIRConverter, CommunicationRequestConverter, CodeMap
 from api_fhir.converters.claimConverter import ClaimConverter
-from api_fhir.exceptions import FHIRRequestProcessException
-from api_fhir.models import ClaimResponse, Money, ClaimResponsePayment, ClaimResponseError, ClaimResponseItem, Claim, \
+from api_fhir.models import ClaimResponse, Money, ClaimResponsePayment, ClaimResponseError, ClaimResponseItem, \
     ClaimResponseItemAdjudication, ClaimResponseProcessNote, ClaimResponseAddItem
 from api_fhir.utils import TimeUtils, FhirUtils
 
@@ -28,27 +24,43 @@ class ClaimResponseConverter(BaseFHIRConverter):
         cls.build_fhir_items(fhir_claim_response, imis_claim)
         return fhir_claim_response
 
+    @classmethod
+    def get_summary_elements(cls):
+        return frozenset(['identifier', 'status', 'patient', 'created', 'insurer', 'requestProvider',
+                          'requestOrganization', 'request', 'outcome', 'disposition', 'totalCost',
+                          'totalBenefit', 'payment'])
+
+    @classmethod
+    def get_prefetch_related_lookups(cls):
+        return ClaimConverter.get_prefetch_related_lookups()
+
     @classmethod
     def build_fhir_outcome(cls, fhir_claim_response, imis_claim):
         code = imis_claim.status
         if code is not None:
-            display = cls.get_status_display_by_code(code)
-            fhir_claim_response.outcome = cls.build_codeable_concept(str(code), system=None, text=display)
+            outcome = cls.get_claim_status_map().get_fhir_value(code)
+            if outcome is None:
+                outcome = cls.build_constant_codeable_concept(str(code), system=None, text=None)
+            fhir_claim_response.outcome = outcome
 
     @classmethod
     def get_status_display_by_code(cls, code):
-        display = None
-        if code == 1:
-            display = Stu3ClaimConfig.get_fhir_claim_status_rejected_code()
-        elif code == 2:
-            display = Stu3ClaimConfig.get_fhir_claim_status_entered_code()
-        elif code == 4:
-            display = Stu3ClaimConfig.get_fhir_claim_status_checked_code()
-        elif code == 8:
-            display = Stu3ClaimConfig.get_fhir_claim_status_processed_code()
-        elif code == 16:
-            display = Stu3ClaimConfig.get_fhir_claim_status_valuated_code()
-        return display
+        return cls.get_claim_status_map().get_fhir_code(code)
+
+    @classmethod
+    def get_claim_status_map(cls):
+        return cls.get_code_map('claim_status', cls.build_claim_status_map)
+
+    @classmethod
+    def build_claim_status_map(cls):
+        claim_config = cls.get_configuration().claim
+        return CodeMap([(1, claim_config.fhir_claim_status_rejected_code),
+                        (2, claim_config.fhir_claim_status_entered_code),
+                        (4, claim_config.fhir_claim_status_checked_code),
+                        (8, claim_config.fhir_claim_status_processed_code),
+                        (16, claim_config.fhir_claim_status_valuated_code)],
+                       None, lambda imis_code, fhir_code: cls.build_constant_codeable_concept(str(imis_code),
+                                                                                            text=fhir_code))
 
     @classmethod
     def build_fhir_payment(cls, fhir_claim_response, imis_claim):
@@ -90,57 +102,35 @@ class ClaimResponseConverter(BaseFHIRConverter):
 
     @classmethod
     def build_fhir_items(cls, fhir_claim_response, imis_claim):
-        for claim_item in cls.generate_fhir_claim_items(imis_claim):
-            type = claim_item.category.text
-            code = claim_item.service.text
-
-            if type == Stu3ClaimConfig.get_fhir_claim_item_code():
-                serviced = cls.get_imis_claim_item_by_code(code, imis_claim.id)
-            elif  type == Stu3ClaimConfig.get_fhir_claim_service_code():
-                serviced = cls.get_service_claim_item_by_code(code, imis_claim.id)
-            else:
-                raise FHIRRequestProcessException(['Could not assign category {} for claim_item: {}'
-                                                  .format(type, claim_item)])
-
-            cls._build_response_items(fhir_claim_response, claim_item, serviced, serviced.rejection_reason)
-
-    @classmethod
-    def _build_response_items(cls, fhir_claim_response, claim_item, imis_service, rejected_reason):
-        cls.build_fhir_item(fhir_claim_response, claim_item, imis_service,
-                            rejected_reason=rejected_reason)
-        cls.build_fhir_claim_add_item(fhir_claim_response, claim_item)
-
-    @classmethod
-    def generate_fhir_claim_items(cls, imis_claim):
-        claim = Claim()
-        ClaimConverter.build_fhir_items(claim, imis_claim)
-        return claim.item
-
-    @classmethod
-    def get_imis_claim_item_by_code(cls, code, imis_claim_id):
-        item_code_qs = Item.objects.filter(code=code)
-        result = ClaimItem.objects.filter(item_id__in=Subquery(item_code_qs.values('id')), claim_id=imis_claim_id)
-        return result[0] if len(result) > 0 else None
-
-    @classmethod
-    def build_fhir_claim_add_item(cls, fhir_claim_response, claim_item):
+        # the claim items and services are loaded once with their catalogue codes and the response items are built
+        # straight from them, numbered like the items of the FHIR `Claim`
+        sequence = 0
+        for imis_item in ClaimConverter.get_imis_items_for_claim(imis_claim):
+            if imis_item.item:
+                sequence += 1
+                cls._build_response_items(fhir_claim_response, sequence, imis_item.item.code, imis_item)
+        for imis_service in ClaimConverter.get_imis_services_for_claim(imis_claim):
+            if imis_service.service:
+                sequence += 1
+                cls._build_response_items(fhir_claim_response, sequence, imis_service.service.code, imis_service)
+
+    @classmethod
+    def _build_response_items(cls, fhir_claim_response, sequence, code, imis_service):
+        cls.build_fhir_item(fhir_claim_response, sequence, imis_service,
+                            rejected_reason=imis_service.rejection_reason)
+        cls.build_fhir_claim_add_item(fhir_claim_response, sequence, code)
+
+    @classmethod
+    def build_fhir_claim_add_item(cls, fhir_claim_response, sequence, item_code):
         add_item = ClaimResponseAddItem()
-        item_code = claim_item.service.text
-        add_item.sequenceLinkId.append(claim_item.sequence)
+        add_item.sequenceLinkId.append(sequence)
         add_item.service = cls.build_codeable_concept(code=item_code)
         fhir_claim_response.addItem.append(add_item)
 
     @classmethod
-    def get_service_claim_item_by_code(cls, code, imis_claim_id):
-        service_code_qs = Service.objects.filter(code=code)
-        result = ClaimService.objects.filter(service_id__in=Subquery(service_code_qs.values('id')),
-                                             claim_id=imis_claim_id)
-        return result[0] if len(result) > 0 else None
-
-    @classmethod
-    def build_fhir_item(cls, fhir_claim_response, claim_item, item, rejected_reason=None):
+    def build_fhir_item(cls, fhir_claim_response, sequence, item, rejected_reason=None):
         claim_response_item = ClaimResponseItem()
-        claim_response_item.sequenceLinkId = claim_item.sequence
+        claim_response_item.sequenceLinkId = sequence
         cls.build_fhir_item_general_adjudication(claim_response_item, item)
         if rejected_reason:
             cls.build_fhir_item_rejected_reason_adjudication(claim_response_item, rejected_reason)
@@ -152,8 +142,8 @@ class ClaimResponseConverter(BaseFHIRConverter):
     @classmethod
     def build_fhir_item_general_adjudication(cls, claim_response_item, item):
         item_adjudication = ClaimResponseItemAdjudication()
-        item_adjudication.category = \
-            cls.build_simple_codeable_concept(Stu3ClaimConfig.get_fhir_claim_item_general_adjudication_code())
+        item_adjudication.category = cls.build_constant_simple_codeable_concept(
+            cls.get_configuration().claim.fhir_claim_item_general_adjudication_code)
         item_adjudication.reason = cls.build_fhir_adjudication_reason(item)
         item_adjudication.value = item.qty_approved
         limitation_value = Money()
@@ -164,20 +154,30 @@ class ClaimResponseConverter(BaseFHIRConverter):
     @classmethod
     def build_fhir_item_rejected_reason_adjudication(cls, claim_response_item, rejection_reason):
         item_adjudication = ClaimResponseItemAdjudication()
-        item_adjudication.category = \
-            cls.build_simple_codeable_concept(Stu3ClaimConfig.get_fhir_claim_item_rejected_reason_adjudication_code())
+        item_adjudication.category = cls.build_constant_simple_codeable_concept(
+            cls.get_configuration().claim.fhir_claim_item_rejected_reason_adjudication_code)
         item_adjudication.reason = cls.build_codeable_concept(rejection_reason)
         claim_response_item.adjudication.append(item_adjudication)
 
     @classmethod
     def build_fhir_adjudication_reason(cls, item):
         status = item.status
-        text_code = None
-        if status == 1:
-            text_code = Stu3ClaimConfig.get_fhir_claim_item_status_passed_code()
-        elif status == 2:
-            text_code = Stu3ClaimConfig.get_fhir_claim_item_status_rejected_code()
-        return cls.build_codeable_concept(status, text=text_code)
+        reason = cls.get_claim_item_status_map().get_fhir_value(status)
+        if reason is None:
+            reason = cls.build_constant_codeable_concept(status, text=None)
+        return reason
+
+    @classmethod
+    def get_claim_item_status_map(cls):
+        return cls.get_code_map('claim_item_status', cls.build_claim_item_status_map)
+
+    @classmethod
+    def build_claim_item_status_map(cls):
+        claim_config = cls.get_configuration().claim
+        return CodeMap([(1, claim_config.fhir_claim_item_status_passed_code),
+                        (2, claim_config.fhir_claim_item_status_rejected_code)],
+                       None, lambda imis_code, fhir_code: cls.build_constant_codeable_concept(imis_code,
+                                                                                            text=fhir_code))
 
     @classmethod
     def build_process_note(cls, fhir_claim_response, string_value):
@@ -0,0 +1,37 @@
+class CodeMap(object):
+    # a bidirectional mapping of the IMIS codes and the FHIR codes compiled once from the configuration; every entry
+    # holds its prebuilt FHIR value too (e.g. the frozen `CodeableConcept`), so mapping a field is one dictionary
+    # lookup; when a code is repeated the first pair wins, like in the `if`/`elif` chains the maps replace
+
+    __slots__ = ('system', 'fhir_codes', 'fhir_values', 'imis_codes')
+
+    def __init__(self, codes, system=None, fhir_value_builder=None):
+        # `codes` are the pairs of the IMIS code and the FHIR code, `fhir_value_builder(imis_code, fhir_code)` builds
+        # the FHIR value of a pair
+        self.system = system
+        self.fhir_codes = {}
+        self.fhir_values = {}
+        self.imis_codes = {}
+        for imis_code, fhir_code in codes:
+            if imis_code not in self.fhir_codes:
+                self.fhir_codes[imis_code] = fhir_code
+                if fhir_value_builder:
+                    self.fhir_values[imis_code] = fhir_value_builder(imis_code, fhir_code)
+            self.imis_codes.setdefault(fhir_code, imis_code)
+
+    def get_fhir_code(self, imis_code, default=None):
+        return self.fhir_codes.get(imis_code, default)
+
+    def get_fhir_value(self, imis_code, default=None):
+        return self.fhir_values.get(imis_code, default)
+
+    def get_imis_code(self, fhir_code, default=None):
+        return self.imis_codes.get(fhir_code, default)
+
+    def get_imis_code_from_codings(self, codings):
+        # the code of the last coding of the system of the map which is mapped
+        imis_code = None
+        for coding in codings or []:
+            if coding.system == self.system and coding.code in self.imis_codes:
+                imis_code = self.imis_codes[coding.code]
+        return imis_code
@@ -3,7 +3,6 @@ from claim.models import Feedback
 from api_fhir.configurations import Stu3CommunicationRequestConfig as Config
 from api_fhir.converters import BaseFHIRConverter, ReferenceConverterMixin
 from api_fhir.models import CommunicationRequest, RequestStatus
-from api_fhir.utils import DbManagerUtils
 
 
 class CommunicationRequestConverter(BaseFHIRConverter, ReferenceConverterMixin):
@@ -18,6 +17,12 @@ class CommunicationRequestConverter(BaseFHIRConverter, ReferenceConverterMixin):
         cls.build_fhir_reason_codes(fhir_communication_request, imis_feedback)
         return fhir_communication_request
 
+    @classmethod
+    def get_summary_elements(cls):
+        return frozenset(['identifier', 'basedOn', 'replaces', 'groupIdentifier', 'status',
+                          'priority', 'subject', 'recipient', 'topic', 'context', 'occurrenceDateTime',
+                          'authoredOn', 'sender', 'requester'])
+
     @classmethod
     def get_reference_obj_id(cls, imis_feedback):
         return imis_feedback.uuid
@@ -27,9 +32,12 @@ class CommunicationRequestConverter(BaseFHIRConverter, ReferenceConverterMixin):
         return CommunicationRequest
 
     @classmethod
-    def get_imis_obj_by_fhir_reference(cls, reference, errors=None):
-        imis_feedback_id = cls.get_resource_id_from_reference(reference)
-        return DbManagerUtils.get_object_or_none(Feedback, pk=imis_feedback_id)
+    def get_reference_imis_model(cls):
+        return Feedback
+
+    @classmethod
+    def get_reference_imis_field(cls):
+        return 'pk'
 
     @classmethod
     def build_fhir_occurrence_datetime(cls, fhir_communication_request, imis_feedback):
@@ -1,8 +1,112 @@
+import threading
+from collections import defaultdict, OrderedDict
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from medical.models import Item, Service
+from product.models import Product, ProductItem, ProductService
+
 from api_fhir.configurations import Stu3CoverageConfig
 from api_fhir.converters import BaseFHIRConverter, PractitionerConverter
 from api_fhir.models import Coverage, Reference, Period, Contract, ContractValuedItem, Money, CoverageGrouping, \
     ContractAgent, Extension
-from product.models import ProductItem, ProductService
+
+
+class ProductCoverageCache(object):
+    # the codes of the items and services covered by the products, shared by all the policies of a product; the
+    # entries are keyed by the product id and validity, kept up to `max_size` (the least recently used one is dropped
+    # first) and dropped by the signals of the product models; `post_save` and `post_delete` aren't sent by the
+    # queryset `update()` and the bulk writes, so the entries can be stale after those until `clear()` is called
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.coverages = OrderedDict()
+        self.version = 0
+        self.lock = threading.Lock()
+
+    def get(self, product):
+        key = self.get_key(product)
+        with self.lock:
+            coverage = self.coverages.get(key)
+            if coverage is not None:
+                self.coverages.move_to_end(key)
+                return coverage
+        return self.load([product])[key]
+
+    def load(self, products):
+        # the coverages missing for any number of products are loaded with one query for the items and one for
+        # the services; returns the coverages of all the products by their keys
+        coverages = {}
+        missing = {}
+        with self.lock:
+            for product in products:
+                key = self.get_key(product)
+                coverage = self.coverages.get(key)
+                if coverage is not None:
+                    self.coverages.move_to_end(key)
+                    coverages[key] = coverage
+                else:
+                    missing.setdefault(product.id, []).append(product)
+            version = self.version
+        if missing:
+            item_codes = self.get_codes(ProductItem.objects, 'item__code', missing)
+            service_codes = self.get_codes(ProductService.objects, 'service__code', missing)
+            for product_id, product_versions in missing.items():
+                coverage = (item_codes.get(product_id, []), service_codes.get(product_id, []))
+                for product in product_versions:
+                    coverages[self.get_key(product)] = coverage
+            with self.lock:
+                # the coverages loaded before an invalidation could be stale already
+                if version == self.version:
+                    for product_versions in missing.values():
+                        for product in product_versions:
+                            key = self.get_key(product)
+                            self.coverages[key] = coverages[key]
+                    while len(self.coverages) > self.max_size:
+                        self.coverages.popitem(last=False)
+        return coverages
+
+    def get_codes(self, manager, code_field, product_ids):
+        codes = defaultdict(list)
+        rows = manager.filter(product_id__in=list(product_ids)).order_by('id').values_list('product_id', code_field)
+        for product_id, code in rows:
+            codes[product_id].append(code)
+        return codes
+
+    def get_key(self, product):
+        return product.id, product.validity_from, product.validity_to
+
+    def invalidate(self, product_id):
+        with self.lock:
+            for key in [key for key in self.coverages if key[0] == product_id]:
+                del self.coverages[key]
+            self.version += 1
+
+    def clear(self):
+        with self.lock:
+            self.coverages.clear()
+            self.version += 1
+
+
+product_coverage_cache = ProductCoverageCache()
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_coverage(sender, instance, **kwargs):
+    product_coverage_cache.invalidate(instance.id)
+
+
+@receiver([post_save, post_delete], sender=ProductItem)
+@receiver([post_save, post_delete], sender=ProductService)
+def invalidate_product_coverage_of_detail(sender, instance, **kwargs):
+    product_coverage_cache.invalidate(instance.product_id)
+
+
+@receiver([post_save, post_delete], sender=Item)
+@receiver([post_save, post_delete], sender=Service)
+def clear_product_coverages(sender, **kwargs):
+    # the codes of any product could change
+    product_coverage_cache.clear()
 
 
 class CoverageConventer(BaseFHIRConverter):
@@ -19,6 +123,23 @@ class CoverageConventer(BaseFHIRConverter):
         cls.build_coverage_extension(fhir_coverage, imis_policy)
         return fhir_coverage
 
+    @classmethod
+    def get_summary_elements(cls):
+        return frozenset(['identifier', 'status', 'type', 'policyHolder', 'subscriber', 'subscriberId',
+                          'beneficiary', 'relationship', 'period', 'payor', 'grouping', 'dependent', 'sequence',
+                          'order', 'network', 'contract'])
+
+    @classmethod
+    def to_fhir_objs(cls, imis_policies, elements=None):
+        imis_policies = cls.load_related_objects(imis_policies, elements)
+        product_coverage_cache.load([imis_policy.product for imis_policy in imis_policies])
+        to_fhir_obj = cls.get_elements_converter(elements)
+        return [to_fhir_obj(imis_policy) for imis_policy in imis_policies]
+
+    @classmethod
+    def get_select_related_fields(cls):
+        return ['family', 'product', 'officer']
+
     @classmethod
     def build_coverage_identifier(cls, fhir_coverage, imis_policy):
         identifiers = []
@@ -71,7 +192,7 @@ class CoverageConventer(BaseFHIRConverter):
         agent = ContractAgent()
         actor = PractitionerConverter.build_fhir_resource_reference(imis_coverage.officer)
         agent.actor = actor
-        provider_role = cls.build_simple_codeable_concept(Stu3CoverageConfig.get_practitioner_role_code())
+        provider_role = cls.build_constant_simple_codeable_concept(Stu3CoverageConfig.get_practitioner_role_code())
         agent.role = [provider_role]
         contract.agent = [agent]
 
@@ -125,10 +246,9 @@ class CoverageConventer(BaseFHIRConverter):
         product_coverage = {}
         service_code = Stu3CoverageConfig.get_service_code()
         item_code = Stu3CoverageConfig.get_item_code()
-        product_items = ProductItem.objects.filter(product=product).all()
-        product_services = ProductService.objects.filter(product=product).all()
+        item_codes, service_codes = product_coverage_cache.get(product)
 
-        product_coverage[item_code] = [item.item.code for item in product_items]
-        product_coverage[service_code] = [service.service.code for service in product_services]
+        product_coverage[item_code] = list(item_codes)
+        product_coverage[service_code] = list(service_codes)
         grouping.plan = product.name
         grouping.planDisplay = str(product_coverage)
@@ -68,7 +68,7 @@ class EligibilityRequestConverter(BaseFHIRConverter):
     @classmethod
     def build_fhir_generic_benefit_balance(cls, code):
         benefit_balance = InsuranceBenefitBalance()
-        benefit_balance.category = cls.build_simple_codeable_concept(code)
+        benefit_balance.category = cls.build_constant_simple_codeable_concept(code)
         return benefit_balance
 
     @classmethod
@@ -88,7 +88,7 @@ class EligibilityRequestConverter(BaseFHIRConverter):
     @classmethod
     def build_fhir_generic_benefit_balance_financial(cls):
         financial = InsuranceBenefitBalanceFinancial()
-        financial.type = cls.build_simple_codeable_concept(Config.get_fhir_financial_code())
+        financial.type = cls.build_constant_simple_codeable_concept(Config.get_fhir_financial_code())
         return financial
 
     @classmethod
@@ -0,0 +1,437 @@
+from django.utils.translation import gettext
+
+from api_fhir.models import Identifier, IdentifierUse, HumanName, NameUse, ContactPoint, Address, FHIRDate, \
+    PropertyList
+from api_fhir.utils import TimeUtils
+
+
+class ConversionPlanNamespace(object):
+    # the globals of the functions compiled from a conversion plan: the values bound from the configuration, the
+    # converter and the constructors of the FHIR objects; `add()` gives the name of a bound value in the generated
+    # source; with `validate_converted_fhir_objects` every value is set through the `Property` descriptors, which
+    # validate it
+
+    def __init__(self, converter, fhir_type):
+        self.converter = converter
+        self.fhir_type = fhir_type
+        self.validate = converter.get_configuration().general.validate_converted_fhir_objects
+        self.values = {'converter': converter, 'TimeUtils': TimeUtils, 'gettext': gettext,
+                       'PropertyList': PropertyList}
+
+    def add(self, value, hint='value'):
+        name = '{}_{}'.format(hint, len(self.values))
+        self.values[name] = value
+        return name
+
+    def add_fhir_type(self, fhir_type):
+        # the FHIR objects are created from the dictionary of their values, like the parsed ones
+        name = 'new_' + fhir_type.__name__
+        self.values.setdefault(name, fhir_type._get_registry().create_instance)
+        return name
+
+    def build_property_value(self, fhir_type, name, value):
+        # the value of a list property is wrapped in the `PropertyList` the `Property` descriptor would create
+        definition = fhir_type._get_registry().properties[name].definition
+        if definition.count_max > 1:
+            return 'PropertyList({}, {})'.format(self.add(definition, 'definition'), value)
+        return value
+
+    def build_fhir_object(self, fhir_type, values):
+        # the expression creating the FHIR object of the `values` pairs of the property and its expression, only
+        # the dates and the required values need the validation of the `Property` descriptor
+        if self.validate:
+            return '{}({})'.format(self.add(fhir_type, fhir_type.__name__),
+                                   ', '.join('{}={}'.format(name, value) for name, value in values))
+        registry = fhir_type._get_registry()
+        for name, _ in values:
+            assert registry.types[name] is not FHIRDate and not registry.properties[name].definition.required
+        return '{}({{{}}})'.format(self.add_fhir_type(fhir_type), ', '.join(
+            '{!r}: {}'.format(name, self.build_property_value(fhir_type, name, value)) for name, value in values))
+
+    def build_assignment(self, name, value):
+        # the line setting the property of the converted FHIR object
+        registry = self.fhir_type._get_registry()
+        property_ = registry.properties[name]
+        if self.validate or registry.types[name] is FHIRDate or property_.definition.required:
+            return 'fhir_obj.{} = {}'.format(name, value)
+        return 'values[{!r}] = {}'.format(name, self.build_property_value(self.fhir_type, name, value))
+
+    def add_message(self, message):
+        # the messages are translated when they are reported, in the language of the request
+        return 'gettext({!r})'.format(message)
+
+
+class FieldMapping(object):
+    # one field (or group of fields) of a conversion plan, the source lines of both directions are generated from
+    # the same spec; the lines read and write `imis_obj` and `fhir_obj` and report the problems to `errors`;
+    # `fhir_elements` are the elements of the resource it converts and `imis_fields` the fields of the IMIS model
+    # it reads (the fields of the relations as lookups, e.g. `gender__code`)
+
+    fhir_elements = ()
+    imis_fields = ()
+
+    def to_fhir_lines(self, namespace):
+        return []
+
+    def to_imis_lines(self, namespace):
+        return []
+
+
+class PkMapping(FieldMapping):
+
+    fhir_elements = ('id',)
+
+    def __init__(self, imis_field='uuid'):
+        self.imis_field = imis_field
+        self.imis_fields = (imis_field,)
+
+    def to_fhir_lines(self, namespace):
+        return [namespace.build_assignment('id', 'imis_obj.{}'.format(self.imis_field))]
+
+
+class ValueMapping(FieldMapping):
+
+    def __init__(self, imis_field, fhir_field, required_message=None):
+        self.imis_field = imis_field
+        self.fhir_field = fhir_field
+        self.required_message = required_message
+        self.fhir_elements = (fhir_field,)
+        self.imis_fields = (imis_field,)
+
+    def to_fhir_lines(self, namespace):
+        return [namespace.build_assignment(self.fhir_field, 'imis_obj.{}'.format(self.imis_field))]
+
+    def to_imis_lines(self, namespace):
+        lines = ['value = fhir_obj.{}'.format(self.fhir_field)]
+        if self.required_message:
+            lines += ['if value is None:',
+                      '    errors.append({})'.format(namespace.add_message(self.required_message)),
+                      'else:']
+        else:
+            lines.append('if value is not None:')
+        lines.append('    imis_obj.{} = value'.format(self.imis_field))
+        return lines
+
+
+class DateMapping(FieldMapping):
+
+    def __init__(self, imis_field, fhir_field, required_message=None):
+        self.imis_field = imis_field
+        self.fhir_field = fhir_field
+        self.required_message = required_message
+        self.fhir_elements = (fhir_field,)
+        self.imis_fields = (imis_field,)
+
+    def to_fhir_lines(self, namespace):
+        return ['value = imis_obj.{}'.format(self.imis_field),
+                namespace.build_assignment(self.fhir_field, 'value.isoformat() if value is not None else None')]
+
+    def to_imis_lines(self, namespace):
+        lines = ['value = fhir_obj.{}'.format(self.fhir_field)]
+        if self.required_message:
+            lines += ['if value is None:',
+                      '    errors.append({})'.format(namespace.add_message(self.required_message)),
+                      'else:']
+        else:
+            lines.append('if value:')
+        lines.append('    imis_obj.{} = TimeUtils.str_to_date(value)'.format(self.imis_field))
+        return lines
+
+
+class IdentifierMapping(object):
+    # an identifier of the `IdentifiersMapping`, `type_code` is the name of the code in the identifier section of
+    # the configuration; `condition` is the test of the IMIS value which adds the identifier
+    # (`not_none`, `truthy` or `always`)
+
+    def __init__(self, imis_field, type_code, condition='not_none', to_imis=True, required_message=None):
+        self.imis_field = imis_field
+        self.type_code = type_code
+        self.condition = condition
+        self.to_imis = to_imis
+        self.required_message = required_message
+
+
+class IdentifiersMapping(FieldMapping):
+
+    _CONDITIONS = {
+        'not_none': 'if value is not None:',
+        'truthy': 'if value:',
+        'always': 'if True:'
+    }
+
+    def __init__(self, identifiers, fhir_field='identifier'):
+        self.identifiers = identifiers
+        self.fhir_field = fhir_field
+        self.fhir_elements = (fhir_field,)
+        self.imis_fields = tuple(identifier.imis_field for identifier in identifiers)
+
+    def to_fhir_lines(self, namespace):
+        identifier_config = namespace.converter.get_configuration().identifier
+        system = identifier_config.fhir_identifier_type_system
+        lines = ['identifiers = []']
+        for identifier in self.identifiers:
+            type_code = getattr(identifier_config, identifier.type_code)
+            identifier_type = namespace.add(namespace.converter.build_constant_codeable_concept(type_code, system),
+                                            'identifier_type')
+            lines += ['value = imis_obj.{}'.format(identifier.imis_field),
+                      self._CONDITIONS[identifier.condition],
+                      '    identifiers.append({})'.format(namespace.build_fhir_object(Identifier, [
+                          ('use', repr(IdentifierUse.USUAL.value)), ('type', identifier_type), ('value', 'value')]))]
+        lines.append(namespace.build_assignment(self.fhir_field, 'identifiers'))
+        return lines
+
+    def to_imis_lines(self, namespace):
+        identifier_config = namespace.converter.get_configuration().identifier
+        identifiers = [identifier for identifier in self.identifiers if identifier.to_imis]
+        if not identifiers:
+            return []
+        # the value of the first identifier of every code, like `BaseFHIRConverter.get_fhir_identifier_by_code()`
+        lines = ['values = {}',
+                 'for identifier in fhir_obj.{}:'.format(self.fhir_field),
+                 '    identifier_type = identifier.type',
+                 '    if identifier_type is not None and identifier_type.coding:',
+                 '        coding = identifier_type.coding[0]',
+                 '        if coding.system == {!r} and coding.code not in values:'.format(
+                     identifier_config.fhir_identifier_type_system),
+                 '            values[coding.code] = identifier.value']
+        for identifier in identifiers:
+            lines += ['value = values.get({!r})'.format(getattr(identifier_config, identifier.type_code)),
+                      'if value:',
+                      '    imis_obj.{} = value'.format(identifier.imis_field)]
+            if identifier.required_message:
+                lines += ['if imis_obj.{} is None:'.format(identifier.imis_field),
+                          '    errors.append({})'.format(namespace.add_message(identifier.required_message))]
+        return lines
+
+
+class HumanNameMapping(FieldMapping):
+    # the usual name of a person, the family name and the first given name
+
+    def __init__(self, family_field='last_name', given_field='other_names', family_required_message=None,
+                 given_required_message=None):
+        self.family_field = family_field
+        self.given_field = given_field
+        self.family_required_message = family_required_message
+        self.given_required_message = given_required_message
+        self.fhir_elements = ('name',)
+        self.imis_fields = (family_field, given_field)
+
+    def to_fhir_lines(self, namespace):
+        name = namespace.build_fhir_object(HumanName, [('use', repr(NameUse.USUAL.value)),
+                                                       ('family', 'imis_obj.{}'.format(self.family_field)),
+                                                       ('given', '[imis_obj.{}]'.format(self.given_field))])
+        return [namespace.build_assignment('name', '[{}]'.format(name))]
+
+    def to_imis_lines(self, namespace):
+        lines = ['family = None',
+                 'given = None',
+                 'for name in fhir_obj.name:',
+                 '    if name.use == {!r}:'.format(NameUse.USUAL.value),
+                 '        family = name.family',
+                 '        if name.given:',
+                 '            given = name.given[0]',
+                 '        break',
+                 'imis_obj.{} = family'.format(self.family_field),
+                 'imis_obj.{} = given'.format(self.given_field)]
+        for variable, message in [('family', self.family_required_message), ('given', self.given_required_message)]:
+            if message:
+                lines += ['if {} is None:'.format(variable),
+                          '    errors.append({})'.format(namespace.add_message(message))]
+        return lines
+
+
+class ContactPointsMapping(FieldMapping):
+    # the contact points of the `contact_points` pairs of the IMIS field and the FHIR system, all of the `use`;
+    # with `overwrite` the IMIS fields without a contact point are set to `None`
+
+    def __init__(self, contact_points, use, fhir_field='telecom', overwrite=False):
+        self.contact_points = contact_points
+        self.use = use
+        self.fhir_field = fhir_field
+        self.overwrite = overwrite
+        self.fhir_elements = (fhir_field,)
+        self.imis_fields = tuple(imis_field for imis_field, _ in contact_points)
+
+    def to_fhir_lines(self, namespace):
+        lines = ['contact_points = []']
+        for imis_field, system in self.contact_points:
+            lines += ['value = imis_obj.{}'.format(imis_field),
+                      'if value is not None:',
+                      '    contact_points.append({})'.format(namespace.build_fhir_object(ContactPoint, [
+                          ('system', repr(system)), ('use', repr(self.use)), ('value', 'value')]))]
+        lines.append(namespace.build_assignment(self.fhir_field, 'contact_points'))
+        return lines
+
+    def to_imis_lines(self, namespace):
+        lines = []
+        if self.overwrite:
+            lines += ['imis_obj.{} = None'.format(imis_field) for imis_field, _ in self.contact_points]
+        lines.append('for contact_point in fhir_obj.{}:'.format(self.fhir_field))
+        for index, (imis_field, system) in enumerate(self.contact_points):
+            lines += ['    {} contact_point.system == {!r}:'.format('if' if index == 0 else 'elif', system),
+                      '        imis_obj.{} = contact_point.value'.format(imis_field)]
+        return lines
+
+
+class AddressesMapping(FieldMapping):
+    # the addresses of the `addresses` pairs of the IMIS field and the FHIR address type, all of the `use`; with
+    # `many=False` the FHIR field is a single address built from the first pair even for a missing IMIS value
+
+    def __init__(self, addresses, use, fhir_field='address', many=True):
+        self.addresses = addresses
+        self.use = use
+        self.fhir_field = fhir_field
+        self.many = many
+        self.fhir_elements = (fhir_field,)
+        self.imis_fields = tuple(imis_field for imis_field, _ in addresses)
+
+    def to_fhir_lines(self, namespace):
+        if not self.many:
+            imis_field, address_type = self.addresses[0]
+            return [namespace.build_assignment(self.fhir_field,
+                                               self.build_address(namespace, imis_field, address_type))]
+        lines = ['addresses = []']
+        for imis_field, address_type in self.addresses:
+            lines += ['if imis_obj.{} is not None:'.format(imis_field),
+                      '    addresses.append({})'.format(self.build_address(namespace, imis_field, address_type))]
+        lines.append(namespace.build_assignment(self.fhir_field, 'addresses'))
+        return lines
+
+    def build_address(self, namespace, imis_field, address_type):
+        return namespace.build_fhir_object(Address, [('text', 'imis_obj.{}'.format(imis_field)),
+                                                     ('use', repr(self.use)), ('type', repr(address_type))])
+
+    def to_imis_lines(self, namespace):
+        if not self.many:
+            imis_field, address_type = self.addresses[0]
+            return ['address = fhir_obj.{}'.format(self.fhir_field),
+                    'if address is not None and address.type == {!r}:'.format(address_type),
+                    '    imis_obj.{} = address.text'.format(imis_field)]
+        lines = ['for address in fhir_obj.{}:'.format(self.fhir_field)]
+        for index, (imis_field, address_type) in enumerate(self.addresses):
+            lines += ['    {} address.type == {!r}:'.format('if' if index == 0 else 'elif', address_type),
+                      '        imis_obj.{} = address.text'.format(imis_field)]
+        return lines
+
+
+class CodeableConceptMapping(FieldMapping):
+    # an IMIS code mapped to a `CodeableConcept` by the `CodeMap` given by the `code_map` method of the converter;
+    # `default_code` is the FHIR code of the concept of the unmapped IMIS codes (the field isn't set if it's `None`)
+
+    def __init__(self, imis_field, fhir_field, code_map, default_code=None, required_message=None,
+                 missing_code_message=None):
+        self.imis_field = imis_field
+        self.fhir_field = fhir_field
+        self.code_map = code_map
+        self.default_code = default_code
+        self.required_message = required_message
+        self.missing_code_message = missing_code_message
+        self.fhir_elements = (fhir_field,)
+        self.imis_fields = (imis_field,)
+
+    def get_code_map(self, namespace):
+        return getattr(namespace.converter, self.code_map)()
+
+    def to_fhir_lines(self, namespace):
+        code_map = self.get_code_map(namespace)
+        concepts = namespace.add(code_map.fhir_values, 'concepts')
+        if self.default_code is None:
+            return ['value = {}.get(imis_obj.{})'.format(concepts, self.imis_field),
+                    'if value is not None:',
+                    '    ' + namespace.build_assignment(self.fhir_field, 'value')]
+        default_concept = namespace.add(
+            namespace.converter.build_constant_codeable_concept(self.default_code, code_map.system), 'concept')
+        return [namespace.build_assignment(self.fhir_field, '{}.get(imis_obj.{}, {})'.format(
+            concepts, self.imis_field, default_concept))]
+
+    def to_imis_lines(self, namespace):
+        code_map = namespace.add(self.get_code_map(namespace), 'code_map')
+        lines = ['concept = fhir_obj.{}'.format(self.fhir_field)]
+        if self.required_message:
+            lines += ['if concept is None:',
+                      '    errors.append({})'.format(namespace.add_message(self.required_message)),
+                      'else:']
+        else:
+            lines.append('if concept is not None:')
+        lines += ['    value = {}.get_imis_code_from_codings(concept.coding)'.format(code_map),
+                  '    if value is not None:',
+                  '        imis_obj.{} = value'.format(self.imis_field)]
+        if self.missing_code_message:
+            lines += ['    if imis_obj.{} is None:'.format(self.imis_field),
+                      '        errors.append({})'.format(namespace.add_message(self.missing_code_message))]
+        return lines
+
+
+class MethodMapping(FieldMapping):
+    # the fields converted by the classmethods of the converter, e.g. the ones too specific for a spec;
+    # `to_fhir(fhir_obj, imis_obj)` and `to_imis(imis_obj, fhir_obj, errors)`
+
+    def __init__(self, to_fhir=None, to_imis=None, fhir_elements=(), imis_fields=()):
+        self.to_fhir = to_fhir
+        self.to_imis = to_imis
+        self.fhir_elements = fhir_elements
+        self.imis_fields = imis_fields
+
+    def to_fhir_lines(self, namespace):
+        return ['converter.{}(fhir_obj, imis_obj)'.format(self.to_fhir)] if self.to_fhir else []
+
+    def to_imis_lines(self, namespace):
+        return ['converter.{}(imis_obj, fhir_obj, errors)'.format(self.to_imis)] if self.to_imis else []
+
+
+class CompiledConversionPlan(object):
+
+    __slots__ = ('to_fhir', 'to_imis')
+
+    def __init__(self, to_fhir, to_imis):
+        self.to_fhir = to_fhir
+        self.to_imis = to_imis
+
+
+class ConversionPlan(object):
+    # the declarative conversion of a resource, a list of field mappings; `compile()` generates two flat functions
+    # from it, `to_fhir(imis_obj)` which returns the new FHIR object and `to_imis(fhir_obj, imis_obj, errors)`
+    # which fills the IMIS object, the values of the configuration are bound into them; with the `_elements` of a
+    # search only the mappings of those elements are converted to FHIR
+
+    def __init__(self, fhir_type, mappings):
+        self.fhir_type = fhir_type
+        self.mappings = mappings
+
+    def get_elements(self, elements):
+        # the requested elements the plan converts
+        return frozenset(element for mapping in self.mappings for element in mapping.fhir_elements
+                         if element in elements)
+
+    def get_mappings(self, elements=None):
+        # the `id` is converted for any elements
+        if elements is None:
+            return self.mappings
+        return [mapping for mapping in self.mappings
+                if isinstance(mapping, PkMapping) or any(element in elements for element in mapping.fhir_elements)]
+
+    def get_imis_fields(self, elements=None):
+        imis_fields = []
+        for mapping in self.get_mappings(elements):
+            imis_fields += [imis_field for imis_field in mapping.imis_fields if imis_field not in imis_fields]
+        return imis_fields
+
+    def compile(self, converter, elements=None):
+        namespace = ConversionPlanNamespace(converter, self.fhir_type)
+        to_fhir_lines = ['def to_fhir(imis_obj):', '    values = {}',
+                         '    fhir_obj = {}(values)'.format(namespace.add_fhir_type(self.fhir_type))]
+        to_imis_lines = ['def to_imis(fhir_obj, imis_obj, errors):']
+        for mapping in self.get_mappings(elements):
+            to_fhir_lines += ['    ' + line for line in mapping.to_fhir_lines(namespace)]
+        for mapping in self.mappings:
+            to_imis_lines += ['    ' + line for line in mapping.to_imis_lines(namespace)]
+        if elements is not None:
+            # the resources restricted to the elements are marked as subsetted
+            to_fhir_lines.append('    ' + namespace.build_assignment(
+                'meta', namespace.add(converter.build_subsetted_meta(), 'meta')))
+        to_fhir_lines.append('    return fhir_obj')
+        to_imis_lines.append('    return imis_obj')
+        globals_ = namespace.values
+        exec('\n'.join(to_fhir_lines), globals_)
+        exec('\n'.join(to_imis_lines), globals_)
+        return CompiledConversionPlan(globals_['to_fhir'], globals_['to_imis'])
@@ -1,39 +1,61 @@
-from django.utils.translation import gettext
+from django.utils.translation import gettext_noop
 from location.models import HealthFacility
 
-from api_fhir.configurations import GeneralConfiguration, Stu3IdentifierConfig, Stu3LocationConfig
-from api_fhir.converters import BaseFHIRConverter, ReferenceConverterMixin
+from api_fhir.configurations import GeneralConfiguration
+from api_fhir.converters import BaseFHIRConverter, ReferenceConverterMixin, CodeMap, ConversionPlan, PkMapping, \
+    IdentifiersMapping, IdentifierMapping, ValueMapping, CodeableConceptMapping, AddressesMapping, ContactPointsMapping
 from api_fhir.models import Location, ContactPointSystem, ContactPointUse
 from api_fhir.models.address import AddressUse, AddressType
 from api_fhir.models.imisModelEnums import ImisHfLevel
-from api_fhir.utils import TimeUtils, DbManagerUtils
+from api_fhir.utils import TimeUtils
 
 
 class LocationConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def to_fhir_obj(cls, imis_hf):
-        fhir_location = Location()
-        cls.build_fhir_pk(fhir_location, imis_hf.uuid)
-        cls.build_fhir_location_identifier(fhir_location, imis_hf)
-        cls.build_fhir_location_name(fhir_location, imis_hf)
-        cls.build_fhir_location_type(fhir_location, imis_hf)
-        cls.build_fhir_location_address(fhir_location, imis_hf)
-        cls.build_fhir_location_telecom(fhir_location, imis_hf)
-        return fhir_location
+        return cls.get_compiled_conversion_plan().to_fhir(imis_hf)
+
+    @classmethod
+    def get_summary_elements(cls):
+        return frozenset(['identifier', 'status', 'operationalStatus', 'name', 'alias', 'mode', 'type',
+                          'physicalType', 'managingOrganization', 'partOf'])
+
+    @classmethod
+    def get_elements_converter(cls, elements=None):
+        return cls.get_compiled_conversion_plan(elements).to_fhir
+
+    @classmethod
+    def get_elements_fields(cls, elements=None):
+        return None if elements is None else cls.get_conversion_plan().get_imis_fields(elements)
 
     @classmethod
     def to_imis_obj(cls, fhir_location, audit_user_id):
         errors = []
         imis_hf = cls.createDefaultInsuree(audit_user_id)
-        cls.build_imis_hf_identiftier(imis_hf, fhir_location, errors)
-        cls.build_imis_hf_name(imis_hf, fhir_location, errors)
-        cls.build_imis_hf_level(imis_hf, fhir_location, errors)
-        cls.build_imis_hf_address(imis_hf, fhir_location)
-        cls.build_imis_hf_contacts(imis_hf, fhir_location)
+        cls.get_compiled_conversion_plan().to_imis(fhir_location, imis_hf, errors)
         cls.check_errors(errors)
         return imis_hf
 
+    @classmethod
+    def get_conversion_plan(cls):
+        return ConversionPlan(Location, [
+            PkMapping(),
+            IdentifiersMapping([
+                IdentifierMapping('uuid', 'fhir_uuid_type_code', to_imis=False),
+                IdentifierMapping('code', 'fhir_facility_id_type', 'always',
+                                  required_message=gettext_noop('Missing hf code'))
+            ]),
+            ValueMapping('name', 'name', gettext_noop('Missing patient `name` attribute')),
+            CodeableConceptMapping('level', 'type', 'get_hf_level_map', default_code="",
+                                   required_message=gettext_noop('Missing patient `type` attribute'),
+                                   missing_code_message=gettext_noop('Missing hf level')),
+            AddressesMapping([('address', AddressType.PHYSICAL.value)], AddressUse.HOME.value, many=False),
+            ContactPointsMapping([('phone', ContactPointSystem.PHONE.value),
+                                  ('fax', ContactPointSystem.FAX.value),
+                                  ('email', ContactPointSystem.EMAIL.value)], ContactPointUse.HOME.value)
+        ])
+
     @classmethod
     def get_reference_obj_id(cls, imis_hf):
         return imis_hf.uuid
@@ -43,9 +65,8 @@ class LocationConverter(BaseFHIRConverter, ReferenceConverterMixin):
         return Location
 
     @classmethod
-    def get_imis_obj_by_fhir_reference(cls, reference, errors=None):
-        location_uuid = cls.get_resource_id_from_reference(reference)
-        return DbManagerUtils.get_object_or_none(HealthFacility, uuid=location_uuid)
+    def get_reference_imis_model(cls):
+        return HealthFacility
 
     @classmethod
     def createDefaultInsuree(cls, audit_user_id):
@@ -59,106 +80,14 @@ class LocationConverter(BaseFHIRConverter, ReferenceConverterMixin):
         return imis_hf
 
     @classmethod
-    def build_fhir_location_identifier(cls, fhir_location, imis_hf):
-        identifiers = []
-        cls.build_fhir_uuid_identifier(identifiers, imis_hf)
-        cls.build_fhir_hf_code_identifier(identifiers, imis_hf)
-        fhir_location.identifier = identifiers
-
-    @classmethod
-    def build_fhir_hf_code_identifier(cls, identifiers, imis_hf):
-        if imis_hf is not None:
-            identifier = cls.build_fhir_identifier(imis_hf.code,
-                                                   Stu3IdentifierConfig.get_fhir_identifier_type_system(),
-                                                   Stu3IdentifierConfig.get_fhir_facility_id_type())
-            identifiers.append(identifier)
-
-    @classmethod
-    def build_imis_hf_identiftier(cls, imis_hf, fhir_location, errors):
-        value = cls.get_fhir_identifier_by_code(fhir_location.identifier,
-                                                Stu3IdentifierConfig.get_fhir_facility_id_type())
-        if value:
-            imis_hf.code = value
-        cls.valid_condition(imis_hf.code is None, gettext('Missing hf code'), errors)
-
-    @classmethod
-    def build_fhir_location_name(cls, fhir_location, imis_hf):
-        fhir_location.name = imis_hf.name
-
-    @classmethod
-    def build_imis_hf_name(cls, imis_hf, fhir_location, errors):
-        name = fhir_location.name
-        if not cls.valid_condition(name is None,
-                                   gettext('Missing patient `name` attribute'), errors):
-            imis_hf.name = name
-
-    @classmethod
-    def build_fhir_location_type(cls, fhir_location, imis_hf):
-        code = ""
-        if imis_hf.level == ImisHfLevel.HEALTH_CENTER.value:
-            code = Stu3LocationConfig.get_fhir_code_for_health_center()
-        elif imis_hf.level == ImisHfLevel.HOSPITAL.value:
-            code = Stu3LocationConfig.get_fhir_code_for_hospital()
-        elif imis_hf.level == ImisHfLevel.DISPENSARY.value:
-            code = Stu3LocationConfig.get_fhir_code_for_dispensary()
-
-        fhir_location.type = \
-            cls.build_codeable_concept(code, Stu3LocationConfig.get_fhir_location_role_type_system())
-
-    @classmethod
-    def build_imis_hf_level(cls, imis_hf, fhir_location, errors):
-        location_type = fhir_location.type
-        if not cls.valid_condition(location_type is None,
-                                   gettext('Missing patient `type` attribute'), errors):
-            for maritalCoding in location_type.coding:
-                if maritalCoding.system == Stu3LocationConfig.get_fhir_location_role_type_system():
-                    code = maritalCoding.code
-                    if code == Stu3LocationConfig.get_fhir_code_for_health_center():
-                        imis_hf.level = ImisHfLevel.HEALTH_CENTER.value
-                    elif code == Stu3LocationConfig.get_fhir_code_for_hospital():
-                        imis_hf.level = ImisHfLevel.HOSPITAL.value
-                    elif code == Stu3LocationConfig.get_fhir_code_for_dispensary():
-                        imis_hf.level = ImisHfLevel.DISPENSARY.value
-
-            cls.valid_condition(imis_hf.level is None, gettext('Missing hf level'), errors)
-
-    @classmethod
-    def build_fhir_location_address(cls, fhir_location, imis_hf):
-        fhir_location.address = cls.build_fhir_address(imis_hf.address, AddressUse.HOME.value,
-                                                       AddressType.PHYSICAL.value)
-
-    @classmethod
-    def build_imis_hf_address(cls, imis_hf, fhir_location):
-        address = fhir_location.address
-        if address is not None:
-            if address.type == AddressType.PHYSICAL.value:
-                imis_hf.address = address.text
-
-    @classmethod
-    def build_fhir_location_telecom(cls, fhir_location, imis_hf):
-        telecom = []
-        if imis_hf.phone is not None:
-            phone = LocationConverter.build_fhir_contact_point(imis_hf.phone, ContactPointSystem.PHONE.value,
-                                                               ContactPointUse.HOME.value)
-            telecom.append(phone)
-        if imis_hf.fax is not None:
-            fax = LocationConverter.build_fhir_contact_point(imis_hf.fax, ContactPointSystem.FAX.value,
-                                                             ContactPointUse.HOME.value)
-            telecom.append(fax)
-        if imis_hf.email is not None:
-            email = LocationConverter.build_fhir_contact_point(imis_hf.email, ContactPointSystem.EMAIL.value,
-                                                               ContactPointUse.HOME.value)
-            telecom.append(email)
-        fhir_location.telecom = telecom
+    def get_hf_level_map(cls):
+        return cls.get_code_map('hf_level', cls.build_hf_level_map)
 
     @classmethod
-    def build_imis_hf_contacts(cls, imis_hf, fhir_location):
-        telecom = fhir_location.telecom
-        if telecom is not None:
-            for contact_point in telecom:
-                if contact_point.system == ContactPointSystem.PHONE.value:
-                    imis_hf.phone = contact_point.value
-                elif contact_point.system == ContactPointSystem.FAX.value:
-                    imis_hf.fax = contact_point.value
-                elif contact_point.system == ContactPointSystem.EMAIL.value:
-                    imis_hf.email = contact_point.value
+    def build_hf_level_map(cls):
+        location_config = cls.get_configuration().location
+        system = location_config.fhir_location_role_type_system
+        return CodeMap([(ImisHfLevel.HEALTH_CENTER.value, location_config.fhir_code_for_health_center),
+                        (ImisHfLevel.HOSPITAL.value, location_config.fhir_code_for_hospital),
+                        (ImisHfLevel.DISPENSARY.value, location_config.fhir_code_for_dispensary)],
+                       system, lambda imis_code, fhir_code: cls.build_constant_codeable_concept(fhir_code, system))
@@ -1,28 +1,49 @@
-from django.utils.translation import gettext
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils.translation import gettext, gettext_noop
 from insuree.models import Insuree, Gender, Education, Profession, Family
 from location.models import Location
 
-from api_fhir.configurations import Stu3IdentifierConfig, GeneralConfiguration, Stu3MaritalConfig
-from api_fhir.converters import BaseFHIRConverter, PersonConverterMixin, ReferenceConverterMixin
-from api_fhir.models import Patient, AdministrativeGender, ImisMaritalStatus, Extension
+from api_fhir.configurations import GeneralConfiguration
+from api_fhir.converters import BaseFHIRConverter, PersonConverterMixin, ReferenceConverterMixin, CodeMap, \
+    ConversionPlan, PkMapping, HumanNameMapping, IdentifiersMapping, IdentifierMapping, DateMapping, MethodMapping, \
+    CodeableConceptMapping, ContactPointsMapping, AddressesMapping
+from api_fhir.models import Patient, AdministrativeGender, ImisMaritalStatus, Extension, ContactPointSystem, \
+    ContactPointUse
 from api_fhir.models.address import AddressUse, AddressType
-from api_fhir.utils import TimeUtils, DbManagerUtils
+from api_fhir.utils import TimeUtils, ModelLookupCache
+
+# an unknown gender code is an error, so the misses aren't kept
+gender_cache = ModelLookupCache('gender', Gender, 'code', miss_ttl=0)
+
+
+@receiver([post_save, post_delete], sender=Gender)
+def invalidate_gender_cache(sender, **kwargs):
+    gender_cache.invalidate()
+
 
 class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConverterMixin):
 
     @classmethod
     def to_fhir_obj(cls, imis_insuree):
-        fhir_patient = Patient()
-        cls.build_fhir_pk(fhir_patient, imis_insuree.uuid)
-        cls.build_human_names(fhir_patient, imis_insuree)
-        cls.build_fhir_identifiers(fhir_patient, imis_insuree)
-        cls.build_fhir_birth_date(fhir_patient, imis_insuree)
-        cls.build_fhir_gender(fhir_patient, imis_insuree)
-        cls.build_fhir_marital_status(fhir_patient, imis_insuree)
-        cls.build_fhir_telecom(fhir_patient, imis_insuree)
-        cls.build_fhir_addresses(fhir_patient, imis_insuree)
-        cls.build_fhir_extentions(fhir_patient, imis_insuree)
-        return fhir_patient
+        return cls.get_compiled_conversion_plan().to_fhir(imis_insuree)
+
+    @classmethod
+    def get_summary_elements(cls):
+        return frozenset(['identifier', 'active', 'name', 'telecom', 'gender', 'birthDate', 'deceasedBoolean',
+                          'deceasedDateTime', 'address', 'managingOrganization', 'link'])
+
+    @classmethod
+    def get_elements_converter(cls, elements=None):
+        return cls.get_compiled_conversion_plan(elements).to_fhir
+
+    @classmethod
+    def get_elements_fields(cls, elements=None):
+        return None if elements is None else cls.get_conversion_plan().get_imis_fields(elements)
+
+    @classmethod
+    def get_select_related_fields(cls):
+        return ['gender', 'education', 'profession', 'family__location']
 
     @classmethod
     def to_imis_obj(cls, fhir_patient, audit_user_id):
@@ -31,16 +52,36 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
         # TODO the familyid isn't covered because that value is missing in the model
         # TODO the photoId isn't covered because that value is missing in the model
         # TODO the typeofid isn't covered because that value is missing in the model
-        cls.build_imis_names(imis_insuree, fhir_patient, errors)
-        cls.build_imis_identifiers(imis_insuree, fhir_patient)
-        cls.build_imis_birth_date(imis_insuree, fhir_patient, errors)
-        cls.build_imis_gender(imis_insuree, fhir_patient)
-        cls.build_imis_marital(imis_insuree, fhir_patient)
-        cls.build_imis_contacts(imis_insuree, fhir_patient)
-        cls.build_imis_addresses(imis_insuree, fhir_patient)
+        cls.get_compiled_conversion_plan().to_imis(fhir_patient, imis_insuree, errors)
         cls.check_errors(errors)
         return imis_insuree
 
+    @classmethod
+    def get_conversion_plan(cls):
+        return ConversionPlan(Patient, [
+            PkMapping(),
+            HumanNameMapping(family_required_message=gettext_noop('Missing patient family name'),
+                             given_required_message=gettext_noop('Missing patient given name')),
+            IdentifiersMapping([
+                IdentifierMapping('uuid', 'fhir_uuid_type_code', to_imis=False),
+                IdentifierMapping('chf_id', 'fhir_chfid_type_code'),
+                # TODO typeofid isn't provided, the passport should be mapped based on typeofid
+                IdentifierMapping('passport', 'fhir_passport_type_code')
+            ]),
+            DateMapping('dob', 'birthDate', gettext_noop('Missing patient `birthDate` attribute')),
+            MethodMapping('build_fhir_gender', 'build_imis_gender', fhir_elements=('gender',),
+                          imis_fields=('gender__code',)),
+            CodeableConceptMapping('marital', 'maritalStatus', 'get_marital_status_map'),
+            ContactPointsMapping([('phone', ContactPointSystem.PHONE.value),
+                                  ('email', ContactPointSystem.EMAIL.value)],
+                                 ContactPointUse.HOME.value, overwrite=True),
+            AddressesMapping([('current_address', AddressType.PHYSICAL.value),
+                              ('geolocation', AddressType.BOTH.value)], AddressUse.HOME.value),
+            MethodMapping(to_fhir='build_fhir_extentions', fhir_elements=('extension',),
+                          imis_fields=('head', 'validity_from', 'family__location__code', 'education__education',
+                                       'profession__profession'))
+        ])
+
     @classmethod
     def get_reference_obj_id(cls, imis_insuree):
         return imis_insuree.uuid
@@ -50,9 +91,8 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
         return Patient
 
     @classmethod
-    def get_imis_obj_by_fhir_reference(cls, reference, errors=None):
-        imis_insuree_uuid = cls.get_resource_id_from_reference(reference)
-        return DbManagerUtils.get_object_or_none(Insuree, uuid=imis_insuree_uuid)
+    def get_reference_imis_model(cls):
+        return Insuree
 
     @classmethod
     def createDefaultInsuree(cls, audit_user_id):
@@ -63,165 +103,58 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
         imis_insuree.audit_user_id = audit_user_id
         return imis_insuree
 
-    @classmethod
-    def build_human_names(cls, fhir_patient, imis_insuree):
-        name = cls.build_fhir_names_for_person(imis_insuree)
-        fhir_patient.name = [name]
-
-    @classmethod
-    def build_imis_names(cls, imis_insuree, fhir_patient, errors):
-        names = fhir_patient.name
-        if not cls.valid_condition(names is None, gettext('Missing patient `name` attribute'), errors):
-            imis_insuree.last_name, imis_insuree.other_names = cls.build_imis_last_and_other_name(names)
-            cls.valid_condition(imis_insuree.last_name is None, gettext('Missing patient family name'), errors)
-            cls.valid_condition(imis_insuree.other_names is None, gettext('Missing patient given name'), errors)
-
-    @classmethod
-    def build_fhir_identifiers(cls, fhir_patient, imis_insuree):
-        identifiers = []
-        cls.build_fhir_uuid_identifier(identifiers, imis_insuree)
-        cls.build_fhir_chfid_identifier(identifiers, imis_insuree)
-        cls.build_fhir_passport_identifier(identifiers, imis_insuree)
-        fhir_patient.identifier = identifiers
-
-    @classmethod
-    def build_imis_identifiers(cls, imis_insuree, fhir_patient):
-        value = cls.get_fhir_identifier_by_code(fhir_patient.identifier,
-                                                Stu3IdentifierConfig.get_fhir_chfid_type_code())
-        if value:
-            imis_insuree.chf_id = value
-        value = cls.get_fhir_identifier_by_code(fhir_patient.identifier,
-                                                Stu3IdentifierConfig.get_fhir_passport_type_code())
-        if value:
-            imis_insuree.passport = value
-
-    @classmethod
-    def build_fhir_chfid_identifier(cls, identifiers, imis_insuree):
-        if imis_insuree.chf_id is not None:
-            identifier = cls.build_fhir_identifier(imis_insuree.chf_id,
-                                                   Stu3IdentifierConfig.get_fhir_identifier_type_system(),
-                                                   Stu3IdentifierConfig.get_fhir_chfid_type_code())
-            identifiers.append(identifier)
-
-    @classmethod
-    def build_fhir_passport_identifier(cls, identifiers, imis_insuree):
-        if hasattr(imis_insuree, "typeofid") and imis_insuree.typeofid is not None:
-            pass  # TODO typeofid isn't provided, this section should contain logic used to create passport field based on typeofid
-        elif imis_insuree.passport is not None:
-            identifier = cls.build_fhir_identifier(imis_insuree.passport,
-                                                   Stu3IdentifierConfig.get_fhir_identifier_type_system(),
-                                                   Stu3IdentifierConfig.get_fhir_passport_type_code())
-            identifiers.append(identifier)
-
-    @classmethod
-    def build_fhir_birth_date(cls, fhir_patient, imis_insuree):
-        fhir_patient.birthDate = imis_insuree.dob.isoformat()
-
-    @classmethod
-    def build_imis_birth_date(cls, imis_insuree, fhir_patient, errors):
-        birth_date = fhir_patient.birthDate
-        if not cls.valid_condition(birth_date is None, gettext('Missing patient `birthDate` attribute'), errors):
-            imis_insuree.dob = TimeUtils.str_to_date(birth_date)
-
     @classmethod
     def build_fhir_gender(cls, fhir_patient, imis_insuree):
         if hasattr(imis_insuree, "gender") and imis_insuree.gender is not None:
-            code = imis_insuree.gender.code
-            if code == GeneralConfiguration.get_male_gender_code():
-                fhir_patient.gender = AdministrativeGender.MALE.value
-            elif code == GeneralConfiguration.get_female_gender_code():
-                fhir_patient.gender = AdministrativeGender.FEMALE.value
-            elif code == GeneralConfiguration.get_other_gender_code():
-                fhir_patient.gender = AdministrativeGender.OTHER.value
+            gender = cls.get_gender_map().get_fhir_code(imis_insuree.gender.code)
+            if gender is not None:
+                fhir_patient.gender = gender
         else:
             fhir_patient.gender = AdministrativeGender.UNKNOWN.value
 
     @classmethod
-    def build_imis_gender(cls, imis_insuree, fhir_patient):
+    def build_imis_gender(cls, imis_insuree, fhir_patient, errors=None):
         gender = fhir_patient.gender
         if gender is not None:
-            imis_gender_code = None
-            if gender == AdministrativeGender.MALE.value:
-                imis_gender_code = GeneralConfiguration.get_male_gender_code()
-            elif gender == AdministrativeGender.FEMALE.value:
-                imis_gender_code = GeneralConfiguration.get_female_gender_code()
-            elif gender == AdministrativeGender.FEMALE.value:
-                imis_gender_code = GeneralConfiguration.get_other_gender_code()
+            imis_gender_code = cls.get_gender_map().get_imis_code(gender)
             if imis_gender_code is not None:
-                imis_insuree.gender = Gender.objects.get(pk=imis_gender_code)
-
-    @classmethod
-    def build_fhir_marital_status(cls, fhir_patient, imis_insuree):
-        if imis_insuree.marital is not None:
-            if imis_insuree.marital == ImisMaritalStatus.MARRIED.value:
-                fhir_patient.maritalStatus = \
-                    cls.build_codeable_concept(Stu3MaritalConfig.get_fhir_married_code(),
-                                               Stu3MaritalConfig.get_fhir_marital_status_system())
-            elif imis_insuree.marital == ImisMaritalStatus.SINGLE.value:
-                fhir_patient.maritalStatus = \
-                    cls.build_codeable_concept(Stu3MaritalConfig.get_fhir_never_married_code(),
-                                               Stu3MaritalConfig.get_fhir_marital_status_system())
-            elif imis_insuree.marital == ImisMaritalStatus.DIVORCED.value:
-                fhir_patient.maritalStatus = \
-                    cls.build_codeable_concept(Stu3MaritalConfig.get_fhir_divorced_code(),
-                                               Stu3MaritalConfig.get_fhir_marital_status_system())
-            elif imis_insuree.marital == ImisMaritalStatus.WIDOWED.value:
-                fhir_patient.maritalStatus = \
-                    cls.build_codeable_concept(Stu3MaritalConfig.get_fhir_widowed_code(),
-                                               Stu3MaritalConfig.get_fhir_marital_status_system())
-            elif imis_insuree.marital == ImisMaritalStatus.NOT_SPECIFIED.value:
-                fhir_patient.maritalStatus = \
-                    cls.build_codeable_concept(Stu3MaritalConfig.get_fhir_unknown_marital_status_code(),
-                                               Stu3MaritalConfig.get_fhir_marital_status_system())
+                imis_gender = gender_cache.get(imis_gender_code)
+                if not cls.valid_condition(imis_gender is None,
+                                           gettext('Unknown gender code `{}`').format(imis_gender_code), errors):
+                    imis_insuree.gender = imis_gender
 
     @classmethod
-    def build_imis_marital(cls, imis_insuree, fhir_patient):
-        marital_status = fhir_patient.maritalStatus
-        if marital_status is not None:
-            for maritialCoding in marital_status.coding:
-                if maritialCoding.system == Stu3MaritalConfig.get_fhir_marital_status_system():
-                    code = maritialCoding.code
-                    if code == Stu3MaritalConfig.get_fhir_married_code():
-                        imis_insuree.marital = ImisMaritalStatus.MARRIED.value
-                    elif code == Stu3MaritalConfig.get_fhir_never_married_code():
-                        imis_insuree.marital = ImisMaritalStatus.SINGLE.value
-                    elif code == Stu3MaritalConfig.get_fhir_divorced_code():
-                        imis_insuree.marital = ImisMaritalStatus.DIVORCED.value
-                    elif code == Stu3MaritalConfig.get_fhir_widowed_code():
-                        imis_insuree.marital = ImisMaritalStatus.WIDOWED.value
-                    elif code == Stu3MaritalConfig.get_fhir_unknown_marital_status_code():
-                        imis_insuree.marital = ImisMaritalStatus.NOT_SPECIFIED.value
+    def get_imis_gender(cls, imis_gender_code):
+        imis_gender = gender_cache.get(imis_gender_code)
+        if imis_gender is None:
+            raise Gender.DoesNotExist(gettext('Unknown gender code `{}`').format(imis_gender_code))
+        return imis_gender
 
     @classmethod
-    def build_fhir_telecom(cls, fhir_patient, imis_insuree):
-        fhir_patient.telecom = cls.build_fhir_telecom_for_person(phone=imis_insuree.phone, email=imis_insuree.email)
+    def get_gender_map(cls):
+        return cls.get_code_map('gender', cls.build_gender_map)
 
     @classmethod
-    def build_imis_contacts(cls, imis_insuree, fhir_patient):
-        imis_insuree.phone, imis_insuree.email = cls.build_imis_phone_num_and_email(fhir_patient.telecom)
+    def build_gender_map(cls):
+        general_config = cls.get_configuration().general
+        return CodeMap([(general_config.male_gender_code, AdministrativeGender.MALE.value),
+                        (general_config.female_gender_code, AdministrativeGender.FEMALE.value),
+                        (general_config.other_gender_code, AdministrativeGender.OTHER.value)])
 
     @classmethod
-    def build_fhir_addresses(cls, fhir_patient, imis_insuree):
-        addresses = []
-        if imis_insuree.current_address is not None:
-            current_address = cls.build_fhir_address(imis_insuree.current_address, AddressUse.HOME.value,
-                                                     AddressType.PHYSICAL.value)
-            addresses.append(current_address)
-        if imis_insuree.geolocation is not None:
-            geolocation = cls.build_fhir_address(imis_insuree.geolocation, AddressUse.HOME.value,
-                                                 AddressType.BOTH.value)
-            addresses.append(geolocation)
-        fhir_patient.address = addresses
+    def get_marital_status_map(cls):
+        return cls.get_code_map('marital_status', cls.build_marital_status_map)
 
     @classmethod
-    def build_imis_addresses(cls, imis_insuree, fhir_patient):
-        addresses = fhir_patient.address
-        if addresses is not None:
-            for address in addresses:
-                if address.type == AddressType.PHYSICAL.value:
-                    imis_insuree.current_address = address.text
-                elif address.type == AddressType.BOTH.value:
-                    imis_insuree.geolocation = address.text
+    def build_marital_status_map(cls):
+        marital_config = cls.get_configuration().marital
+        system = marital_config.fhir_marital_status_system
+        return CodeMap([(ImisMaritalStatus.MARRIED.value, marital_config.fhir_married_code),
+                        (ImisMaritalStatus.SINGLE.value, marital_config.fhir_never_married_code),
+                        (ImisMaritalStatus.DIVORCED.value, marital_config.fhir_divorced_code),
+                        (ImisMaritalStatus.WIDOWED.value, marital_config.fhir_widowed_code),
+                        (ImisMaritalStatus.NOT_SPECIFIED.value, marital_config.fhir_unknown_marital_status_code)],
+                       system, lambda imis_code, fhir_code: cls.build_constant_codeable_concept(fhir_code, system))
 
     @classmethod
     def build_fhir_extentions(cls, fhir_patient, imis_insuree):
@@ -46,7 +46,7 @@ class PolicyEligibilityRequestConverter(BaseFHIRConverter):
     @classmethod
     def build_fhir_generic_benefit_balance(cls, code):
         benefit_balance = InsuranceBenefitBalance()
-        benefit_balance.category = cls.build_simple_codeable_concept(
+        benefit_balance.category = cls.build_constant_simple_codeable_concept(
             Config.get_fhir_balance_default_category())
         return benefit_balance
 
@@ -64,7 +64,7 @@ class PolicyEligibilityRequestConverter(BaseFHIRConverter):
     @classmethod
     def build_fhir_generic_benefit_balance_financial(cls):
         financial = InsuranceBenefitBalanceFinancial()
-        financial.type = cls.build_simple_codeable_concept(
+        financial.type = cls.build_constant_simple_codeable_concept(
             Config.get_fhir_financial_code())
         return financial
 
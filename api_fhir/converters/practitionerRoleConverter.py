@@ -13,6 +13,11 @@ class PractitionerRoleConverter(BaseFHIRConverter):
         cls.build_fhir_location_references(fhir_practitioner_role, imis_claim_admin)
         return fhir_practitioner_role
 
+    @classmethod
+    def get_summary_elements(cls):
+        return frozenset(['identifier', 'active', 'period', 'practitioner', 'organization', 'code',
+                          'specialty', 'location', 'healthcareService', 'telecom', 'endpoint'])
+
     @classmethod
     def to_imis_obj(cls, fhir_practitioner_role, audit_user_id):
         errors = []
@@ -2,6 +2,7 @@ import inspect
 
 from api_fhir.exceptions import FHIRRequestProcessException
 from api_fhir.models import Reference
+from api_fhir.utils import DbManagerUtils, IdentityMap
 
 
 class ReferenceConverterMixin(object):
@@ -14,9 +15,77 @@ class ReferenceConverterMixin(object):
     def get_fhir_resource_type(cls):
         raise NotImplementedError('`get_fhir_resource_type()` must be implemented.')  # pragma: no cover
 
+    @classmethod
+    def get_reference_imis_model(cls):
+        # the IMIS model of the referenced objects, `None` if the references aren't resolved
+        return None
+
+    @classmethod
+    def get_reference_imis_field(cls):
+        # the field of the IMIS model matched by the id of the reference
+        return 'uuid'
+
     @classmethod
     def get_imis_obj_by_fhir_reference(cls, reference, errors=None):
-        raise NotImplementedError('`get_imis_object_by_fhir_reference()` must be implemented.')  # pragma: no cover
+        resource_id = cls.get_resource_id_from_reference(reference)
+        model = cls.get_reference_imis_model()
+        if model is None:
+            raise NotImplementedError('`get_reference_imis_model()` must be implemented.')  # pragma: no cover
+        identity_map = IdentityMap.get_current()
+        if identity_map is not None:
+            return identity_map.get(model, cls.get_reference_imis_field(), resource_id)
+        return DbManagerUtils.get_object_or_none(model, **{cls.get_reference_imis_field(): resource_id})
+
+    @classmethod
+    def resolve_references(cls, references):
+        # loads the IMIS objects of all the references (the `reference` strings) with one query per resource type
+        # into the identity map of the request, `get_imis_obj_by_fhir_reference()` then finds them there
+        identity_map = IdentityMap.get_current()
+        if identity_map is None:
+            return
+        converters = cls.get_reference_converters()
+        resource_ids = {}
+        for value in references:
+            if isinstance(value, str) and '/' in value:
+                path, resource_id = value.rsplit('/', 1)
+                converter = converters.get(path.rsplit('/', 1)[-1])
+                if converter is not None:
+                    resource_ids.setdefault(converter, []).append(resource_id)
+        for converter, ids in resource_ids.items():
+            identity_map.load(converter.get_reference_imis_model(), converter.get_reference_imis_field(), ids)
+
+    @classmethod
+    def collect_references(cls, fhir_obj):
+        return [obj.reference for obj in fhir_obj.iter_objects() if isinstance(obj, Reference)]
+
+    @classmethod
+    def collect_raw_references(cls, value, references=None):
+        # the `reference` strings of a JSON payload, read from the raw dicts so that a lazily parsed resource
+        # isn't parsed for them
+        if references is None:
+            references = []
+        if isinstance(value, dict):
+            for name, item in value.items():
+                if name == 'reference' and isinstance(item, str):
+                    references.append(item)
+                else:
+                    cls.collect_raw_references(item, references)
+        elif isinstance(value, list):
+            for item in value:
+                cls.collect_raw_references(item, references)
+        return references
+
+    @classmethod
+    def get_reference_converters(cls):
+        # the converters resolving the references by the name of their resource type
+        converters = {}
+        subclasses = list(ReferenceConverterMixin.__subclasses__())
+        while subclasses:
+            converter = subclasses.pop()
+            subclasses.extend(converter.__subclasses__())
+            if converter.get_reference_imis_model() is not None:
+                converters[converter.__get_fhir_resource_type_as_string()] = converter
+        return converters
 
     @classmethod
     def build_fhir_resource_reference(cls, obj):
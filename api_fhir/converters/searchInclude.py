@@ -0,0 +1,30 @@
+class SearchInclude(object):
+    # the resources of one `_include` (or `_revinclude`) of a search: the `model` objects whose ids are the `field`
+    # values of the IMIS objects of the page, converted by `converter`; they are loaded for the whole page with one
+    # query and every object is converted once. `permission_class` is the permission class of the view of the
+    # included resources, the user needs its GET rights to read them
+
+    def __init__(self, converter, model, field, permission_class):
+        self.converter = converter
+        self.model = model
+        self.field = field
+        self.permission_class = permission_class
+
+    def has_permission(self, user):
+        return user.has_perms(self.permission_class.permissions_get)
+
+    def get_ids(self, imis_objs):
+        ids = dict()
+        for imis_obj in imis_objs:
+            value = getattr(imis_obj, self.field, None)
+            if value is not None:
+                ids[value] = None
+        return list(ids)
+
+    def load(self, imis_objs, user):
+        ids = self.get_ids(imis_objs)
+        if not ids:
+            return []
+        queryset = self.model.get_queryset(None, user).filter(id__in=ids)
+        with self.converter.trusted_construction():
+            return self.converter.to_fhir_objs(queryset)
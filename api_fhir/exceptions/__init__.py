@@ -33,6 +33,12 @@ class PropertyMaxSizeError(PropertyError):
         super(PropertyMaxSizeError, self).__init__(message)
 
 
+class FrozenObjectError(PropertyError):
+    def __init__(self):
+        message = gettext("A frozen FHIR object cannot be changed")
+        super(FrozenObjectError, self).__init__(message)
+
+
 class PropertyTypeError(Exception):
     def __init__(self, local_type, description):
         msg = gettext("Expected '{}' but got '{}' for '{}' property").format(description.type, local_type, description.name)
@@ -1,10 +1,13 @@
 import inspect
 import json
-import sys
+import threading
+from json.encoder import encode_basestring, encode_basestring_ascii
+from collections import OrderedDict
+from contextlib import contextmanager
 
 import math
 from api_fhir.exceptions import PropertyTypeError, PropertyError, PropertyMaxSizeError, InvalidAttributeError, \
-    UnsupportedFormatError, FHIRException
+    UnsupportedFormatError, FHIRException, FrozenObjectError
 from django.utils.translation import gettext
 
 SUPPORTED_FORMATS = ['json']
@@ -19,17 +22,64 @@ class PropertyDefinition(object):
         self.count_max = math.inf if count_max == '*' else int(count_max)
         self.count_min = int(count_min)
         self.required = required
+        self._resolved_type = None
 
+    @property
+    def resolved_type(self):
+        # the type could be a forward reference to a class defined later, so it's resolved on the first use
+        resolved_type = self._resolved_type
+        if resolved_type is None:
+            resolved_type = self._resolved_type = fhir_type_registry.resolve(self.type)
+        return resolved_type
 
-def eval_type(type_name):
-    result = object
-    if isinstance(type_name, str):
-        result = getattr(sys.modules[__name__], type_name)
-    return result
+
+class FHIRTypeRegistry(object):
+
+    def __init__(self):
+        self.types = dict()
+
+    def register(self, class_):
+        self.types[class_.__name__] = class_
+        return class_
+
+    def get(self, type_name):
+        class_ = self.types.get(type_name)
+        if class_ is None:
+            raise FHIRException(gettext('Unknown FHIR type `{}`').format(type_name))
+        return class_
+
+    def resolve(self, property_type):
+        if isinstance(property_type, str):
+            return self.get(property_type)
+        return property_type
+
+
+fhir_type_registry = FHIRTypeRegistry()
+
+
+class ConstructionState(threading.local):
+    trusted = False
+
+
+construction_state = ConstructionState()
+
+
+@contextmanager
+def trusted_construction(validate=False):
+    # values assigned to FHIR objects inside this context come from trusted data (e.g. the openIMIS database),
+    # so they aren't validated unless `validate` is set; parsing of incoming payloads is always validated
+    previous = construction_state.trusted
+    construction_state.trusted = not validate
+    try:
+        yield
+    finally:
+        construction_state.trusted = previous
 
 
 class PropertyMixin(object):
 
+    __slots__ = ()
+
     def validate_type(self, value):
         if value is not None:
             local_type = self.eval_property_type()
@@ -42,33 +92,53 @@ class PropertyMixin(object):
             raise PropertyError(gettext("The value of property {} could't be none").format(self.definition.name))
 
     def eval_property_type(self):
-        property_type = self.definition.type
-        return eval_type(property_type)
+        return self.definition.resolved_type
 
 
 class PropertyList(list, PropertyMixin):
 
+    __slots__ = ('definition',)
+
     def __init__(self, definition, *args, **kwargs):
         super(PropertyList, self).__init__(*args, **kwargs)
         self.definition = definition
 
     def append(self, value):
-        self.validate_type(value)
-        if len(self) >= self.definition.count_max:
-            raise PropertyMaxSizeError(self.definition)
+        if not construction_state.trusted:
+            self.validate_type(value)
+            if len(self) >= self.definition.count_max:
+                raise PropertyMaxSizeError(self.definition)
 
         super(PropertyList, self).append(value)
 
     def insert(self, i, value):
-        self.validate_type(value)
-        if len(self) >= self.definition.count_max:
-            raise PropertyMaxSizeError(self.definition)
+        if not construction_state.trusted:
+            self.validate_type(value)
+            if len(self) >= self.definition.count_max:
+                raise PropertyMaxSizeError(self.definition)
 
         super(PropertyList, self).insert(i, value)
 
 
+class FrozenPropertyList(PropertyList):
+
+    __slots__ = ()
+
+    def _frozen(self, *args, **kwargs):
+        raise FrozenObjectError()
+
+    append = insert = extend = pop = remove = clear = sort = reverse = _frozen
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _frozen
+
+    def __reduce__(self):
+        # the copies aren't frozen
+        return PropertyList, (self.definition, list(self))
+
+
 class Property(PropertyMixin):
 
+    __slots__ = ('definition',)
+
     def __init__(self, name, property_type, count_max=1, count_min=0, required=False):
         assert name.find(' ') < 0, gettext("property shouldn't contain space in `{}`.").format(name)
         self.definition = PropertyDefinition(name, property_type, count_max, count_min, required)
@@ -76,31 +146,449 @@ class Property(PropertyMixin):
     def __get__(self, instance, owner):
         if instance is None:  # instance attribute is accessed on the class
             return self
-        if self.definition.count_max > 1:
-            instance._values.setdefault(self.definition.name, PropertyList(self.definition))
-        return instance._values.get(self.definition.name)
+        value = instance._values.get(self.definition.name)
+        if value is None and self.definition.count_max > 1:
+            value = self.create_property_list(instance)
+        return value
 
     def __set__(self, instance, value):
         if self.definition.count_max > 1:
             if isinstance(value, list):
-                instance._values.setdefault(self.definition.name, PropertyList(self.definition))
-                del instance._values[self.definition.name][:]
-                for item in value:
-                    instance._values[self.definition.name].append(item)
+                property_list = instance._values.get(self.definition.name)
+                if property_list is None:
+                    property_list = self.create_property_list(instance)
+                del property_list[:]
+                if construction_state.trusted:
+                    list.extend(property_list, value)
+                else:
+                    for item in value:
+                        property_list.append(item)
             else:
                 raise PropertyError(gettext("The value of property `{}` need to be a list").format(self.definition.name))
         else:
             if isinstance(value, list):
                 raise PropertyError(gettext("The value of property `{}` shouldn't be a list").format(self.definition.name))
             else:
-                self.validate_type(value)
+                if not construction_state.trusted:
+                    self.validate_type(value)
                 instance._values[self.definition.name] = value
 
+    def create_property_list(self, instance):
+        # lists are created on first access so that unused list properties don't take any memory
+        if instance._values.__class__ is FrozenValues:
+            return FrozenPropertyList(self.definition)
+        property_list = PropertyList(self.definition)
+        instance._values[self.definition.name] = property_list
+        return property_list
+
+
+class PropertyRegistry(object):
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.properties = OrderedDict()
+        for attr in dir(owner):
+            attribute = getattr(owner, attr)
+            if isinstance(attribute, Property) and attribute.definition.name not in self.properties:
+                name = attribute.definition.name
+                property_ = getattr(owner, name, attribute)
+                self.properties[name] = property_ if isinstance(property_, Property) else attribute
+        self.names = tuple(self.properties)
+        self.names_set = frozenset(self.names)
+        self.types = {name: property_.definition.resolved_type for name, property_ in self.properties.items()}
+        self.is_resource = issubclass(owner, Resource)
+        self.json_resource_type_prefix = '{' + json.dumps('resourceType')
+        self.json_properties = tuple((name, json.dumps(name), property_.definition.count_max > 1)
+                                     for name, property_ in self.properties.items())
+        self.to_dict_function = None
+        self.property_parsers = None
+        self.lazy_property_parsers = None
+
+    def create_instance(self, values=None):
+        instance = self.owner.__new__(self.owner)
+        object.__setattr__(instance, '_values', dict() if values is None else values)
+        return instance
+
+    def get_property_parsers(self):
+        if self.property_parsers is None:
+            self.property_parsers = self.build_property_parsers()
+        return self.property_parsers
+
+    def get_lazy_property_parsers(self):
+        if self.lazy_property_parsers is None:
+            self.lazy_property_parsers = self.build_property_parsers(lazy=True)
+        return self.lazy_property_parsers
+
+    def parse(self, object_dict, instance=None):
+        if instance is None:
+            instance = self.create_instance()
+        property_parsers = self.get_property_parsers()
+        values = instance._values
+        for name, obj in object_dict.items():
+            property_parser = property_parsers.get(name)
+            if property_parser is None:
+                raise InvalidAttributeError(name, self.owner.__name__)
+            value = property_parser(obj)
+            if value is not None:
+                values[name] = value
+        return instance
+
+    def parse_lazy(self, object_dict):
+        # the primitive values are parsed at once, the nested objects and lists are kept as they are and parsed
+        # (and validated) when they are read for the first time, lazily too
+        property_parsers = self.get_lazy_property_parsers()
+        values = dict()
+        raw = None
+        for name, obj in object_dict.items():
+            property_parser = property_parsers.get(name)
+            if property_parser is None:
+                raise InvalidAttributeError(name, self.owner.__name__)
+            if isinstance(obj, (dict, list)):
+                if raw is None:
+                    raw = dict()
+                raw[name] = obj
+            else:
+                value = property_parser(obj)
+                if value is not None:
+                    values[name] = value
+        if raw is not None:
+            values = LazyValues(values, raw, property_parsers)
+        return self.create_instance(values)
+
+    def build_property_parsers(self, lazy=False):
+        return {name: self.build_property_parser(name, lazy) for name in self.names}
+
+    def build_property_parser(self, name, lazy=False):
+        # builds a function turning the json value of the property into its validated value, equivalent to
+        # creating the value in the generic way and assigning it through the `Property` descriptor
+        property_ = self.properties[name]
+        definition = property_.definition
+        type_ = self.types[name]
+        is_fhir_object = inspect.isclass(type_) and issubclass(type_, FHIRBaseObject)
+        is_resource = is_fhir_object and issubclass(type_, Resource)
+        is_date = type_ is FHIRDate
+
+        def parse_resource(obj):
+            resource_type = obj.pop('resourceType', None)
+            if not resource_type:
+                raise FHIRException(gettext('Missing `resourceType` attribute'))
+            registry = fhir_type_registry.get(resource_type)._get_registry()
+            return registry.parse_lazy(obj) if lazy else registry.parse(obj)
+
+        def parse_value(obj):
+            if isinstance(obj, dict):
+                if is_resource:
+                    return parse_resource(obj)
+                if not is_fhir_object:
+                    raise PropertyTypeError(type(obj).__name__, definition)
+                registry = type_._get_registry()
+                return registry.parse_lazy(obj) if lazy else registry.parse(obj)
+            elif isinstance(obj, list):
+                if is_resource:
+                    return [parse_resource(item) for item in obj]
+                if is_fhir_object:
+                    registry = type_._get_registry()
+                    parse = registry.parse_lazy if lazy else registry.parse
+                    return [parse(item) for item in obj]
+                return obj
+            elif obj is None or is_date or obj.__class__ is type_:
+                return obj
+            elif is_fhir_object:
+                raise PropertyTypeError(type(obj).__name__, definition)
+            try:
+                return type_(obj)
+            except TypeError:
+                raise PropertyTypeError(type(obj).__name__, definition)
+
+        if definition.count_max > 1:
+            validate_items = is_date or definition.required
+
+            def parse_property(obj):
+                value = parse_value(obj)
+                if value is None:
+                    return None
+                if not isinstance(value, list):
+                    raise PropertyError(gettext("The value of property `{}` need to be a list").format(name))
+                if len(value) > definition.count_max:
+                    raise PropertyMaxSizeError(definition)
+                if validate_items:
+                    for item in value:
+                        property_.validate_type(item)
+                return PropertyList(definition, value)
+        else:
+            def parse_property(obj):
+                value = parse_value(obj)
+                if isinstance(value, list):
+                    raise PropertyError(gettext("The value of property `{}` shouldn't be a list").format(name))
+                if is_date and value is not None:
+                    property_.validate_type(value)
+                return value
+
+        return parse_property
+
+    def get_to_dict_function(self):
+        if self.to_dict_function is None:
+            self.to_dict_function = self.build_to_dict_function()
+        return self.to_dict_function
+
+    def build_to_dict_function(self):
+        # generates the equivalent of the generic `toDict()` loop unrolled for the properties of the owner class
+        lines = ['def to_dict(self):', '    values = self._values']
+        if issubclass(self.owner, Resource):
+            lines.append('    retval = {{"resourceType": {!r}}}'.format(self.owner.__name__))
+        else:
+            lines.append('    retval = {}')
+        for name, property_ in self.properties.items():
+            lines.append('    value = values.get({!r})'.format(name))
+            if property_.definition.count_max > 1:
+                lines.append('    if value:')
+                lines.append('        retval[{!r}] = [v.toDict() if isinstance(v, FHIRBaseObject) else v '
+                             'for v in value]'.format(name))
+            else:
+                lines.append('    if isinstance(value, FHIRBaseObject):')
+                lines.append('        value = value.toDict()')
+                lines.append('        if value:')
+                lines.append('            retval[{!r}] = value'.format(name))
+                lines.append('    elif value is not None:')
+                lines.append('        retval[{!r}] = value'.format(name))
+        lines.append('    return retval')
+        namespace = {'FHIRBaseObject': FHIRBaseObject}
+        exec('\n'.join(lines), namespace)
+        return namespace['to_dict']
+
+    def validate(self, instance):
+        # validates the values like they are validated when they are assigned, the lazily parsed values are parsed
+        values = instance._values
+        for name, property_ in self.properties.items():
+            value = values.get(name)
+            if value is None:
+                continue
+            if property_.definition.count_max > 1:
+                if len(value) > property_.definition.count_max:
+                    raise PropertyMaxSizeError(property_.definition)
+                for item in value:
+                    property_.validate_type(item)
+                    if isinstance(item, FHIRBaseObject):
+                        item.validate()
+            else:
+                property_.validate_type(value)
+                if isinstance(value, FHIRBaseObject):
+                    value.validate()
+
+    def has_content(self, instance):
+        # tells whether `toDict()` of the instance would give a non empty dict
+        if self.is_resource:
+            return True
+        values = instance._values
+        if values.__class__ is FrozenValues:
+            return bool(values.rendered)
+        for value in values.values():
+            if isinstance(value, FHIRBaseObject):
+                if value._get_registry().has_content(value):
+                    return True
+            elif value is not None and (value or not isinstance(value, list)):
+                return True
+        return False
+
+    def to_json_dict(self, instance):
+        # the top level of `toDict()`, the nested FHIR objects are kept for the JSON encoders converting them when
+        # they get to them
+        values = instance._values
+        if values.__class__ is FrozenValues:
+            return values.rendered
+        retval = {'resourceType': self.owner.__name__} if self.is_resource else {}
+        for name, key, is_list in self.json_properties:
+            value = values.get(name)
+            if value is None:
+                continue
+            if is_list:
+                if value:
+                    retval[name] = value
+            elif not isinstance(value, FHIRBaseObject) or value._get_registry().has_content(value):
+                retval[name] = value
+        return retval
+
+    def write_json(self, instance, write, encode_value, item_separator, key_separator):
+        # writes the same JSON as `encoder.encode(instance.toDict())` walking the object graph, so the nested dicts
+        # are never built
+        values = instance._values
+        if values.__class__ is FrozenValues:
+            write(encode_value(values.rendered))
+            return
+        separator = '{'
+        if self.is_resource:
+            write(self.json_resource_type_prefix + key_separator + encode_value(self.owner.__name__))
+            separator = item_separator
+        for name, key, is_list in self.json_properties:
+            value = values.get(name)
+            if value is None:
+                continue
+            if is_list:
+                if value:
+                    write(separator + key + key_separator)
+                    separator = item_separator
+                    list_separator = '['
+                    for item in value:
+                        write(list_separator)
+                        list_separator = item_separator
+                        if isinstance(item, FHIRBaseObject):
+                            item._get_registry().write_json(item, write, encode_value, item_separator, key_separator)
+                        else:
+                            write(encode_value(item))
+                    write(']')
+            elif isinstance(value, FHIRBaseObject):
+                registry = value._get_registry()
+                if registry.has_content(value):
+                    write(separator + key + key_separator)
+                    separator = item_separator
+                    registry.write_json(value, write, encode_value, item_separator, key_separator)
+            else:
+                write(separator + key + key_separator)
+                separator = item_separator
+                write(encode_value(value))
+        write('{}' if separator == '{' else '}')
+
+    def freeze(self, instance):
+        # makes the instance and its nested objects immutable and renders its `toDict()` once, the frozen objects
+        # can be shared by any number of FHIR objects
+        values = instance._values
+        if values.__class__ is FrozenValues:
+            return instance
+        frozen_values = dict()
+        for name, value in values.items():
+            if isinstance(value, FHIRBaseObject):
+                value = value.freeze()
+            elif isinstance(value, list):
+                value = FrozenPropertyList(self.properties[name].definition,
+                                           [item.freeze() if isinstance(item, FHIRBaseObject) else item
+                                            for item in value])
+            frozen_values[name] = value
+        object.__setattr__(instance, '_values', frozen_values)
+        rendered = self.get_to_dict_function()(instance)
+        object.__setattr__(instance, '_values', FrozenValues(frozen_values, rendered))
+        return instance
+
+
+class LazyValues(dict):
+    # values of a lazily parsed FHIR object, the raw JSON values are parsed by the property parsers when they are
+    # read for the first time
+
+    __slots__ = ('raw', 'property_parsers')
+
+    def __init__(self, values, raw, property_parsers):
+        super(LazyValues, self).__init__(values)
+        self.raw = raw
+        self.property_parsers = property_parsers
+
+    def get(self, name, default=None):
+        if name in self.raw:
+            self.parse(name)
+        return dict.get(self, name, default)
+
+    def __setitem__(self, name, value):
+        self.raw.pop(name, None)
+        dict.__setitem__(self, name, value)
+
+    def values(self):
+        self.parse_all()
+        return dict.values(self)
+
+    def items(self):
+        self.parse_all()
+        return dict.items(self)
+
+    def __reduce__(self):
+        # the copies are plain dicts of the parsed values
+        return dict, (dict(self.items()),)
+
+    def parse(self, name):
+        value = self.property_parsers[name](self.raw[name])
+        del self.raw[name]
+        if value is not None:
+            dict.__setitem__(self, name, value)
+
+    def parse_all(self):
+        for name in list(self.raw):
+            self.parse(name)
+
+
+class FrozenValues(dict):
+    # values of a frozen FHIR object with its pre-rendered `toDict()`; the rendered dict is shared by every
+    # `toDict()` of the object and the objects containing it, so it mustn't be modified
+
+    __slots__ = ('rendered',)
+
+    def __init__(self, values, rendered):
+        super(FrozenValues, self).__init__(values)
+        self.rendered = rendered
+
+    def _frozen(self, *args, **kwargs):
+        raise FrozenObjectError()
+
+    __setitem__ = __delitem__ = pop = popitem = setdefault = update = clear = _frozen
+
+    def __reduce__(self):
+        # the copies aren't frozen
+        return dict, (dict(self),)
+
+
+class FHIRFlyweightCache(object):
+    # interned frozen FHIR objects, e.g. the codeable concepts built from the module configuration, which are equal
+    # for every converted resource; the cache is cleared when the module is configured
+
+    def __init__(self):
+        self.objects = dict()
+
+    def get(self, key, factory):
+        fhir_object = self.objects.get(key)
+        if fhir_object is None:
+            fhir_object = self.objects.setdefault(key, factory().freeze())
+        return fhir_object
+
+    def clear(self):
+        self.objects.clear()
+
+
+fhir_flyweight_cache = FHIRFlyweightCache()
+
+
+class JSONWriter(object):
+    # writes FHIR objects as JSON to a file-like object; the `encoder` (a `json.JSONEncoder` without indentation)
+    # gives the separators and encodes the values, the output is equal to `encoder.encode(fhir_object.toDict())`
+
+    def __init__(self, fp, encoder=None):
+        if encoder is None:
+            encoder = json.JSONEncoder(separators=(',', ':'))
+        assert encoder.indent is None, gettext('The FHIR objects are written without indentation')
+        self.fp = fp
+        self.encoder = encoder
+        self.encode_string = encode_basestring_ascii if encoder.ensure_ascii else encode_basestring
+
+    def write(self, fhir_object):
+        fhir_object._get_registry().write_json(fhir_object, self.fp.write, self.encode_value,
+                                                self.encoder.item_separator, self.encoder.key_separator)
+
+    def encode_value(self, value):
+        if isinstance(value, str):
+            return self.encode_string(value)
+        return self.encoder.encode(value)
+
+
+class FHIRObjectType(type):
+
+    def __new__(mcs, name, bases, namespace):
+        # FHIR models keep their values in `_values`, so instances don't need a `__dict__`
+        namespace.setdefault('__slots__', ())
+        return fhir_type_registry.register(super(FHIRObjectType, mcs).__new__(mcs, name, bases, namespace))
+
+
+class FHIRBaseObject(object, metaclass=FHIRObjectType):
+
+    __slots__ = ('_values',)
 
-class FHIRBaseObject(object):
     def __init__(self, **kwargs):
-        self._set_properties(**kwargs)
         self._values = dict()
+        self._set_properties(**kwargs)
 
     def _set_properties(self, **kwargs):
         for attr, value in kwargs.items():
@@ -110,14 +598,17 @@ class FHIRBaseObject(object):
         self.valid_fhir_attribute(attr)
         super().__setattr__(attr, value)
 
+    @classmethod
+    def _get_registry(cls):
+        registry = cls.__dict__.get('_property_registry')
+        if registry is None:
+            registry = PropertyRegistry(cls)
+            cls._property_registry = registry
+        return registry
+
     @classmethod
     def _get_properties(cls):
-        properties_names = []
-        for attr in dir(cls):
-            attribute = getattr(cls, attr)
-            if cls.is_property(attribute):
-                properties_names.append(attribute.definition.name)
-        return properties_names
+        return list(cls._get_registry().names)
 
     @classmethod
     def is_property(cls, object_):
@@ -126,80 +617,56 @@ class FHIRBaseObject(object):
     @classmethod
     def _get_property_details_for_name(cls, name):
         cls.valid_fhir_attribute(name)
-        property_ = getattr(cls, name)
-        type_ = property_.definition.type
-        if isinstance(type_, str):
-            type_ = eval_type(type_)
-
-        return property_, type_
+        registry = cls._get_registry()
+        return registry.properties[name], registry.types[name]
 
     @classmethod
     def valid_fhir_attribute(cls, name):
-        if name not in cls._get_properties() and not name.startswith('_'):
+        if name not in cls._get_registry().names_set and not name.startswith('_'):
             raise InvalidAttributeError(name, cls.__name__)
 
     @classmethod
-    def loads(cls, string, format_='json'):
+    def loads(cls, string, format_='json', lazy=False):
         if format_ in SUPPORTED_FORMATS:
             format_ = format_.upper()
             func = getattr(cls, 'from' + format_)
-            return func(string)
+            return func(string, lazy=lazy)
 
         raise UnsupportedFormatError(format_)
 
     @classmethod
-    def fromJSON(cls, json_string):
+    def fromJSON(cls, json_string, lazy=False):
         json_dict = json.loads(json_string)
         resource_type = json_dict.pop('resourceType')
 
         if resource_type != cls.__name__:
-            class_ = eval_type(resource_type)
-            if class_ is object or not issubclass(class_, cls):
+            class_ = fhir_type_registry.get(resource_type)
+            if not issubclass(class_, cls):
                 raise FHIRException(gettext('Cannot marshall a {} from a {}: not a subclass!').format(class_,
                                                                                                       cls.__name__))
-            return class_()._fromDict(json_dict)
-        return cls()._fromDict(json_dict)
+            return class_._parse(json_dict, lazy)
+        return cls._parse(json_dict, lazy)
 
     @classmethod
-    def fromDict(cls, object_dict):
+    def fromDict(cls, object_dict, lazy=False):
         if not object_dict.get('resourceType'):
             raise FHIRException(gettext('Missing `resourceType` attribute'))
         resource_type = object_dict.pop('resourceType')
-        class_ = eval_type(resource_type)
-        return class_()._fromDict(object_dict)
+        class_ = fhir_type_registry.get(resource_type)
+        return class_._parse(object_dict, lazy)
 
-    def _fromDict(self, object_dict):
-        for attr, obj in object_dict.items():
-
-            prop, prop_type = self._get_property_details_for_name(attr)
-            value = None
-            if inspect.isclass(prop_type) and issubclass(prop_type, Resource):
-                resourceType = obj.pop('resourceType')
-                class_ = eval_type(resourceType)
-                value = class_()._fromDict(obj)
-            elif isinstance(obj, dict):
-                # Complex type
-                value = prop_type()
-                value._fromDict(obj)
-            elif isinstance(obj, list):
-                # Could be a list of dicts or simple values;
-                value = []
-                for i in obj:
-                    if issubclass(prop_type, FHIRBaseObject):
-                        value.append(prop_type()._fromDict(i))
-                    else:
-                        value.append(i)
-            elif prop_type is FHIRDate:
-                value = obj
-            elif obj is not None:
-                try:
-                    value = prop_type(obj)
-                except TypeError:
-                    raise PropertyTypeError(type(obj).__name__, prop.definition)
+    @classmethod
+    def _parse(cls, object_dict, lazy=False):
+        # in the lazy mode the nested objects are built (and validated) when they are accessed for the first time
+        # or by `validate()`
+        registry = cls._get_registry()
+        return registry.parse_lazy(object_dict) if lazy else registry.parse(object_dict)
 
-            if value is not None:
-                setattr(self, prop.definition.name, value)
-        return self
+    def validate(self):
+        self._get_registry().validate(self)
+
+    def _fromDict(self, object_dict):
+        return self._get_registry().parse(object_dict, self)
 
     def dumps(self, format_='json'):
         if format_ in SUPPORTED_FORMATS:
@@ -211,32 +678,31 @@ class FHIRBaseObject(object):
     def toJSON(self):
         return json.dumps(self.toDict(), indent=2)
 
-    def toDict(self):
-        retval = dict()
+    def write_json(self, fp, encoder=None):
+        JSONWriter(fp, encoder).write(self)
 
-        if isinstance(self, Resource):
-            retval['resourceType'] = self.__class__.__name__
+    def iter_objects(self):
+        # the object and all the FHIR objects nested in it, depth first
+        yield self
+        for value in self._values.values():
+            if isinstance(value, FHIRBaseObject):
+                yield from value.iter_objects()
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, FHIRBaseObject):
+                        yield from item.iter_objects()
 
-        for attr in self._get_properties():
-            value = getattr(self, attr)
+    def freeze(self):
+        return self._get_registry().freeze(self)
 
-            if isinstance(value, FHIRBaseObject):
-                json_dict = value.toDict()
-                if json_dict:
-                    retval[attr] = json_dict
-            elif isinstance(value, PropertyList):
-                results = list()
-                for v in value:
-                    if isinstance(v, FHIRBaseObject):
-                        results.append(v.toDict())
-                    else:
-                        results.append(v)
-                if results:
-                    retval[attr] = results
-            else:
-                if value is not None:
-                    retval[attr] = value
-        return retval
+    def is_frozen(self):
+        return self._values.__class__ is FrozenValues
+
+    def toDict(self):
+        values = self._values
+        if values.__class__ is FrozenValues:
+            return values.rendered
+        return self._get_registry().get_to_dict_function()(self)
 
 
 from api_fhir.models.element import Element
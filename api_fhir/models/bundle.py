@@ -71,3 +71,9 @@ class BundleLinkRelation(Enum):
     PREVIOUS = "previous"
     LAST = "last"
     FIRST = "first"
+
+
+class BundleEntrySearchMode(Enum):
+    MATCH = "match"
+    INCLUDE = "include"
+    OUTCOME = "outcome"
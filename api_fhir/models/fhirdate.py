@@ -1,23 +1,140 @@
+import datetime
 import re
+from functools import lru_cache
 
+from api_fhir.models import fhir_type_registry
+from django.utils.translation import gettext
 
+_YEAR = '([0-9]([0-9]([0-9][1-9]|[1-9]0)|[1-9]00)|[1-9]000)'
+_MONTH = '(0[1-9]|1[0-2])'
+_DAY = '(0[1-9]|[1-2][0-9]|3[0-1])'
+_TIME = '([01][0-9]|2[0-3]):[0-5][0-9]:([0-5][0-9]|60)(\\.[0-9]+)?'
+_TIME_ZONE = '(Z|(\\+|-)((0[0-9]|1[0-3]):[0-5][0-9]|14:00))'
+
+# the most common shapes, checked first and validated by the ranges of their fields and parsed without the generic
+# patterns
+_FULL_DATE_PATTERN = re.compile('([0-9]{4})-([0-9]{2})-([0-9]{2})')
+_FULL_DATETIME_PATTERN = re.compile('([0-9]{4})-([0-9]{2})-([0-9]{2})T([0-9]{2}):([0-9]{2}):([0-9]{2})(?:\\.([0-9]+))?'
+                                    '(Z|[+-][0-9]{2}:[0-9]{2})?')
+_TIME_PATTERN = re.compile('([0-9]{2}):([0-9]{2}):([0-9]{2})(?:\\.([0-9]+))?')
+
+
+@fhir_type_registry.register
 class FHIRDate(object):
+    # a FHIR date, dateTime or time value; the FHIR objects keep these values as strings, the `FHIRDate` validates
+    # them and parses them into the `date`, `datetime` or `time` objects
+
+    __slots__ = ('value',)
+
+    # the time zone is optional in a dateTime, the converters use `isoformat()` of the naive datetime objects
+    _datetime_regex = _YEAR + '(-' + _MONTH + '(-' + _DAY + '(T' + _TIME + _TIME_ZONE + '?)?)?)?'
+    _date_regex = _YEAR + '(-' + _MONTH + '(-' + _DAY + ')?)?'
+    _time_regex = _TIME
+
+    _patterns = (re.compile(_date_regex), re.compile(_datetime_regex), re.compile(_time_regex))
+
+    def __init__(self, value):
+        if not self.validate_type(value):
+            raise ValueError(gettext('Value "{}" is not a valid value of FHIRDate').format(value))
+        self.value = value
+
+    def __str__(self):
+        return self.value
 
-    date = None
-    _datetime_regex = '([0-9]([0-9]([0-9][1-9]|[1-9]0)|[1-9]00)|[1-9]000)(-(0[1-9]|1[0-2])(-(0[1-9]|[1-2][0-9]|3[' \
-                      '0-1])(T([01][0-9]|2[0-3]):[0-5][0-9]:([0-5][0-9]|60)(\\.[0-9]+)?(Z|(\\+|-)((0[0-9]|1[0-3]):[' \
-                      '0-5][0-9]|14:00)))?)?)?'
-    _date_regex = '([0-9]([0-9]([0-9][1-9]|[1-9]0)|[1-9]00)|[1-9]000)(-(0[1-9]|1[0-2])(-(0[1-9]|[1-2][0-9]|3[0-1]))?)?'
-    _time_regex = '([01][0-9]|2[0-3]):[0-5][0-9]:([0-5][0-9]|60)(\\.[0-9]+)?'
+    def __repr__(self):
+        return 'FHIRDate({!r})'.format(self.value)
+
+    def __eq__(self, other):
+        return isinstance(other, FHIRDate) and self.value == other.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def to_python(self):
+        return self.parse(self.value)
 
     @classmethod
     def validate_type(cls, value):
-        valid = False
-        if value and isinstance(value, str):
-            if re.search(cls._datetime_regex, value):
-                valid = True
-            if not valid and re.search(cls._date_regex, value):
-                valid = True
-            if not valid and re.search(cls._time_regex, value):
-                valid = True
+        return isinstance(value, str) and validate_fhir_date(value)
+
+    @classmethod
+    def parse(cls, value):
+        # `date` for the full dates, `datetime` for the dateTimes with time, `time` for the times and the `date` of
+        # the first day of the period for the partial dates (`YYYY` or `YYYY-MM`)
+        if not cls.validate_type(value):
+            raise ValueError(gettext('Value "{}" is not a valid value of FHIRDate').format(value))
+        return parse_fhir_date(value)
+
+
+@lru_cache(maxsize=4096)
+def validate_fhir_date(value):
+    valid = validate_common_fhir_date(value)
+    if valid is not None:
         return valid
+    for pattern in FHIRDate._patterns:
+        if pattern.fullmatch(value):
+            return True
+    return False
+
+
+def validate_common_fhir_date(value):
+    # the validity of the values of the most common shapes, `None` for the other shapes; the fields are compared as
+    # strings of the same length
+    match = _FULL_DATE_PATTERN.fullmatch(value)
+    if match:
+        return validate_date_fields(*match.groups())
+    match = _FULL_DATETIME_PATTERN.fullmatch(value)
+    if match:
+        year, month, day, hour, minute, second, _, time_zone = match.groups()
+        return validate_date_fields(year, month, day) and validate_time_fields(hour, minute, second) and \
+            validate_time_zone(time_zone)
+    match = _TIME_PATTERN.fullmatch(value)
+    if match:
+        hour, minute, second, _ = match.groups()
+        return validate_time_fields(hour, minute, second)
+    return None
+
+
+def validate_date_fields(year, month, day):
+    return year != '0000' and '01' <= month <= '12' and '01' <= day <= '31'
+
+
+def validate_time_fields(hour, minute, second):
+    return hour <= '23' and minute <= '59' and second <= '60'
+
+
+def validate_time_zone(time_zone):
+    if time_zone is None or time_zone == 'Z':
+        return True
+    return (time_zone[1:3] <= '13' and time_zone[4:6] <= '59') or time_zone[1:] == '14:00'
+
+
+@lru_cache(maxsize=4096)
+def parse_fhir_date(value):
+    match = _FULL_DATE_PATTERN.fullmatch(value)
+    if match:
+        return datetime.date(*map(int, match.groups()))
+    match = _FULL_DATETIME_PATTERN.fullmatch(value)
+    if match:
+        year, month, day, hour, minute, second, fraction, time_zone = match.groups()
+        return datetime.datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                                 parse_microsecond(fraction), parse_time_zone(time_zone))
+    match = _TIME_PATTERN.fullmatch(value)
+    if match:
+        hour, minute, second, fraction = match.groups()
+        return datetime.time(int(hour), int(minute), int(second), parse_microsecond(fraction))
+    parts = [int(part) for part in value.split('-')]
+    return datetime.date(*(parts + [1] * (3 - len(parts))))
+
+
+def parse_microsecond(fraction):
+    return int(fraction[:6].ljust(6, '0')) if fraction else 0
+
+
+def parse_time_zone(time_zone):
+    if not time_zone:
+        return None
+    elif time_zone == 'Z':
+        return datetime.timezone.utc
+    offset = datetime.timedelta(hours=int(time_zone[1:3]), minutes=int(time_zone[4:6]))
+    return datetime.timezone(-offset if time_zone[0] == '-' else offset)
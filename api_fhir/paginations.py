@@ -1,26 +1,184 @@
+from enum import Enum
+
+from django.core.paginator import Paginator, Page, EmptyPage, PageNotAnInteger, InvalidPage
+from django.db.models import QuerySet
+from django.utils.translation import gettext
+
 from api_fhir.configurations import GeneralConfiguration
-from api_fhir.models import Bundle, BundleEntry, BundleType, BundleLink
-from api_fhir.models.bundle import BundleLinkRelation
+from api_fhir.converters import BaseFHIRConverter
+from api_fhir.models import Bundle, BundleEntry, BundleEntrySearch, BundleType, BundleLink, FHIRBaseObject
+from api_fhir.models.bundle import BundleLinkRelation, BundleEntrySearchMode
+from api_fhir.utils import QueryCountEstimator, FhirUtils, SearchSummary
 
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from rest_framework.response import Response
 
+query_count_estimator = QueryCountEstimator()
+
+
+class PaginationMode(Enum):
+    PAGE = "page"
+    CURSOR = "cursor"
+
+
+class SearchTotal(Enum):
+    NONE = "none"
+    ESTIMATE = "estimate"
+    ACCURATE = "accurate"
+
+
+class FhirSearchPage(Page):
+
+    def __init__(self, object_list, number, paginator, has_next_page):
+        super().__init__(object_list, number, paginator)
+        self.has_next_page = has_next_page
+
+    def has_next(self):
+        return self.has_next_page
+
+
+class FhirSearchPaginator(Paginator):
+    # reads a page without counting the rows, the row following the page tells if there is a next one; the count is
+    # known without a query once the last page is read
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(gettext('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(gettext('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(gettext('That page contains no results'))
+        has_next_page = len(rows) > self.per_page
+        if not has_next_page:
+            self.count = bottom + len(rows)
+        return FhirSearchPage(rows[:self.per_page], number, self, has_next_page)
+
+
+class FhirBundleCursorPagination(CursorPagination):
+    # the keyset pagination, the page is the rows following the `id` of the opaque cursor so a deep page doesn't
+    # scan the rows before it like an `OFFSET` does
+
+    page_size = GeneralConfiguration.get_default_response_page_size()
+    cursor_query_param = '_cursor'
+    page_size_query_param = '_count'
+    ordering = 'id'
+    template = None
+
 
 class FhirBundleResultsSetPagination(PageNumberPagination):
 
     page_size = GeneralConfiguration.get_default_response_page_size()
     page_query_param = 'page-offset'
     page_size_query_param = '_count'
+    total_query_param = '_total'
+    django_paginator_class = FhirSearchPaginator
+    cursor_pagination_class = FhirBundleCursorPagination
+
+    def __init__(self):
+        self.cursor_pagination = None
+        self.queryset = None
+        self.summary = None
+        self.included_resources = []
+
+    def get_pagination_mode(self, request):
+        # a `_cursor` (empty for the first page) selects the cursor mode, a `page-offset` the page mode, the
+        # configured mode is used otherwise
+        if self.cursor_pagination_class.cursor_query_param in request.query_params:
+            return PaginationMode.CURSOR.value
+        if self.page_query_param in request.query_params:
+            return PaginationMode.PAGE.value
+        return GeneralConfiguration.get_default_pagination_mode()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.queryset = queryset
+        self.summary = FhirUtils.get_requested_summary(request.query_params)
+        if self.summary == SearchSummary.COUNT.value:
+            # only the total is returned, no row is read
+            return []
+        if self.get_pagination_mode(request) == PaginationMode.CURSOR.value:
+            self.cursor_pagination = self.cursor_pagination_class()
+            return self.cursor_pagination.paginate_queryset(queryset, request, view)
+        if isinstance(queryset, QuerySet) and not queryset.ordered:
+            # the pages of an unordered queryset can overlap
+            queryset = queryset.order_by(self.cursor_pagination_class.ordering)
+        return self.paginate_page(queryset, request)
+
+    def paginate_page(self, queryset, request):
+        # `PageNumberPagination.paginate_queryset()` without the number of pages, which needs the count
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        return list(self.page)
+
+    def get_next_link(self):
+        if self.summary == SearchSummary.COUNT.value:
+            return None
+        if self.cursor_pagination is not None:
+            return self.cursor_pagination.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.summary == SearchSummary.COUNT.value:
+            return None
+        if self.cursor_pagination is not None:
+            return self.cursor_pagination.get_previous_link()
+        return super().get_previous_link()
+
+    def get_total_mode(self):
+        # the `_total` of the request, the configured one if it's missing or unknown
+        total = self.request.query_params.get(self.total_query_param)
+        if total not in [mode.value for mode in SearchTotal]:
+            total = GeneralConfiguration.get_default_search_total()
+        if total == SearchTotal.NONE.value and self.summary == SearchSummary.COUNT.value:
+            # the total is the whole content of the `_summary=count` bundle
+            return SearchTotal.ACCURATE.value
+        return total
+
+    def get_total(self):
+        total_mode = self.get_total_mode()
+        if total_mode == SearchTotal.NONE.value:
+            return None
+        if total_mode == SearchTotal.ESTIMATE.value:
+            return query_count_estimator.estimate(self.queryset, GeneralConfiguration.get_search_total_estimate_ttl())
+        if self.cursor_pagination is not None or self.summary == SearchSummary.COUNT.value:
+            return self.queryset.count()
+        return self.page.paginator.count
 
     def get_paginated_response(self, data):
-        return Response(self.build_bundle_set(data).toDict())
+        with BaseFHIRConverter.trusted_construction():
+            bundle = self.build_bundle_set(data)
+        # the bundle is written to JSON by the `FHIRJSONRenderer`
+        return Response(bundle)
 
     def build_bundle_set(self, data):
         bundle = Bundle()
         bundle.type = BundleType.SEARCHSET.value
-        bundle.total = self.page.paginator.count
+        total = self.get_total()
+        if total is not None:
+            bundle.total = total
         self.build_bundle_links(bundle)
-        self.build_bundle_entry(bundle, data)
+        if self.included_resources:
+            # the resources of `_include` and `_revinclude` follow the matches of the search
+            self.build_bundle_entry(bundle, data, BundleEntrySearchMode.MATCH.value)
+            self.build_bundle_entry(bundle, self.included_resources, BundleEntrySearchMode.INCLUDE.value)
+        else:
+            self.build_bundle_entry(bundle, data)
         return bundle
 
     def build_bundle_links(self, bundle):
@@ -39,25 +197,44 @@ class FhirBundleResultsSetPagination(PageNumberPagination):
         self_link.url = url
         bundle.link.append(self_link)
 
-    def build_bundle_entry(self, bundle, data):
+    def build_bundle_entry(self, bundle, data, search_mode=None):
+        search = None
+        if search_mode is not None:
+            search = BundleEntrySearch()
+            search.mode = search_mode
         for obj in data:
             entry = BundleEntry()
-            entry.fullUrl = self.build_full_url_for_resource(obj)
+            if search_mode == BundleEntrySearchMode.INCLUDE.value:
+                entry.fullUrl = self.build_full_url_for_resource(obj, self.get_object_resource_type(obj))
+            else:
+                entry.fullUrl = self.build_full_url_for_resource(obj)
             entry.resource = obj
+            if search is not None:
+                entry.search = search
             bundle.entry.append(entry)
 
-    def build_full_url_for_resource(self, fhir_object):
+    def build_full_url_for_resource(self, fhir_object, resource_type=None):
         url = None
         resource_pk = self.get_object_pk(fhir_object)
         if resource_pk:
             url = self.request.build_absolute_uri()
             url = self.exclude_query_parameter_from_url(url)
+            if resource_type is not None:
+                # the endpoint of another resource type, next to the searched one
+                url = url.rstrip('/').rsplit('/', 1)[0] + '/' + resource_type + '/'
             url = url + resource_pk
         return url
 
+    def get_object_resource_type(self, fhir_object):
+        if isinstance(fhir_object, dict):
+            return fhir_object.get('resourceType')
+        return type(fhir_object).__name__
+
     def get_object_pk(self, fhir_object):
         pk_id = None
-        if isinstance(fhir_object, dict):
+        if isinstance(fhir_object, FHIRBaseObject):
+            pk_id = fhir_object.id
+        elif isinstance(fhir_object, dict):
             pk_id = fhir_object.get('id')
         return str(pk_id) if pk_id else None
 
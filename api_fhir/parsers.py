@@ -0,0 +1,5 @@
+from rest_framework.parsers import JSONParser
+
+
+class FHIRJSONParser(JSONParser):
+    media_type = 'application/fhir+json'
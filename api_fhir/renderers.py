@@ -0,0 +1,98 @@
+from io import BytesIO
+
+from api_fhir.models import FHIRBaseObject, JSONWriter
+from rest_framework.compat import SHORT_SEPARATORS, LONG_SEPARATORS
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib encoder is used without it
+    orjson = None
+
+
+class FHIRJSONEncoder(encoders.JSONEncoder):
+
+    def default(self, obj):
+        if isinstance(obj, FHIRBaseObject):
+            return obj._get_registry().to_json_dict(obj)
+        return super().default(obj)
+
+
+class FHIRJSONRenderer(JSONRenderer):
+    media_type = 'application/fhir+json'
+    encoder_class = FHIRJSONEncoder
+    pretty_indent = 2
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if self.can_use_orjson(indent):
+            return self.render_orjson(data, indent)
+        elif isinstance(data, FHIRBaseObject) and indent is None:
+            return self.render_fhir_object(data)
+        return super().render(data, accepted_media_type, renderer_context)
+
+    def get_indent(self, accepted_media_type, renderer_context):
+        indent = super().get_indent(accepted_media_type, renderer_context)
+        if indent is None and self.is_pretty_requested(renderer_context.get('request')):
+            indent = self.pretty_indent
+        return indent
+
+    def is_pretty_requested(self, request):
+        return request is not None and request.GET.get('_pretty') == 'true'
+
+    def can_use_orjson(self, indent):
+        # orjson writes utf-8 with the compact separators and can only indent by 2 spaces
+        return orjson is not None and not self.ensure_ascii and self.compact and indent in (None, 2)
+
+    def render_orjson(self, data, indent):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        ret = orjson.dumps(data, default=self.get_encoder().default, option=option)
+        # same escaping of \u2028 and \u2029 as in the `JSONRenderer`
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+    def render_fhir_object(self, fhir_object):
+        # the JSON is written straight from the FHIR object, without the intermediate `toDict()` copy
+        buffer = EncodedJSONBuffer()
+        JSONWriter(buffer, self.get_encoder()).write(fhir_object)
+        return buffer.getvalue()
+
+    def get_encoder(self):
+        separators = SHORT_SEPARATORS if self.compact else LONG_SEPARATORS
+        return self.encoder_class(ensure_ascii=self.ensure_ascii, allow_nan=not self.strict, separators=separators)
+
+
+class FHIRApplicationJSONRenderer(FHIRJSONRenderer):
+    # the same FHIR JSON for the clients accepting only `application/json`
+    media_type = 'application/json'
+
+
+class EncodedJSONBuffer(object):
+    # collects the written JSON chunks and keeps them encoded, joining them in batches is much faster than encoding
+    # every small chunk
+
+    def __init__(self, batch_size=1024):
+        self.batch_size = batch_size
+        self.buffer = BytesIO()
+        self.chunks = []
+
+    def write(self, chunk):
+        chunks = self.chunks
+        chunks.append(chunk)
+        if len(chunks) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        # same escaping of \u2028 and \u2029 as in the `JSONRenderer`
+        text = ''.join(self.chunks).replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        self.buffer.write(text.encode())
+        self.chunks.clear()
+
+    def getvalue(self):
+        self.flush()
+        return self.buffer.getvalue()
@@ -1,25 +1,62 @@
+from django.db import models
 from django.http.response import HttpResponseBase
 
 from api_fhir.configurations import GeneralConfiguration
 from rest_framework import serializers
-from api_fhir.converters import BaseFHIRConverter, OperationOutcomeConverter
+from api_fhir.converters import BaseFHIRConverter, OperationOutcomeConverter, ReferenceConverterMixin
 from api_fhir.models import FHIRBaseObject
+from api_fhir.utils import FhirUtils
+
+
+class BaseFHIRListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        # the resources are kept as FHIR objects, the `FHIRJSONRenderer` writes them without the `toDict()` copy
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        return self.child.to_fhir_objs(iterable)
 
 
 class BaseFHIRSerializer(serializers.Serializer):
     fhirConverter = BaseFHIRConverter()
 
+    class Meta:
+        list_serializer_class = BaseFHIRListSerializer
+
     def to_representation(self, obj):
+        return self.to_fhir_obj(obj).toDict()
+
+    def to_fhir_obj(self, obj):
         if isinstance(obj, HttpResponseBase):
-            return OperationOutcomeConverter.to_fhir_obj(obj).toDict()
+            with OperationOutcomeConverter.trusted_construction():
+                return OperationOutcomeConverter.to_fhir_obj(obj)
         elif isinstance(obj, FHIRBaseObject):
-            return obj.toDict()
-        return self.fhirConverter.to_fhir_obj(obj).toDict()
+            return obj
+        with self.fhirConverter.trusted_construction():
+            return self.fhirConverter.get_elements_converter(self.get_elements())(obj)
+
+    def to_fhir_objs(self, objs):
+        if not isinstance(objs, models.QuerySet):
+            objs = list(objs)
+            if not all(isinstance(obj, models.Model) for obj in objs):
+                return [self.to_fhir_obj(obj) for obj in objs]
+        with self.fhirConverter.trusted_construction():
+            return self.fhirConverter.to_fhir_objs(objs, self.get_elements())
+
+    def get_elements(self):
+        # the `_elements` (or the summary elements) of the request, `None` if the whole resources are requested
+        request = self.context.get('request')
+        if request is None:
+            return None
+        return FhirUtils.get_requested_elements(request.query_params, self.fhirConverter.get_summary_elements())
 
     def to_internal_value(self, data):
         audit_user_id = self.get_audit_user_id()
         if isinstance(data, dict):
-            data = FHIRBaseObject.fromDict(data)
+            ReferenceConverterMixin.resolve_references(ReferenceConverterMixin.collect_raw_references(data))
+            # the converters read only some of the values, the others don't need to be parsed
+            data = FHIRBaseObject.fromDict(data, lazy=True)
+        elif isinstance(data, FHIRBaseObject):
+            ReferenceConverterMixin.resolve_references(ReferenceConverterMixin.collect_references(data))
         return self.fhirConverter.to_imis_obj(data, audit_user_id).__dict__
 
     def create(self, validated_data):
@@ -41,4 +41,5 @@ class ClaimSerializer(BaseFHIRSerializer):
 
     def create_claim_response(self, claim_code):
         claim = get_object_or_404(Claim, code=claim_code)
-        return ClaimResponseConverter.to_fhir_obj(claim)
+        with ClaimResponseConverter.trusted_construction():
+            return ClaimResponseConverter.to_fhir_obj(claim)
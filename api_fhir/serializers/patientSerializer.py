@@ -1,6 +1,6 @@
 import copy
 
-from insuree.models import Insuree, Gender, Education, Profession
+from insuree.models import Insuree
 
 from api_fhir.converters import PatientConverter
 from api_fhir.exceptions import FHIRException
@@ -30,7 +30,7 @@ class PatientSerializer(BaseFHIRSerializer):
         instance.passport = validated_data.get('passport', instance.passport)
         instance.dob = validated_data.get('dob', instance.dob)
         gender_code = validated_data.get('gender_id', instance.gender.code)
-        instance.gender = Gender.objects.get(pk=gender_code)
+        instance.gender = PatientConverter.get_imis_gender(gender_code)
         instance.marital = validated_data.get('marital', instance.marital)
         instance.phone = validated_data.get('phone', instance.phone)
         instance.email = validated_data.get('email', instance.email)
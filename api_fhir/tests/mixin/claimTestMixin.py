@@ -7,7 +7,7 @@ from api_fhir.converters import PatientConverter, LocationConverter, Practitione
 from api_fhir.converters.claimConverter import ClaimConverter
 from api_fhir.models import Claim as FHIRClaim, ImisClaimIcdTypes, Period, Money
 from api_fhir.tests import GenericTestMixin, PatientTestMixin, LocationTestMixin, PractitionerTestMixin
-from api_fhir.utils import TimeUtils
+from api_fhir.utils import TimeUtils, ModelLookupCache
 
 
 class ClaimTestMixin(GenericTestMixin):
@@ -37,6 +37,7 @@ class ClaimTestMixin(GenericTestMixin):
     _TEST_SERVICE_EXPLANATION = "service_explanation"
 
     def setUp(self):
+        ModelLookupCache.invalidate_all()
         self._TEST_DIAGNOSIS_CODE = Diagnosis()
         self._TEST_DIAGNOSIS_CODE.code = self._TEST_MAIN_ICD_CODE
         self._TEST_CLAIM_ADMIN = PractitionerTestMixin().create_test_imis_instance()
@@ -7,7 +7,7 @@ from api_fhir.converters import PatientConverter
 from api_fhir.models import HumanName, NameUse, Identifier, AdministrativeGender, ContactPoint, ContactPointSystem, \
     Address, AddressType, ImisMaritalStatus, Patient, ContactPointUse, AddressUse
 from api_fhir.tests import GenericTestMixin
-from api_fhir.utils import TimeUtils
+from api_fhir.utils import TimeUtils, ModelLookupCache
 
 
 class PatientTestMixin(GenericTestMixin):
@@ -27,6 +27,7 @@ class PatientTestMixin(GenericTestMixin):
     _TEST_GEOLOCATION = "TEST_GEOLOCATION"
 
     def setUp(self):
+        ModelLookupCache.invalidate_all()
         self._TEST_GENDER = Gender()
         self._TEST_GENDER.code = self._TEST_GENDER_CODE
 
@@ -0,0 +1,114 @@
+from unittest import mock
+
+from claim.models import Claim
+from core.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from insuree.models import Gender
+from insuree.test_helpers import create_test_insuree
+from medical.models import Diagnosis
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api_fhir.models.bundle import BundleEntrySearchMode
+from api_fhir.permissions import FHIRApiInsureePermissions
+from api_fhir.tests import GenericFhirAPITestMixin, LocationTestMixin, PractitionerTestMixin
+from api_fhir.utils import TimeUtils
+
+
+class ClaimAPITests(GenericFhirAPITestMixin, APITestCase):
+
+    base_url = '/api_fhir/Claim/'
+    _test_json_path = "/test/test_claim.json"
+    _TEST_GENDER_CODE = 'M'
+    _TEST_ICD_CODE = 'ICD_CD'
+    _TEST_ICD_NAME = 'icd name'
+    _TEST_ADMIN_USER_ID = 1
+    _TEST_INCLUDES = '?_include=Claim:patient&_include=Claim:facility&_include=Claim:enterer' \
+                     '&_revinclude=ClaimResponse:request'
+
+    def setUp(self):
+        super(ClaimAPITests, self).setUp()
+
+    def create_dependencies(self):
+        gender = Gender()
+        gender.code = self._TEST_GENDER_CODE
+        gender.save()
+        icd = Diagnosis()
+        icd.code = self._TEST_ICD_CODE
+        icd.name = self._TEST_ICD_NAME
+        icd.audit_user_id = self._TEST_ADMIN_USER_ID
+        icd.save()
+        imis_hf = LocationTestMixin().create_test_imis_instance()
+        imis_hf.id = None
+        imis_hf.validity_from = TimeUtils.now()
+        imis_hf.offline = False
+        imis_hf.audit_user_id = self._TEST_ADMIN_USER_ID
+        imis_hf.save()
+        claim_admin = PractitionerTestMixin().create_test_imis_instance()
+        claim_admin.id = None
+        claim_admin.audit_user_id = self._TEST_ADMIN_USER_ID
+        claim_admin.save()
+        return gender, icd, imis_hf, claim_admin
+
+    def create_test_claims(self, dependencies, first, last):
+        gender, icd, imis_hf, claim_admin = dependencies
+        for index in range(first, last):
+            insuree = create_test_insuree(custom_props={'chf_id': 'TEST{:06d}'.format(index), 'gender': gender})
+            Claim.objects.create(code='CODE{:06d}'.format(index), insuree=insuree, health_facility=imis_hf,
+                                 admin=claim_admin, icd=icd, date_from=TimeUtils.date(),
+                                 date_claimed=TimeUtils.date(), status=Claim.STATUS_ENTERED,
+                                 audit_user_id=self._TEST_ADMIN_USER_ID)
+
+    def get_entries(self, bundle, search_mode):
+        return [entry for entry in bundle.entry if entry.search.mode == search_mode.value]
+
+    def test_get_list_include_query_count_does_not_depend_on_page_size(self):
+        self.login()
+        dependencies = self.create_dependencies()
+        self.create_test_claims(dependencies, 0, 1)
+        # the first request fills the lookup caches of the converters
+        self.client.get(self.base_url + self._TEST_INCLUDES, data=None, format='json')
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.base_url + self._TEST_INCLUDES, data=None, format='json')
+        self.create_test_claims(dependencies, 1, 10)
+        with self.assertNumQueries(len(context.captured_queries)):
+            response = self.client.get(self.base_url + self._TEST_INCLUDES, data=None, format='json')
+        bundle = self.get_bundle_from_json_response(response)
+        self.assertEqual(10, bundle.total)
+        self.assertEqual(10, len(self.get_entries(bundle, BundleEntrySearchMode.MATCH)))
+        # 10 patients, 10 claim responses, the facility and the enterer shared by the claims
+        self.assertEqual(22, len(self.get_entries(bundle, BundleEntrySearchMode.INCLUDE)))
+
+    def test_get_list_include_entries(self):
+        self.login()
+        self.create_test_claims(self.create_dependencies(), 0, 2)
+        response = self.client.get(self.base_url + '?_include=Claim:facility&_include=Claim:patient'
+                                                   '&_include=Claim:facility', data=None, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        bundle = self.get_bundle_from_json_response(response)
+        matches = self.get_entries(bundle, BundleEntrySearchMode.MATCH)
+        self.assertEqual(['Claim', 'Claim'], [type(entry.resource).__name__ for entry in matches])
+        includes = self.get_entries(bundle, BundleEntrySearchMode.INCLUDE)
+        self.assertCountEqual(['Location', 'Patient', 'Patient'],
+                              [type(entry.resource).__name__ for entry in includes])
+        for entry in bundle.entry:
+            resource_type = type(entry.resource).__name__
+            self.assertEqual('http://testserver/api_fhir/{}/{}'.format(resource_type, entry.resource.id),
+                             entry.fullUrl)
+
+    def test_get_list_include_without_permission(self):
+        self.login()
+        self.create_test_claims(self.create_dependencies(), 0, 2)
+
+        def has_perms(perms, obj=None):
+            return perms != FHIRApiInsureePermissions.permissions_get
+
+        with mock.patch.object(User, 'has_perms', side_effect=has_perms):
+            response = self.client.get(self.base_url + '?_include=Claim:patient&_include=Claim:facility',
+                                       data=None, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        bundle = self.get_bundle_from_json_response(response)
+        self.assertEqual(2, len(self.get_entries(bundle, BundleEntrySearchMode.MATCH)))
+        self.assertEqual(['Location'], [type(entry.resource).__name__
+                                        for entry in self.get_entries(bundle, BundleEntrySearchMode.INCLUDE)])
@@ -1,4 +1,7 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from insuree.models import Gender
+from insuree.test_helpers import create_test_insuree
 from rest_framework.test import APITestCase
 
 from api_fhir.models import Patient
@@ -28,3 +31,36 @@ class PatientAPITests(GenericFhirAPITestMixin, FhirApiReadTestMixin, FhirApiCrea
         gender = Gender()
         gender.code = self._TEST_GENDER_CODE
         gender.save()
+        return gender
+
+    def create_test_insurees(self, gender, first, last):
+        for index in range(first, last):
+            create_test_insuree(custom_props={'chf_id': 'TEST{:06d}'.format(index), 'gender': gender})
+
+    def test_get_list_query_count_does_not_depend_on_page_size(self):
+        self.login()
+        gender = self.create_dependencies()
+        self.create_test_insurees(gender, 0, 1)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.base_url, data=None, format='json')
+        self.create_test_insurees(gender, 1, 10)
+        with self.assertNumQueries(len(context.captured_queries)):
+            response = self.client.get(self.base_url, data=None, format='json')
+        bundle = self.get_bundle_from_json_response(response)
+        self.assertEqual(10, bundle.total)
+
+    def test_get_list_summary(self):
+        self.login()
+        gender = self.create_dependencies()
+        self.create_test_insurees(gender, 0, 3)
+        response = self.client.get(self.base_url + '?_summary=count', data=None, format='json')
+        bundle = self.get_bundle_from_json_response(response)
+        self.assertEqual(3, bundle.total)
+        self.assertEqual([], bundle.entry)
+        response = self.client.get(self.base_url + '?_summary=true', data=None, format='json')
+        bundle = self.get_bundle_from_json_response(response)
+        self.assertEqual(3, len(bundle.entry))
+        fhir_patient = bundle.entry[0].resource
+        self.assertEqual('SUBSETTED', fhir_patient.meta.tag[0].code)
+        self.assertTrue(fhir_patient.identifier)
+        self.assertFalse(fhir_patient.extension)
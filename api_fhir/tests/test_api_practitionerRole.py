@@ -3,6 +3,7 @@ from rest_framework.test import APITestCase
 
 from api_fhir.converters import LocationConverter
 from api_fhir.models import PractitionerRole
+from api_fhir.models.bundle import BundleEntrySearchMode
 from api_fhir.tests import GenericFhirAPITestMixin, FhirApiReadTestMixin, FhirApiUpdateTestMixin, \
     FhirApiCreateTestMixin, LocationTestMixin, PractitionerTestMixin, FhirApiDeleteTestMixin
 from api_fhir.utils import TimeUtils
@@ -65,3 +66,18 @@ class PractitionerRoleAPITests(GenericFhirAPITestMixin, FhirApiReadTestMixin, Fh
         self.assertTrue(isinstance(practitioner_role, PractitionerRole))
         self.assertEqual(0, len(practitioner_role.location))
 
+
+    def test_get_list_include_location(self):
+        self.login()
+        claim_admin = self._create_and_save_claim_admin()
+        claim_admin.health_facility = self._create_and_save_hf()
+        claim_admin.save()
+        response = self.client.get(self.base_url + '?_include=PractitionerRole:location', data=None, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        bundle = self.get_bundle_from_json_response(response)
+        self.assertEqual([('PractitionerRole', BundleEntrySearchMode.MATCH.value),
+                          ('Location', BundleEntrySearchMode.INCLUDE.value)],
+                         [(type(entry.resource).__name__, entry.search.mode) for entry in bundle.entry])
+        location = bundle.entry[1].resource
+        self.assertEqual('http://testserver/api_fhir/Location/' + location.id, bundle.entry[1].fullUrl)
+        self.assertIn(self._TEST_LOCATION_CODE, [identifier.value for identifier in location.identifier])
@@ -1,6 +1,11 @@
 import os
 from unittest import mock
 
+from claim.models import Claim
+from claim.test_helpers import create_test_claim, create_test_claimitem, create_test_claimservice
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from api_fhir.converters import LocationConverter, PatientConverter, PractitionerConverter
 from api_fhir.converters.claimConverter import ClaimConverter
 from api_fhir.models import FHIRBaseObject
@@ -53,3 +58,31 @@ class ClaimConverterTestCase(ClaimTestMixin):
         self.setUp()
         fhir_claim = FHIRBaseObject.loads(self._test_claim_json_representation, 'json')
         self.verify_fhir_instance(fhir_claim)
+
+    def create_test_claims(self, count):
+        claim_ids = []
+        for _ in range(count):
+            claim = create_test_claim()
+            create_test_claimitem(claim, 'D')
+            create_test_claimservice(claim, 'V')
+            claim_ids.append(claim.id)
+        return claim_ids
+
+    def test_to_fhir_objs_query_count_does_not_depend_on_page_size(self):
+        small_page = list(Claim.objects.filter(id__in=self.create_test_claims(1)))
+        with CaptureQueriesContext(connection) as context:
+            ClaimConverter.to_fhir_objs(small_page)
+        page = list(Claim.objects.filter(id__in=self.create_test_claims(10)).order_by('id'))
+        with self.assertNumQueries(len(context.captured_queries)):
+            fhir_claims = ClaimConverter.to_fhir_objs(page)
+        self.assertEqual([claim.toDict() for claim in fhir_claims],
+                         [ClaimConverter.to_fhir_obj(imis_claim).toDict()
+                          for imis_claim in Claim.objects.filter(id__in=[claim.id for claim in page]).order_by('id')])
+
+    def test_to_fhir_objs_of_queryset(self):
+        claim_ids = self.create_test_claims(10)
+        # the claims with their relations, the items and the services
+        with self.assertNumQueries(3):
+            fhir_claims = ClaimConverter.to_fhir_objs(Claim.objects.filter(id__in=claim_ids).order_by('id'))
+        self.assertEqual(10, len(fhir_claims))
+        self.assertTrue(all(len(fhir_claim.item) == 2 for fhir_claim in fhir_claims))
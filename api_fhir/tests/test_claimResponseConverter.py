@@ -1,6 +1,10 @@
 import os
 from unittest import mock
 
+from claim.test_helpers import create_test_claim, create_test_claimitem, create_test_claimservice
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from api_fhir.converters import ClaimResponseConverter
 from api_fhir.models import FHIRBaseObject
 from api_fhir.tests import ClaimResponseTestMixin
@@ -36,3 +40,21 @@ class ClaimResponseConverterTestCase(ClaimResponseTestMixin):
     def test_create_object_from_json(self):
         fhir_claim = FHIRBaseObject.loads(self._test_claim_response_json_representation, 'json')
         self.verify_fhir_instance(fhir_claim)
+
+    def create_test_claim_with_lines(self, count):
+        claim = create_test_claim()
+        for _ in range(count):
+            create_test_claimitem(claim, 'D')
+            create_test_claimservice(claim, 'V')
+        return claim
+
+    def test_to_fhir_obj_query_count_does_not_depend_on_claim_lines(self):
+        small_claim = self.create_test_claim_with_lines(1)
+        with CaptureQueriesContext(connection) as context:
+            ClaimResponseConverter.to_fhir_obj(small_claim)
+        claim = self.create_test_claim_with_lines(25)
+        with self.assertNumQueries(len(context.captured_queries)):
+            fhir_claim_response = ClaimResponseConverter.to_fhir_obj(claim)
+        self.assertEqual(50, len(fhir_claim_response.item))
+        self.assertEqual(list(range(1, 51)), [item.sequenceLinkId for item in fhir_claim_response.item])
+        self.assertEqual(list(range(1, 51)), [add_item.sequenceLinkId[0] for add_item in fhir_claim_response.addItem])
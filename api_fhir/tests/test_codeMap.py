@@ -0,0 +1,42 @@
+from unittest import mock, TestCase
+
+from api_fhir.converters import ConfigurationCache
+from api_fhir.converters.codeMap import CodeMap
+from api_fhir.models import Coding
+
+
+class CodeMapTestCase(TestCase):
+
+    _TEST_SYSTEM = "test_system"
+
+    def create_test_code_map(self):
+        return CodeMap([('M', 'married'), ('S', 'single'), ('X', 'single'), ('M', 'other')], self._TEST_SYSTEM,
+                       lambda imis_code, fhir_code: (imis_code, fhir_code))
+
+    def test_mapping(self):
+        code_map = self.create_test_code_map()
+        self.assertEqual('married', code_map.get_fhir_code('M'))
+        self.assertEqual(('M', 'married'), code_map.get_fhir_value('M'))
+        self.assertEqual('single', code_map.get_fhir_code('X'))
+        self.assertEqual('S', code_map.get_imis_code('single'))
+        self.assertEqual('M', code_map.get_imis_code('other'))
+        self.assertIsNone(code_map.get_fhir_value('W'))
+        self.assertEqual('U', code_map.get_fhir_code('W', 'U'))
+
+    def test_imis_code_from_codings(self):
+        code_map = self.create_test_code_map()
+        codings = [Coding(system=self._TEST_SYSTEM, code='married'), Coding(system='other_system', code='single'),
+                   Coding(system=self._TEST_SYSTEM, code='unknown')]
+        self.assertEqual('M', code_map.get_imis_code_from_codings(codings))
+        codings.append(Coding(system=self._TEST_SYSTEM, code='single'))
+        self.assertEqual('S', code_map.get_imis_code_from_codings(codings))
+        self.assertIsNone(code_map.get_imis_code_from_codings(None))
+
+    def test_cache_compiles_map_for_every_snapshot(self):
+        cache = ConfigurationCache()
+        factory = mock.MagicMock(side_effect=lambda: object())
+        first_snapshot, second_snapshot = object(), object()
+        code_map = cache.get('test', first_snapshot, factory)
+        self.assertIs(code_map, cache.get('test', first_snapshot, factory))
+        self.assertIsNot(code_map, cache.get('test', second_snapshot, factory))
+        self.assertEqual(2, factory.call_count)
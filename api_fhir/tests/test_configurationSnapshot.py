@@ -0,0 +1,43 @@
+import copy
+from unittest import TestCase
+
+from api_fhir.apps import DEFAULT_CFG
+from api_fhir.configurations import ModuleConfiguration, BaseConfiguration, ConfigurationSnapshot, \
+    GeneralConfiguration, Stu3ApiFhirConfig, Stu3ClaimConfig, Stu3CoverageConfig, Stu3IdentifierConfig
+
+
+class ConfigurationSnapshotTestCase(TestCase):
+
+    def tearDown(self):
+        ModuleConfiguration.build_configuration(DEFAULT_CFG)
+
+    def test_build_configuration(self):
+        cfg = copy.deepcopy(DEFAULT_CFG)
+        cfg['stu3_fhir_claim_config']['fhir_claim_item_code'] = 'test_item'
+        cfg['stu3_fhir_coverage_config']['fhir_product_code'] = 'TestProduct'
+        ModuleConfiguration.build_configuration(cfg)
+        snapshot = BaseConfiguration.get_snapshot()
+        self.assertEqual('test_item', snapshot.claim.fhir_claim_item_code)
+        self.assertEqual('TestProduct', snapshot.coverage.product_code)
+        self.assertEqual(Stu3CoverageConfig.get_product_code(), snapshot.coverage.product_code)
+        self.assertEqual(Stu3IdentifierConfig.get_fhir_uuid_type_code(), snapshot.identifier.fhir_uuid_type_code)
+        self.assertEqual(GeneralConfiguration.get_male_gender_code(), snapshot.general.male_gender_code)
+        ModuleConfiguration.build_configuration(DEFAULT_CFG)
+        self.assertIsNot(snapshot, BaseConfiguration.get_snapshot())
+        self.assertEqual('item', BaseConfiguration.get_snapshot().claim.fhir_claim_item_code)
+
+    def test_section_contains_all_getters(self):
+        snapshot = ConfigurationSnapshot.build(GeneralConfiguration, Stu3ApiFhirConfig)
+        self.assertEqual(Stu3ClaimConfig.get_fhir_claim_item_rejected_reason_adjudication_code(),
+                         snapshot.claim.fhir_claim_item_rejected_reason_adjudication_code)
+        self.assertEqual(len([name for name in vars(Stu3ClaimConfig) if name.startswith('get_')]),
+                         len(snapshot.claim))
+
+    def test_snapshot_is_immutable(self):
+        snapshot = ConfigurationSnapshot.build(GeneralConfiguration, Stu3ApiFhirConfig)
+        with self.assertRaises(AttributeError):
+            snapshot.claim = None
+        with self.assertRaises(AttributeError):
+            snapshot.claim.fhir_claim_item_code = 'test_item'
+        with self.assertRaises(AttributeError):
+            del snapshot.general
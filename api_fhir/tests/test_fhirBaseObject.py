@@ -0,0 +1,256 @@
+import copy
+import os
+from unittest import TestCase
+
+from api_fhir.exceptions import InvalidAttributeError, PropertyError, PropertyTypeError, FHIRException, \
+    FrozenObjectError
+from api_fhir.models import FHIRBaseObject, Patient, CodeableConcept, Element, ClaimInformation, Property, \
+    PropertyRegistry, HumanName, Coding, Bundle, PropertyList, trusted_construction, construction_state, \
+    fhir_type_registry, FHIRDate, Reference, FHIRFlyweightCache, BundleEntry
+
+
+class FHIRBaseObjectTestCase(TestCase):
+
+    def test_registry_is_built_once_per_class(self):
+        registry = Patient._get_registry()
+        self.assertIsInstance(registry, PropertyRegistry)
+        self.assertIs(registry, Patient._get_registry())
+        self.assertIsNot(Element._get_registry(), CodeableConcept._get_registry())
+
+    def test_registry_keeps_dir_order_of_properties(self):
+        expected = []
+        for attr in dir(Patient):
+            attribute = getattr(Patient, attr)
+            if isinstance(attribute, Property) and attribute.definition.name not in expected:
+                expected.append(attribute.definition.name)
+        self.assertEqual(expected, Patient._get_properties())
+
+    def test_registry_resolves_types(self):
+        registry = CodeableConcept._get_registry()
+        self.assertEqual(str, registry.types['text'])
+        self.assertEqual('Coding', registry.types['coding'].__name__)
+
+    def test_registry_uses_definition_names(self):
+        names = ClaimInformation._get_properties()
+        self.assertEqual(1, names.count('valueString'))
+        self.assertNotIn('valueQuantity', names)
+        property_, type_ = ClaimInformation._get_property_details_for_name('valueString')
+        self.assertIs(ClaimInformation.valueString, property_)
+        self.assertEqual(str, type_)
+
+    def test_invalid_attribute(self):
+        patient = Patient()
+        with self.assertRaises(InvalidAttributeError):
+            patient.unknown = 'value'
+        with self.assertRaises(InvalidAttributeError):
+            FHIRBaseObject.fromDict({'resourceType': 'Patient', 'unknown': 'value'})
+
+    def test_instances_use_slots(self):
+        patient = Patient()
+        self.assertFalse(hasattr(patient, '__dict__'))
+        self.assertFalse(hasattr(CodeableConcept(), '__dict__'))
+
+    def test_list_properties_are_created_on_first_access(self):
+        patient = Patient()
+        patient.toDict()
+        self.assertNotIn('name', patient._values)
+        names = patient.name
+        self.assertIs(names, patient.name)
+        self.assertIs(Patient.name.definition, names.definition)
+        patient.name = []
+        self.assertIs(names, patient.name)
+
+    def test_to_dict(self):
+        patient = Patient()
+        patient.gender = 'male'
+        patient.active = False
+        name = HumanName()
+        name.family = 'family'
+        name.given = ['given']
+        patient.name = [name, HumanName()]
+        patient.maritalStatus = CodeableConcept()
+        patient.maritalStatus.coding = [Coding()]
+        patient.telecom = []
+        expected = {
+            'resourceType': 'Patient',
+            'active': False,
+            'gender': 'male',
+            'maritalStatus': {'coding': [{}]},
+            'name': [{'family': 'family', 'given': ['given']}, {}]
+        }
+        self.assertEqual(expected, patient.toDict())
+        self.assertEqual(list(expected), list(patient.toDict()))
+        self.assertEqual({}, CodeableConcept().toDict())
+
+    def test_from_dict(self):
+        bundle = FHIRBaseObject.fromDict({
+            'resourceType': 'Bundle',
+            'type': 'searchset',
+            'total': 1,
+            'entry': [{'resource': {'resourceType': 'Patient', 'gender': 'male', 'birthDate': '1990-03-24',
+                                    'name': [{'family': 'family', 'given': ['given']}]}}]
+        })
+        self.assertIsInstance(bundle, Bundle)
+        self.assertEqual(1, bundle.total)
+        patient = bundle.entry[0].resource
+        self.assertIsInstance(patient, Patient)
+        self.assertEqual('1990-03-24', patient.birthDate)
+        self.assertIsInstance(patient.name, PropertyList)
+        self.assertIsInstance(patient.name[0], HumanName)
+        self.assertEqual(['given'], patient.name[0].given)
+
+    def test_from_dict_validation(self):
+        with self.assertRaises(PropertyError):
+            FHIRBaseObject.fromDict({'resourceType': 'Patient', 'gender': ['male']})
+        with self.assertRaises(PropertyError):
+            FHIRBaseObject.fromDict({'resourceType': 'Patient', 'name': {'family': 'family'}})
+        with self.assertRaises(PropertyTypeError):
+            FHIRBaseObject.fromDict({'resourceType': 'Patient', 'maritalStatus': 'M'})
+        with self.assertRaises(ValueError):
+            FHIRBaseObject.fromDict({'resourceType': 'Patient', 'birthDate': 'not a date'})
+        with self.assertRaises(FHIRException):
+            FHIRBaseObject.fromDict({'resourceType': 'Bundle', 'entry': [{'resource': {'id': '1'}}]})
+
+    def test_trusted_construction_skips_validation(self):
+        with trusted_construction():
+            patient = Patient()
+            patient.birthDate = 'not a date'
+            patient.name = [HumanName()]
+        self.assertEqual('not a date', patient.birthDate)
+        self.assertIsInstance(patient.name, PropertyList)
+        self.assertFalse(construction_state.trusted)
+        with self.assertRaises(ValueError):
+            Patient().birthDate = 'not a date'
+
+    def test_trusted_construction_with_validation(self):
+        with trusted_construction():
+            with trusted_construction(validate=True):
+                with self.assertRaises(ValueError):
+                    Patient().birthDate = 'not a date'
+            self.assertTrue(construction_state.trusted)
+
+    def test_trusted_construction_keeps_parsing_validated(self):
+        with trusted_construction():
+            with self.assertRaises(ValueError):
+                FHIRBaseObject.fromDict({'resourceType': 'Patient', 'birthDate': 'not a date'})
+
+    def test_type_registry(self):
+        self.assertIs(Patient, fhir_type_registry.get('Patient'))
+        self.assertIs(FHIRDate, fhir_type_registry.get('FHIRDate'))
+        self.assertIs(str, fhir_type_registry.resolve(str))
+        with self.assertRaises(FHIRException):
+            fhir_type_registry.get('PropertyDefinition')
+        with self.assertRaises(FHIRException):
+            FHIRBaseObject.fromDict({'resourceType': 'json'})
+
+    def test_resolved_type_is_cached_on_definition(self):
+        definition = Patient.managingOrganization.definition
+        self.assertEqual('Reference', definition.type)
+        self.assertIs(Reference, definition.resolved_type)
+        self.assertIs(Reference, definition._resolved_type)
+        for class_ in list(fhir_type_registry.types.values()):
+            if issubclass(class_, FHIRBaseObject):
+                for property_ in class_._get_registry().properties.values():
+                    self.assertNotIsInstance(property_.definition.resolved_type, str)
+
+    def test_lazy_from_dict(self):
+        patient = FHIRBaseObject.fromDict({
+            'resourceType': 'Patient',
+            'birthDate': '1990-03-24',
+            'name': [{'family': 'family', 'given': ['given']}],
+            'maritalStatus': {'coding': [{'code': 'M'}]}
+        }, lazy=True)
+        self.assertIsInstance(patient, Patient)
+        self.assertEqual({'birthDate': '1990-03-24'}, dict(patient._values))
+        name = patient.name[0]
+        self.assertIsInstance(name, HumanName)
+        self.assertEqual({'birthDate', 'name'}, set(dict(patient._values)))
+        self.assertEqual(['given'], name.given)
+        patient.birthDate = '2000-01-01'
+        self.assertEqual('2000-01-01', patient.birthDate)
+        self.assertEqual({'resourceType': 'Patient', 'birthDate': '2000-01-01', 'maritalStatus': {'coding': [
+            {'code': 'M'}]}, 'name': [{'family': 'family', 'given': ['given']}]}, patient.toDict())
+
+    def test_lazy_from_dict_validation(self):
+        with self.assertRaises(InvalidAttributeError):
+            FHIRBaseObject.fromDict({'resourceType': 'Patient', 'unknown': 'value'}, lazy=True)
+        with self.assertRaises(ValueError):
+            FHIRBaseObject.fromDict({'resourceType': 'Patient', 'birthDate': 'not a date'}, lazy=True)
+        patient = FHIRBaseObject.fromDict({'resourceType': 'Patient', 'gender': 'male',
+                                           'name': [{'family': ['family']}],
+                                           'contact': [{'name': {'given': 'given'}}]}, lazy=True)
+        self.assertEqual('male', patient.gender)
+        self.assertIsInstance(patient.name[0], HumanName)
+        with self.assertRaises(PropertyError):
+            patient.name[0].family
+        with self.assertRaises(PropertyError):
+            patient.validate()
+        patient.name = [HumanName(family='family')]
+        with self.assertRaises(PropertyError):
+            patient.validate()
+        patient.contact = []
+        patient.validate()
+
+    def test_lazy_from_json_is_equal_to_eager(self):
+        dir_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'test')
+        for file_name in sorted(os.listdir(dir_path)):
+            with open(os.path.join(dir_path, file_name)) as json_file:
+                json_string = json_file.read()
+            lazy_obj = FHIRBaseObject.loads(json_string, 'json', lazy=True)
+            self.assertEqual(FHIRBaseObject.loads(json_string, 'json').toDict(), lazy_obj.toDict())
+            lazy_obj = FHIRBaseObject.loads(json_string, 'json', lazy=True)
+            lazy_obj.validate()
+            self.assertEqual(FHIRBaseObject.loads(json_string, 'json').toDict(), copy.deepcopy(lazy_obj).toDict())
+
+    def test_freeze(self):
+        concept = CodeableConcept(coding=[Coding(system='system', code='code')], text='text')
+        expected = concept.toDict()
+        self.assertIs(concept, concept.freeze())
+        self.assertTrue(concept.is_frozen())
+        self.assertTrue(concept.coding[0].is_frozen())
+        self.assertEqual(expected, concept.toDict())
+        self.assertIs(concept.toDict(), concept.toDict())
+        self.assertIs(concept.coding[0].toDict(), concept.toDict()['coding'][0])
+        self.assertEqual('code', concept.coding[0].code)
+        self.assertEqual([], concept.coding[0].extension)
+        with self.assertRaises(FrozenObjectError):
+            concept.text = 'other'
+        with self.assertRaises(FrozenObjectError):
+            concept.coding[0].code = 'other'
+        with self.assertRaises(FrozenObjectError):
+            concept.coding.append(Coding())
+        with self.assertRaises(FrozenObjectError):
+            concept.coding = []
+        with self.assertRaises(FrozenObjectError):
+            concept.extension.append(None)
+        concept_copy = copy.deepcopy(concept)
+        self.assertFalse(concept_copy.is_frozen())
+        concept_copy.coding[0].code = 'other'
+        concept_copy.coding.append(Coding())
+        self.assertEqual(expected, concept.toDict())
+
+    def test_frozen_objects_are_shared(self):
+        concept = CodeableConcept(text='text').freeze()
+        patient = Patient(maritalStatus=concept, name=[HumanName(family='family')])
+        other_patient = Patient(maritalStatus=concept)
+        self.assertIs(patient.toDict()['maritalStatus'], other_patient.toDict()['maritalStatus'])
+        empty_concept = CodeableConcept().freeze()
+        self.assertEqual({}, empty_concept.toDict())
+        patient.communication = []
+        bundle = Bundle(entry=[BundleEntry(resource=Patient(maritalStatus=empty_concept)),
+                               BundleEntry(resource=patient)])
+        self.assertEqual({'resourceType': 'Patient'}, bundle.toDict()['entry'][0]['resource'])
+        self.assertEqual(bundle.toDict(), Bundle.fromDict(copy.deepcopy(bundle.toDict())).toDict())
+        frozen_bundle = copy.deepcopy(bundle).freeze()
+        self.assertEqual(bundle.toDict(), frozen_bundle.toDict())
+        self.assertIs(frozen_bundle.entry[1].resource.toDict(), frozen_bundle.toDict()['entry'][1]['resource'])
+
+    def test_flyweight_cache(self):
+        cache = FHIRFlyweightCache()
+        concept = cache.get(('CodeableConcept', 'text'), lambda: CodeableConcept(text='text'))
+        self.assertTrue(concept.is_frozen())
+        self.assertIs(concept, cache.get(('CodeableConcept', 'text'), lambda: CodeableConcept(text='other')))
+        cache.clear()
+        other_concept = cache.get(('CodeableConcept', 'text'), lambda: CodeableConcept(text='other'))
+        self.assertIsNot(concept, other_concept)
+        self.assertEqual('other', other_concept.text)
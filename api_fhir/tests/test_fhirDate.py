@@ -0,0 +1,48 @@
+import datetime
+from unittest import TestCase
+
+from api_fhir.models import FHIRDate
+
+
+class FHIRDateTestCase(TestCase):
+
+    def test_validate_type(self):
+        for value in ['2010', '2010-11', '2010-11-16', '2010-11-16T15:22:01', '2010-11-16T15:22:01.123Z',
+                      '2010-11-16T15:22:01+01:00', '15:22:01', '15:22:01.5']:
+            self.assertTrue(FHIRDate.validate_type(value), value)
+        for value in [None, '', 10, ['2010-11-16'], 'date 2010-11-16', '2010-11-16 garbage', '2010-13-16',
+                      '2010-11-16T15:22', '2010-11-16T25:22:01', '0000-11-16']:
+            self.assertFalse(FHIRDate.validate_type(value), value)
+
+    def test_validate_type_common_shapes(self):
+        for value in ['0001-01-01', '9999-12-31', '2010-11-16T23:59:60', '2010-11-16T00:00:00-13:59',
+                      '2010-11-16T00:00:00+14:00', '00:00:00', '23:59:60.999']:
+            self.assertTrue(FHIRDate.validate_type(value), value)
+        for value in ['2010-00-16', '2010-11-00', '2010-11-32', '2010-11-16T24:00:00', '2010-11-16T15:60:01',
+                      '2010-11-16T15:22:61', '2010-11-16T15:22:01+14:01', '2010-11-16T15:22:01+13:60',
+                      '2010-11-16T15:22:01+15:00', '24:00:00', '15:60:01']:
+            self.assertFalse(FHIRDate.validate_type(value), value)
+
+    def test_parse(self):
+        self.assertEqual(datetime.date(2010, 11, 16), FHIRDate.parse('2010-11-16'))
+        self.assertEqual(datetime.date(2010, 11, 1), FHIRDate.parse('2010-11'))
+        self.assertEqual(datetime.date(2010, 1, 1), FHIRDate.parse('2010'))
+        self.assertEqual(datetime.datetime(2010, 11, 16, 15, 22, 1), FHIRDate.parse('2010-11-16T15:22:01'))
+        self.assertEqual(datetime.datetime(2010, 11, 16, 15, 22, 1, 123000, datetime.timezone.utc),
+                         FHIRDate.parse('2010-11-16T15:22:01.123Z'))
+        self.assertEqual(datetime.datetime(2010, 11, 16, 15, 22, 1, tzinfo=datetime.timezone(
+            -datetime.timedelta(hours=5, minutes=30))), FHIRDate.parse('2010-11-16T15:22:01-05:30'))
+        self.assertEqual(datetime.time(15, 22, 1, 500000), FHIRDate.parse('15:22:01.5'))
+        with self.assertRaises(ValueError):
+            FHIRDate.parse('2010-11-16 garbage')
+        with self.assertRaises(ValueError):
+            FHIRDate.parse('2010-02-31')
+
+    def test_value_type(self):
+        fhir_date = FHIRDate('2010-11-16')
+        self.assertEqual('2010-11-16', str(fhir_date))
+        self.assertEqual(FHIRDate('2010-11-16'), fhir_date)
+        self.assertEqual(hash(FHIRDate('2010-11-16')), hash(fhir_date))
+        self.assertEqual(datetime.date(2010, 11, 16), fhir_date.to_python())
+        with self.assertRaises(ValueError):
+            FHIRDate('16-11-2010')
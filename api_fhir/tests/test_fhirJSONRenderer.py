@@ -0,0 +1,95 @@
+import io
+import json
+import os
+from datetime import date
+from decimal import Decimal
+from unittest import TestCase
+
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from api_fhir.models import FHIRBaseObject, Bundle, BundleEntry, Patient, HumanName, CodeableConcept, Money, \
+    Coding
+from api_fhir.parsers import FHIRJSONParser
+from api_fhir.renderers import FHIRJSONRenderer, FHIRApplicationJSONRenderer
+
+
+class FHIRJSONRendererTestCase(TestCase):
+
+    _TEST_DATA_FILES = ['test_patient.json', 'test_claim.json', 'test_claimResponse.json', 'test_location.json']
+
+    def load_test_object(self, file_name):
+        dir_path = os.path.dirname(os.path.realpath(__file__))
+        with open(os.path.join(dir_path, 'test', file_name)) as json_file:
+            return FHIRBaseObject.loads(json_file.read(), 'json')
+
+    def build_test_bundle(self):
+        bundle = Bundle(type='searchset', total=len(self._TEST_DATA_FILES))
+        for file_name in self._TEST_DATA_FILES:
+            bundle.entry.append(BundleEntry(fullUrl='http://localhost/' + file_name,
+                                            resource=self.load_test_object(file_name)))
+        patient = Patient(name=[HumanName(family='Zoë ', given=[])], maritalStatus=CodeableConcept())
+        patient.name.append(HumanName())
+        bundle.entry.append(BundleEntry(resource=patient))
+        bundle.entry.append(BundleEntry(resource={'resourceType': 'Patient', 'id': '1'}))
+        frozen_concept = CodeableConcept(coding=[Coding(code='M')], text='Zoë').freeze()
+        bundle.entry.append(BundleEntry(resource=Patient(maritalStatus=frozen_concept, name=[HumanName().freeze()])))
+        bundle.entry.append(BundleEntry(resource=Patient(id='2').freeze()))
+        return bundle
+
+    def write_json(self, fhir_object, encoder=None):
+        fp = io.StringIO()
+        fhir_object.write_json(fp, encoder)
+        return fp.getvalue()
+
+    def test_write_json(self):
+        bundle = self.build_test_bundle()
+        self.assertEqual(json.dumps(bundle.toDict(), separators=(',', ':')), self.write_json(bundle))
+        encoder = json.JSONEncoder(ensure_ascii=False)
+        self.assertEqual(encoder.encode(bundle.toDict()), self.write_json(bundle, encoder))
+        self.assertEqual('{}', self.write_json(HumanName()))
+        with self.assertRaises(AssertionError):
+            self.write_json(bundle, json.JSONEncoder(indent=2))
+
+    def test_render_is_equal_to_json_renderer(self):
+        bundle = self.build_test_bundle()
+        expected = JSONRenderer().render(bundle.toDict())
+        for renderer in [FHIRJSONRenderer(), StdlibFHIRJSONRenderer()]:
+            self.assertEqual(expected, renderer.render(bundle))
+            self.assertEqual(expected, renderer.render(bundle.toDict()))
+
+    def test_render_with_indent(self):
+        bundle = self.build_test_bundle()
+        for indent in [2, 4]:
+            media_type = 'application/fhir+json; indent={}'.format(indent)
+            expected = JSONRenderer().render(bundle.toDict(), media_type)
+            for renderer in [FHIRJSONRenderer(), StdlibFHIRJSONRenderer()]:
+                self.assertEqual(expected, renderer.render(bundle, media_type))
+
+    def test_render_pretty(self):
+        bundle = self.build_test_bundle()
+        expected = JSONRenderer().render(bundle.toDict(), 'application/json; indent=2')
+        renderer_context = {'request': RequestFactory().get('/Patient/', {'_pretty': 'true'})}
+        for renderer in [FHIRJSONRenderer(), StdlibFHIRJSONRenderer()]:
+            self.assertEqual(expected, renderer.render(bundle, renderer_context=renderer_context))
+        renderer_context = {'request': RequestFactory().get('/Patient/', {'_pretty': 'false'})}
+        self.assertEqual(JSONRenderer().render(bundle.toDict()),
+                         FHIRJSONRenderer().render(bundle, renderer_context=renderer_context))
+
+    def test_render_nested_fhir_objects(self):
+        money = Money(value=Decimal('10.50'), unit='EUR')
+        for renderer in [FHIRJSONRenderer(), StdlibFHIRJSONRenderer()]:
+            self.assertEqual(b'{"unit":"EUR","value":10.5}', renderer.render(money))
+            self.assertEqual(b'[{"unit":"EUR","value":10.5}]', renderer.render([money]))
+            self.assertEqual(b'{"date":"2020-01-02"}', renderer.render({'date': date(2020, 1, 2)}))
+
+    def test_media_types(self):
+        self.assertEqual('application/fhir+json', FHIRJSONRenderer.media_type)
+        self.assertEqual('application/json', FHIRApplicationJSONRenderer.media_type)
+        self.assertEqual('application/fhir+json', FHIRJSONParser.media_type)
+
+
+class StdlibFHIRJSONRenderer(FHIRJSONRenderer):
+
+    def can_use_orjson(self, indent):
+        return False
@@ -0,0 +1,128 @@
+from types import SimpleNamespace
+from unittest import mock, TestCase
+
+from api_fhir.apps import DEFAULT_CFG
+from api_fhir.configurations import ModuleConfiguration, Stu3IdentifierConfig
+from api_fhir.converters import BaseFHIRConverter, CodeMap, ConversionPlan, PkMapping, ValueMapping, DateMapping, \
+    IdentifiersMapping, IdentifierMapping, HumanNameMapping, ContactPointsMapping, AddressesMapping, \
+    CodeableConceptMapping, MethodMapping
+from api_fhir.models import Patient, PropertyMixin, ContactPointSystem, ContactPointUse, AddressType, AddressUse, NameUse
+from api_fhir.utils import TimeUtils
+
+
+class FieldMappingTestConverter(BaseFHIRConverter):
+
+    _TEST_SYSTEM = "test_system"
+
+    @classmethod
+    def get_conversion_plan(cls):
+        return ConversionPlan(Patient, [
+            PkMapping(),
+            IdentifiersMapping([
+                IdentifierMapping('uuid', 'fhir_uuid_type_code', to_imis=False),
+                IdentifierMapping('code', 'fhir_chfid_type_code', 'truthy', required_message='Missing code')
+            ]),
+            HumanNameMapping(family_required_message='Missing family name'),
+            DateMapping('dob', 'birthDate', 'Missing birth date'),
+            ValueMapping('gender', 'gender'),
+            CodeableConceptMapping('marital', 'maritalStatus', 'get_marital_map', default_code='U'),
+            ContactPointsMapping([('phone', ContactPointSystem.PHONE.value),
+                                  ('email', ContactPointSystem.EMAIL.value)], ContactPointUse.HOME.value),
+            AddressesMapping([('address', AddressType.PHYSICAL.value)], AddressUse.HOME.value),
+            MethodMapping('build_fhir_active', 'build_imis_active')
+        ])
+
+    @classmethod
+    def get_marital_map(cls):
+        return cls.get_code_map('marital', lambda: CodeMap(
+            [('M', 'married'), ('S', 'single')], cls._TEST_SYSTEM,
+            lambda imis_code, fhir_code: cls.build_constant_codeable_concept(fhir_code, cls._TEST_SYSTEM)))
+
+    @classmethod
+    def build_fhir_active(cls, fhir_patient, imis_obj):
+        fhir_patient.active = imis_obj.validity_to is None
+
+    @classmethod
+    def build_imis_active(cls, imis_obj, fhir_patient, errors):
+        imis_obj.validity_to = None if fhir_patient.active else TimeUtils.now()
+
+
+class FieldMappingTestCase(TestCase):
+
+    _TEST_UUID = "0a60f36c-62eb-11ea-bb93-93ec0339a3dd"
+    _TEST_DOB = "1990-03-24T00:00:00"
+
+    def setUp(self):
+        ModuleConfiguration.build_configuration(DEFAULT_CFG)
+
+    def create_test_imis_obj(self):
+        return SimpleNamespace(uuid=self._TEST_UUID, code="TEST_CODE", last_name="TEST_LAST_NAME",
+                               other_names="TEST_OTHER_NAME", dob=TimeUtils.str_to_date(self._TEST_DOB),
+                               gender="male", marital="S", phone="813-996-476", email=None,
+                               address="TEST_ADDRESS", validity_to=None)
+
+    def create_empty_imis_obj(self):
+        return SimpleNamespace(code=None, last_name=None, other_names=None, dob=None, gender=None, marital=None,
+                               phone=None, email=None, address=None, validity_to=None)
+
+    def test_to_fhir(self):
+        fhir_patient = FieldMappingTestConverter.get_compiled_conversion_plan().to_fhir(self.create_test_imis_obj())
+        self.assertEqual(self._TEST_UUID, fhir_patient.id)
+        self.assertEqual([self._TEST_UUID, "TEST_CODE"], [identifier.value for identifier in fhir_patient.identifier])
+        self.assertEqual(Stu3IdentifierConfig.get_fhir_chfid_type_code(),
+                         fhir_patient.identifier[1].type.coding[0].code)
+        self.assertEqual(NameUse.USUAL.value, fhir_patient.name[0].use)
+        self.assertEqual(["TEST_OTHER_NAME"], fhir_patient.name[0].given)
+        self.assertEqual(self._TEST_DOB, fhir_patient.birthDate)
+        self.assertEqual("male", fhir_patient.gender)
+        self.assertEqual("single", fhir_patient.maritalStatus.coding[0].code)
+        self.assertEqual([ContactPointSystem.PHONE.value], [telecom.system for telecom in fhir_patient.telecom])
+        self.assertEqual("TEST_ADDRESS", fhir_patient.address[0].text)
+        self.assertTrue(fhir_patient.active)
+        imis_obj = self.create_test_imis_obj()
+        imis_obj.marital = "W"
+        fhir_patient = FieldMappingTestConverter.get_compiled_conversion_plan().to_fhir(imis_obj)
+        self.assertEqual("U", fhir_patient.maritalStatus.coding[0].code)
+
+    def test_round_trip(self):
+        plan = FieldMappingTestConverter.get_compiled_conversion_plan()
+        fhir_patient = plan.to_fhir(self.create_test_imis_obj())
+        errors = []
+        imis_obj = plan.to_imis(fhir_patient, self.create_empty_imis_obj(), errors)
+        self.assertEqual([], errors)
+        expected = self.create_test_imis_obj()
+        del expected.uuid
+        self.assertEqual(vars(expected), vars(imis_obj))
+
+    def test_to_imis_errors(self):
+        errors = []
+        FieldMappingTestConverter.get_compiled_conversion_plan().to_imis(Patient(), self.create_empty_imis_obj(),
+                                                                         errors)
+        self.assertEqual(['Missing code', 'Missing family name', 'Missing birth date'], errors)
+
+    def test_plan_compiled_for_every_snapshot(self):
+        plan = FieldMappingTestConverter.get_compiled_conversion_plan()
+        self.assertIs(plan, FieldMappingTestConverter.get_compiled_conversion_plan())
+        ModuleConfiguration.build_configuration(DEFAULT_CFG)
+        self.assertIsNot(plan, FieldMappingTestConverter.get_compiled_conversion_plan())
+
+    def test_to_fhir_elements(self):
+        elements = frozenset(['identifier', 'name', 'unknown'])
+        plan = FieldMappingTestConverter.get_compiled_conversion_plan(elements)
+        self.assertIs(plan, FieldMappingTestConverter.get_compiled_conversion_plan(frozenset(['name', 'identifier'])))
+        fhir_patient = plan.to_fhir(self.create_test_imis_obj())
+        self.assertEqual({'resourceType', 'id', 'identifier', 'name', 'meta'}, set(fhir_patient.toDict()))
+        self.assertEqual(BaseFHIRConverter.SUBSETTED_CODE, fhir_patient.meta.tag[0].code)
+        self.assertEqual(['uuid', 'code', 'last_name', 'other_names'],
+                         FieldMappingTestConverter.get_conversion_plan().get_imis_fields(elements))
+
+    def test_validate_converted_fhir_objects(self):
+        fhir_patient = FieldMappingTestConverter.get_compiled_conversion_plan().to_fhir(self.create_test_imis_obj())
+        ModuleConfiguration.build_configuration(dict(DEFAULT_CFG, validate_converted_fhir_objects=True))
+        plan = FieldMappingTestConverter.get_compiled_conversion_plan()
+        with mock.patch.object(PropertyMixin, 'validate_type', autospec=True) as validate_type:
+            with FieldMappingTestConverter.trusted_construction():
+                self.assertEqual(fhir_patient.toDict(), plan.to_fhir(self.create_test_imis_obj()).toDict())
+        # the single values are validated by the `Property` descriptors, the items of the lists by the `PropertyList`
+        validated = {call[0][0].definition.name for call in validate_type.call_args_list}
+        self.assertTrue({'id', 'identifier', 'name', 'gender', 'telecom', 'address', 'system', 'value'} <= validated)
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+from unittest import mock, TestCase
+
+from claim.models import ClaimAdmin
+from insuree.models import Insuree
+
+from api_fhir.converters import ReferenceConverterMixin, PatientConverter
+from api_fhir.models import Claim, Reference, ClaimCareTeam, ClaimRelated
+from api_fhir.utils import IdentityMap, identity_map_scope
+
+
+class IdentityMapTestCase(TestCase):
+
+    def create_test_model(self, objects):
+        manager = mock.MagicMock()
+        manager.filter.return_value = objects
+        return type('TestModel', (object,), {'_default_manager': manager})
+
+    def test_load(self):
+        first, second = SimpleNamespace(uuid='A1'), SimpleNamespace(uuid='b2')
+        model = self.create_test_model([first, second])
+        identity_map = IdentityMap()
+        identity_map.load(model, 'uuid', ['a1', 'B2', 'c3', 'a1'])
+        model._default_manager.filter.assert_called_once_with(uuid__in=['a1', 'B2', 'c3'])
+        self.assertIs(first, identity_map.get(model, 'uuid', 'a1'))
+        self.assertIs(second, identity_map.get(model, 'uuid', 'b2'))
+        self.assertIsNone(identity_map.get(model, 'uuid', 'c3'))
+        identity_map.load(model, 'uuid', ['a1', 'c3'])
+        self.assertEqual(1, model._default_manager.filter.call_count)
+
+    def test_get_loads_missing_objects_once(self):
+        obj = SimpleNamespace(uuid='a1')
+        model = self.create_test_model([obj])
+        identity_map = IdentityMap()
+        self.assertIs(obj, identity_map.get(model, 'uuid', 'a1'))
+        self.assertIs(obj, identity_map.get(model, 'uuid', 'a1'))
+        model._default_manager.filter.assert_called_once_with(uuid='a1')
+
+    def test_scope(self):
+        self.assertIsNone(IdentityMap.get_current())
+        with identity_map_scope() as identity_map:
+            self.assertIs(identity_map, IdentityMap.get_current())
+            with identity_map_scope() as inner_identity_map:
+                self.assertIsNot(identity_map, inner_identity_map)
+            self.assertIs(identity_map, IdentityMap.get_current())
+        self.assertIsNone(IdentityMap.get_current())
+
+    def test_resolve_references(self):
+        claim = Claim()
+        claim.patient = Reference(reference='Patient/p1')
+        claim.facility = Reference(reference='Location/l1')
+        claim.enterer = Reference(reference='Practitioner/a1')
+        claim.careTeam = ClaimCareTeam(sequence=1, provider=Reference(reference='Practitioner/a2'))
+        claim.related = [ClaimRelated(claim=Reference(reference='Unknown/u1'))]
+        references = ReferenceConverterMixin.collect_references(claim)
+        self.assertCountEqual(['Patient/p1', 'Location/l1', 'Practitioner/a1', 'Practitioner/a2', 'Unknown/u1'],
+                              references)
+        with identity_map_scope() as identity_map:
+            with mock.patch.object(identity_map, 'load') as load_mock:
+                ReferenceConverterMixin.resolve_references(references)
+        self.assertEqual(3, load_mock.call_count)
+        load_mock.assert_any_call(Insuree, 'uuid', ['p1'])
+        load_mock.assert_any_call(ClaimAdmin, 'uuid', ['a1', 'a2'])
+
+    def test_collect_raw_references(self):
+        claim_dict = {'resourceType': 'Claim', 'patient': {'reference': 'Patient/p1'},
+                      'related': [{'claim': {'reference': 'Claim/c1'}, 'reference': {'value': 'not a reference'}}]}
+        self.assertEqual(['Patient/p1', 'Claim/c1'], ReferenceConverterMixin.collect_raw_references(claim_dict))
+
+    def test_load_keeps_case_of_codes(self):
+        obj = SimpleNamespace(code='ABC')
+        model = self.create_test_model([obj])
+        identity_map = IdentityMap()
+        identity_map.load(model, 'code', ['ABC', 'abc'])
+        self.assertIs(obj, identity_map.get(model, 'code', 'ABC'))
+        self.assertNotIn(identity_map.get_key(model, 'code', 'abc'), identity_map.objects)
+
+    def test_reference_lookup_uses_identity_map(self):
+        insuree = Insuree()
+        with identity_map_scope() as identity_map:
+            identity_map.objects[identity_map.get_key(Insuree, 'uuid', 'p1')] = insuree
+            self.assertIs(insuree, PatientConverter.get_imis_obj_by_fhir_reference(Reference(reference='Patient/P1')))
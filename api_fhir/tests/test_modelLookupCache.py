@@ -0,0 +1,80 @@
+import time
+from unittest import mock, TestCase
+
+from api_fhir.utils import ModelLookupCache
+
+
+class ModelLookupCacheTestCase(TestCase):
+
+    class TestModelDoesNotExist(Exception):
+        pass
+
+    def create_test_model(self, objects):
+        manager = mock.MagicMock()
+
+        def get(code):
+            if code not in objects:
+                raise self.TestModelDoesNotExist()
+            return objects[code]
+
+        manager.get.side_effect = get
+        return mock.MagicMock(objects=manager, DoesNotExist=self.TestModelDoesNotExist)
+
+    def tearDown(self):
+        ModelLookupCache.instances = [cache for cache in ModelLookupCache.instances if cache.name != 'test']
+
+    def test_get(self):
+        model = self.create_test_model({'A1': 'first'})
+        cache = ModelLookupCache('test', model, 'code')
+        self.assertEqual('first', cache.get('A1'))
+        self.assertEqual('first', cache.get('A1'))
+        self.assertIsNone(cache.get('B2'))
+        self.assertIsNone(cache.get('B2'))
+        self.assertIsNone(cache.get(None))
+        self.assertEqual(2, model.objects.get.call_count)
+        model.objects.get.assert_any_call(code='A1')
+        stats = cache.get_stats()
+        self.assertEqual(2, stats['hits'])
+        self.assertEqual(2, stats['misses'])
+        self.assertEqual(2, stats['size'])
+        self.assertEqual(stats, ModelLookupCache.get_all_stats()['test'])
+
+    def test_max_size(self):
+        model = self.create_test_model({'A1': 'first', 'B2': 'second', 'C3': 'third'})
+        cache = ModelLookupCache('test', model, 'code', max_size=2)
+        cache.get('A1')
+        cache.get('B2')
+        cache.get('A1')
+        cache.get('C3')
+        self.assertEqual(['A1', 'C3'], list(cache.entries))
+        cache.get('B2')
+        self.assertEqual(4, model.objects.get.call_count)
+
+    def test_invalidate(self):
+        model = self.create_test_model({'A1': 'first'})
+        cache = ModelLookupCache('test', model, 'code')
+        cache.get('A1')
+        cache.invalidate()
+        self.assertEqual(0, len(cache.entries))
+        self.assertEqual(1, cache.get_stats()['version'])
+        cache.get('A1')
+        self.assertEqual(2, model.objects.get.call_count)
+
+    def test_object_loaded_during_invalidation_is_not_kept(self):
+        model = self.create_test_model({'A1': 'first'})
+        cache = ModelLookupCache('test', model, 'code')
+        model.objects.get.side_effect = lambda **kwargs: cache.invalidate() or 'stale'
+        self.assertEqual('stale', cache.get('A1'))
+        self.assertEqual(0, len(cache.entries))
+
+    def test_miss_ttl(self):
+        model = self.create_test_model({})
+        cache = ModelLookupCache('test', model, 'code', miss_ttl=0)
+        self.assertIsNone(cache.get('A1'))
+        self.assertIsNone(cache.get('A1'))
+        self.assertEqual(2, model.objects.get.call_count)
+        cache = ModelLookupCache('test', model, 'code', miss_ttl=60)
+        cache.get('A1')
+        with mock.patch('time.monotonic', return_value=time.monotonic() + 61):
+            cache.get('A1')
+        self.assertEqual(4, model.objects.get.call_count)
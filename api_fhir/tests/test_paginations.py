@@ -0,0 +1,105 @@
+from unittest import mock, TestCase
+
+from django.db.models import QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api_fhir.configurations import GeneralConfiguration
+from api_fhir.models import Claim, Patient
+from api_fhir.paginations import FhirBundleResultsSetPagination, PaginationMode, SearchTotal
+
+
+class FhirBundleResultsSetPaginationTestCase(TestCase):
+
+    def build_request(self, query):
+        return Request(APIRequestFactory().get('/api_fhir/Patient/' + query))
+
+    def test_pagination_mode(self):
+        pagination = FhirBundleResultsSetPagination()
+        self.assertEqual(PaginationMode.CURSOR.value, pagination.get_pagination_mode(self.build_request('?_cursor=')))
+        self.assertEqual(PaginationMode.PAGE.value,
+                         pagination.get_pagination_mode(self.build_request('?page-offset=2')))
+        with mock.patch.object(GeneralConfiguration, 'get_default_pagination_mode',
+                               return_value=PaginationMode.CURSOR.value):
+            self.assertEqual(PaginationMode.CURSOR.value, pagination.get_pagination_mode(self.build_request('')))
+
+    def test_cursor_mode(self):
+        pagination = FhirBundleResultsSetPagination()
+        queryset = mock.MagicMock(spec=QuerySet)
+        with mock.patch.object(pagination, 'cursor_pagination_class') as cursor_pagination_class:
+            cursor_pagination_class.cursor_query_param = '_cursor'
+            cursor_pagination = cursor_pagination_class.return_value
+            cursor_pagination.get_next_link.return_value = 'next_link'
+            request = self.build_request('?_cursor=cD0xMA%3D%3D')
+            pagination.paginate_queryset(queryset, request)
+        cursor_pagination.paginate_queryset.assert_called_once_with(queryset, request, None)
+        self.assertEqual('next_link', pagination.get_next_link())
+        queryset.count.return_value = 25
+        self.assertEqual(25, pagination.get_total())
+
+    def test_page_mode_orders_queryset(self):
+        pagination = FhirBundleResultsSetPagination()
+        queryset = mock.MagicMock(spec=QuerySet)
+        queryset.ordered = False
+        with mock.patch.object(pagination, 'paginate_page') as paginate_page:
+            pagination.paginate_queryset(queryset, self.build_request('?page-offset=2'))
+        queryset.order_by.assert_called_once_with('id')
+        paginate_page.assert_called_once()
+        self.assertIs(queryset.order_by.return_value, paginate_page.call_args[0][0])
+
+    def test_page_without_count(self):
+        rows = list(range(25))
+        pagination = FhirBundleResultsSetPagination()
+        self.assertEqual(list(range(10, 20)),
+                         pagination.paginate_queryset(rows, self.build_request('?page-offset=2&_count=10')))
+        self.assertTrue(pagination.page.has_next())
+        self.assertNotIn('count', vars(pagination.page.paginator))
+        self.assertEqual(list(range(20, 25)),
+                         pagination.paginate_queryset(rows, self.build_request('?page-offset=3&_count=10')))
+        self.assertFalse(pagination.page.has_next())
+        self.assertEqual(25, vars(pagination.page.paginator)['count'])
+        with self.assertRaises(NotFound):
+            pagination.paginate_queryset(rows, self.build_request('?page-offset=4&_count=10'))
+
+    def test_total(self):
+        pagination = FhirBundleResultsSetPagination()
+        queryset = mock.MagicMock(spec=QuerySet)
+        queryset.ordered = True
+        queryset.__getitem__.return_value = []
+        queryset.count.return_value = 25
+        pagination.paginate_queryset(queryset, self.build_request('?page-offset=1&_total=none'))
+        self.assertIsNone(pagination.get_total())
+        pagination.paginate_queryset(queryset, self.build_request('?page-offset=1&_total=accurate'))
+        self.assertEqual(0, pagination.get_total())
+        with mock.patch('api_fhir.paginations.query_count_estimator') as query_count_estimator:
+            query_count_estimator.estimate.return_value = 30
+            pagination.paginate_queryset(queryset, self.build_request('?page-offset=1&_total=estimate'))
+            self.assertEqual(30, pagination.get_total())
+        query_count_estimator.estimate.assert_called_once_with(
+            queryset, GeneralConfiguration.get_search_total_estimate_ttl())
+        with mock.patch.object(GeneralConfiguration, 'get_default_search_total',
+                               return_value=SearchTotal.NONE.value):
+            pagination.paginate_queryset(queryset, self.build_request('?page-offset=1&_total=unknown'))
+            self.assertIsNone(pagination.get_total())
+
+    def test_summary_count(self):
+        pagination = FhirBundleResultsSetPagination()
+        queryset = mock.MagicMock(spec=QuerySet)
+        queryset.count.return_value = 25
+        request = self.build_request('?_summary=count&_total=none')
+        self.assertEqual([], pagination.paginate_queryset(queryset, request))
+        queryset.__getitem__.assert_not_called()
+        bundle = pagination.build_bundle_set([])
+        self.assertEqual(25, bundle.total)
+        self.assertEqual([], bundle.entry)
+        self.assertEqual(['self'], [link.relation for link in bundle.link])
+
+    def test_included_resources(self):
+        pagination = FhirBundleResultsSetPagination()
+        pagination.paginate_queryset([], Request(APIRequestFactory().get('/api_fhir/Claim/?_include=Claim:patient')))
+        pagination.included_resources = [Patient(id='included')]
+        bundle = pagination.build_bundle_set([Claim(id='match')])
+        self.assertEqual([('http://testserver/api_fhir/Claim/match', 'match'),
+                          ('http://testserver/api_fhir/Patient/included', 'include')],
+                         [(entry.fullUrl, entry.search.mode) for entry in bundle.entry])
@@ -1,9 +1,12 @@
 import os
 from unittest import mock
 
+from insuree.models import Gender, Insuree
+
+from api_fhir.configurations import GeneralConfiguration
 from api_fhir.converters import PatientConverter
 
-from api_fhir.models import FHIRBaseObject
+from api_fhir.models import FHIRBaseObject, Patient, AdministrativeGender
 from api_fhir.tests import PatientTestMixin
 
 
@@ -31,6 +34,33 @@ class PatientConverterTestCase(PatientTestMixin):
         imis_insuree = PatientConverter.to_imis_obj(fhir_patient, None)
         self.verify_imis_instance(imis_insuree)
 
+    @mock.patch('insuree.models.Gender.objects')
+    def test_build_imis_other_gender(self, mock_gender):
+        self.setUp()
+        other_gender = Gender(code=GeneralConfiguration.get_other_gender_code())
+        mock_gender.get.return_value = other_gender
+        fhir_patient = self.create_test_fhir_instance()
+        fhir_patient.gender = AdministrativeGender.OTHER.value
+        imis_insuree = Insuree()
+        PatientConverter.build_imis_gender(imis_insuree, fhir_patient)
+        mock_gender.get.assert_called_once_with(code=GeneralConfiguration.get_other_gender_code())
+        self.assertIs(other_gender, imis_insuree.gender)
+        fhir_patient = Patient()
+        PatientConverter.build_fhir_gender(fhir_patient, imis_insuree)
+        self.assertEqual(AdministrativeGender.OTHER.value, fhir_patient.gender)
+
+    @mock.patch('insuree.models.Gender.objects')
+    def test_build_imis_unknown_gender(self, mock_gender):
+        self.setUp()
+        mock_gender.get.side_effect = Gender.DoesNotExist()
+        fhir_patient = self.create_test_fhir_instance()
+        fhir_patient.gender = AdministrativeGender.MALE.value
+        errors = []
+        PatientConverter.build_imis_gender(Insuree(), fhir_patient, errors)
+        self.assertEqual(1, len(errors))
+        PatientConverter.build_imis_gender(Insuree(), fhir_patient, [])
+        self.assertEqual(2, mock_gender.get.call_count)
+
     def test_create_object_from_json(self):
         self.setUp()
         fhir_patient = FHIRBaseObject.loads(self._test_patient_json_representation, 'json')
@@ -0,0 +1,91 @@
+import datetime
+from unittest import mock, TestCase
+
+from django.db.models.signals import post_save
+from product.models import Product, ProductItem, ProductService
+
+from api_fhir.converters.coverageConventer import ProductCoverageCache, product_coverage_cache
+
+
+class ProductCoverageCacheTestCase(TestCase):
+
+    _TEST_VALIDITY_FROM = datetime.datetime(2020, 1, 1)
+
+    def create_test_product(self, product_id):
+        product = Product()
+        product.id = product_id
+        product.validity_from = self._TEST_VALIDITY_FROM
+        return product
+
+    def mock_codes(self, manager_mock, rows):
+        manager_mock.filter.return_value.order_by.return_value.values_list.return_value = rows
+
+    @mock.patch('product.models.ProductItem.objects')
+    @mock.patch('product.models.ProductService.objects')
+    def test_load(self, ps_mock, pi_mock):
+        self.mock_codes(pi_mock, [(1, 'I1'), (2, 'I2'), (1, 'I3')])
+        self.mock_codes(ps_mock, [(2, 'S1')])
+        cache = ProductCoverageCache()
+        first_product, second_product = self.create_test_product(1), self.create_test_product(2)
+        cache.load([first_product, second_product, self.create_test_product(1)])
+        self.assertEqual(1, pi_mock.filter.call_count)
+        self.assertEqual(1, ps_mock.filter.call_count)
+        self.assertEqual((['I1', 'I3'], []), cache.get(first_product))
+        self.assertEqual((['I2'], ['S1']), cache.get(second_product))
+        cache.load([first_product, second_product])
+        self.assertEqual(1, pi_mock.filter.call_count)
+
+    @mock.patch('product.models.ProductItem.objects')
+    @mock.patch('product.models.ProductService.objects')
+    def test_key_contains_validity(self, ps_mock, pi_mock):
+        self.mock_codes(pi_mock, [(1, 'I1')])
+        self.mock_codes(ps_mock, [])
+        cache = ProductCoverageCache()
+        product = self.create_test_product(1)
+        cache.get(product)
+        product.validity_to = datetime.datetime(2020, 2, 1)
+        cache.get(product)
+        self.assertEqual(2, pi_mock.filter.call_count)
+
+    @mock.patch('product.models.ProductItem.objects')
+    @mock.patch('product.models.ProductService.objects')
+    def test_invalidated_by_signals(self, ps_mock, pi_mock):
+        self.mock_codes(pi_mock, [(1, 'I1')])
+        self.mock_codes(ps_mock, [(1, 'S1')])
+        product_coverage_cache.clear()
+        product, other_product = self.create_test_product(1), self.create_test_product(2)
+        product_coverage_cache.load([product, other_product])
+        product_item = ProductItem()
+        product_item.product_id = 1
+        post_save.send(sender=ProductItem, instance=product_item, created=False)
+        self.assertEqual(1, len(product_coverage_cache.coverages))
+        product_service = ProductService()
+        product_service.product_id = 2
+        post_save.send(sender=ProductService, instance=product_service, created=False)
+        self.assertEqual(0, len(product_coverage_cache.coverages))
+        product_coverage_cache.load([product])
+        post_save.send(sender=Product, instance=product, created=False)
+        self.assertEqual(0, len(product_coverage_cache.coverages))
+
+    @mock.patch('product.models.ProductItem.objects')
+    @mock.patch('product.models.ProductService.objects')
+    def test_size_is_bounded(self, ps_mock, pi_mock):
+        self.mock_codes(pi_mock, [(1, 'I1'), (2, 'I2')])
+        self.mock_codes(ps_mock, [])
+        cache = ProductCoverageCache(max_size=1)
+        first_product, second_product = self.create_test_product(1), self.create_test_product(2)
+        coverages = cache.load([first_product, second_product])
+        self.assertEqual((['I1'], []), coverages[cache.get_key(first_product)])
+        self.assertEqual((['I2'], []), coverages[cache.get_key(second_product)])
+        self.assertEqual([cache.get_key(second_product)], list(cache.coverages))
+
+    @mock.patch('product.models.ProductItem.objects')
+    @mock.patch('product.models.ProductService.objects')
+    def test_get_while_cleared(self, ps_mock, pi_mock):
+        cache = ProductCoverageCache()
+        self.mock_codes(ps_mock, [])
+        pi_mock.filter.return_value.order_by.return_value.values_list.side_effect = \
+            lambda *args: cache.clear() or [(1, 'I1')]
+        product = self.create_test_product(1)
+        self.assertEqual((['I1'], []), cache.get(product))
+        self.assertEqual(0, len(cache.coverages))
@@ -0,0 +1,33 @@
+from unittest import mock, TestCase
+
+from api_fhir.utils import QueryCountEstimator
+
+
+class QueryCountEstimatorTestCase(TestCase):
+
+    def create_test_queryset(self, sql, count):
+        queryset = mock.MagicMock()
+        queryset.db = 'default'
+        queryset.query.sql_with_params.return_value = (sql, (1,))
+        queryset.count.return_value = count
+        return queryset
+
+    @mock.patch.object(QueryCountEstimator, 'get_planner_estimate', return_value=None)
+    @mock.patch('api_fhir.utils.queryCountEstimator.time')
+    def test_cached_count(self, mock_time, mock_planner_estimate):
+        mock_time.monotonic.return_value = 100
+        estimator = QueryCountEstimator(max_size=1)
+        queryset = self.create_test_queryset('SELECT 1', 25)
+        self.assertEqual(25, estimator.estimate(queryset, 60))
+        queryset.count.return_value = 26
+        self.assertEqual(25, estimator.estimate(queryset, 60))
+        mock_time.monotonic.return_value = 161
+        self.assertEqual(26, estimator.estimate(queryset, 60))
+        self.assertEqual(3, estimator.estimate(self.create_test_queryset('SELECT 2', 3), 60))
+        self.assertEqual(1, len(estimator.entries))
+
+    @mock.patch.object(QueryCountEstimator, 'get_planner_estimate', return_value=1000)
+    def test_planner_estimate(self, mock_planner_estimate):
+        queryset = self.create_test_queryset('SELECT 1', 25)
+        self.assertEqual(1000, QueryCountEstimator().estimate(queryset, 60))
+        queryset.count.assert_not_called()
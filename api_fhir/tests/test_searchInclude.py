@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+from unittest import mock, TestCase
+
+from api_fhir.converters import SearchInclude, PatientConverter
+from api_fhir.permissions import FHIRApiInsureePermissions
+
+
+class SearchIncludeTestCase(TestCase):
+
+    def test_load(self):
+        model = mock.MagicMock()
+        queryset = model.get_queryset.return_value.filter.return_value
+        imis_claims = [SimpleNamespace(insuree_id=2), SimpleNamespace(insuree_id=None), SimpleNamespace(insuree_id=1),
+                       SimpleNamespace(insuree_id=2)]
+        search_include = SearchInclude(PatientConverter, model, 'insuree_id', FHIRApiInsureePermissions)
+        with mock.patch.object(PatientConverter, 'to_fhir_objs', return_value=['patient']) as to_fhir_objs:
+            self.assertEqual(['patient'], search_include.load(imis_claims, 'user'))
+        model.get_queryset.assert_called_once_with(None, 'user')
+        model.get_queryset.return_value.filter.assert_called_once_with(id__in=[2, 1])
+        to_fhir_objs.assert_called_once_with(queryset)
+
+    def test_load_without_ids(self):
+        model = mock.MagicMock()
+        search_include = SearchInclude(PatientConverter, model, 'insuree_id', FHIRApiInsureePermissions)
+        self.assertEqual([], search_include.load([SimpleNamespace(insuree_id=None)], 'user'))
+        model.get_queryset.assert_not_called()
+
+    def test_has_permission(self):
+        user = mock.MagicMock()
+        search_include = SearchInclude(PatientConverter, mock.MagicMock(), 'insuree_id', FHIRApiInsureePermissions)
+        user.has_perms.return_value = False
+        self.assertFalse(search_include.has_permission(user))
+        user.has_perms.assert_called_once_with(FHIRApiInsureePermissions.permissions_get)
@@ -1,4 +1,7 @@
 from api_fhir.utils.functionUtils import FunctionUtils
 from api_fhir.utils.timeUtils import TimeUtils
-from api_fhir.utils.fhiUtils import FhirUtils
+from api_fhir.utils.fhiUtils import FhirUtils, SearchSummary
 from api_fhir.utils.dbManagerUtils import DbManagerUtils
+from api_fhir.utils.identityMap import IdentityMap, identity_map_scope
+from api_fhir.utils.modelLookupCache import ModelLookupCache
+from api_fhir.utils.queryCountEstimator import QueryCountEstimator
@@ -1,3 +1,12 @@
+from enum import Enum
+
+
+class SearchSummary(Enum):
+    TRUE = "true"
+    COUNT = "count"
+    FALSE = "false"
+
+
 class FhirUtils(object):
 
     __ARRAY_ID_OFFSET = 1  # used to start iterating from 1
@@ -5,3 +14,22 @@ class FhirUtils(object):
     @classmethod
     def get_next_array_sequential_id(cls, array):
         return len(array) + cls.__ARRAY_ID_OFFSET
+
+    @classmethod
+    def get_requested_summary(cls, query_params):
+        # the `_summary` of the search, the other values than `true` and `count` return the whole resources
+        summary = query_params.get('_summary')
+        if summary in [SearchSummary.TRUE.value, SearchSummary.COUNT.value]:
+            return summary
+        return SearchSummary.FALSE.value
+
+    @classmethod
+    def get_requested_elements(cls, query_params, summary_elements=None):
+        # the elements of the `_elements` search parameter or the `summary_elements` of the resource for
+        # `_summary=true`, `None` if the whole resources are requested
+        if cls.get_requested_summary(query_params) == SearchSummary.TRUE.value:
+            return summary_elements
+        elements = query_params.get('_elements')
+        if not elements:
+            return None
+        return frozenset(element.strip() for element in elements.split(',') if element.strip())
@@ -0,0 +1,83 @@
+import threading
+from contextlib import contextmanager
+
+from django.core.exceptions import ValidationError, FieldDoesNotExist
+from django.db import models
+
+from api_fhir.utils.dbManagerUtils import DbManagerUtils
+
+
+class IdentityMapState(threading.local):
+    identity_map = None
+
+
+identity_map_state = IdentityMapState()
+
+
+class IdentityMap(object):
+    # the IMIS objects looked up by a field during one request, every object is loaded once and the misses are kept
+    # as `None`; the values are compared as strings, like the ids of the FHIR references, and only the UUIDs
+    # ignore the case
+
+    def __init__(self):
+        self.objects = dict()
+
+    @classmethod
+    def get_current(cls):
+        return identity_map_state.identity_map
+
+    def get(self, model, field, value):
+        key = self.get_key(model, field, value)
+        if key not in self.objects:
+            self.objects[key] = DbManagerUtils.get_object_or_none(model, **{field: value})
+        return self.objects[key]
+
+    def load(self, model, field, values):
+        # loads all the objects missing in the map with one `IN` query
+        missing = {}
+        for value in values:
+            key = self.get_key(model, field, value)
+            if key not in self.objects:
+                missing[key] = value
+        if not missing:
+            return
+        try:
+            objects = list(model._default_manager.filter(**{field + '__in': list(missing.values())}))
+        except (ValueError, ValidationError):
+            # a value of a wrong type, the objects are looked up one by one and the lookup reports it
+            return
+        if self.is_uuid_field(model, field):
+            # the other values missing in the result are looked up one by one like before, the database may compare
+            # them differently (e.g. with a case-insensitive collation)
+            for key in missing:
+                self.objects[key] = None
+        for obj in objects:
+            key = self.get_key(model, field, getattr(obj, field))
+            if self.objects.get(key) is None:
+                self.objects[key] = obj
+
+    def get_key(self, model, field, value):
+        value = str(value)
+        if self.is_uuid_field(model, field):
+            value = value.lower()
+        return model, field, value
+
+    def is_uuid_field(self, model, field):
+        # the openIMIS models keep their UUIDs in `uuid` char fields
+        if field == 'uuid':
+            return True
+        try:
+            return isinstance(model._meta.get_field(field), models.UUIDField)
+        except (AttributeError, FieldDoesNotExist):
+            return False
+
+
+@contextmanager
+def identity_map_scope():
+    # the lookups of the FHIR references made inside this context share one identity map, e.g. during a request
+    previous = identity_map_state.identity_map
+    identity_map_state.identity_map = IdentityMap()
+    try:
+        yield identity_map_state.identity_map
+    finally:
+        identity_map_state.identity_map = previous
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+
+
+class ModelLookupCache(object):
+    # the IMIS objects of a rarely changing catalogue (e.g. the diagnoses or the genders) looked up by a field; the
+    # entries are kept in the process up to `max_size` (the least recently used one is dropped first), the misses are
+    # kept as `None` for `miss_ttl` seconds (not at all with 0) and everything is dropped by `invalidate`, which the
+    # signals of the model call
+
+    instances = []
+
+    def __init__(self, name, model, field, max_size=2048, miss_ttl=60):
+        self.name = name
+        self.model = model
+        self.field = field
+        self.max_size = max_size
+        self.miss_ttl = miss_ttl
+        self.entries = OrderedDict()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        ModelLookupCache.instances.append(self)
+
+    def get(self, value):
+        if value is None:
+            return None
+        key = str(value)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            version = self.version
+        obj = self.load(value)
+        with self.lock:
+            # an object loaded before an invalidation could be stale already
+            if version == self.version and (obj is not None or self.miss_ttl > 0):
+                self.entries[key] = (obj, None if obj is not None else time.monotonic() + self.miss_ttl)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+        return obj
+
+    def load(self, value):
+        try:
+            return self.model.objects.get(**{self.field: value})
+        except (self.model.DoesNotExist, ValueError, ValidationError):
+            return None
+
+    def invalidate(self, **kwargs):
+        with self.lock:
+            self.entries.clear()
+            self.version += 1
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'version': self.version
+            }
+
+    @classmethod
+    def get_all_stats(cls):
+        return {cache.name: cache.get_stats() for cache in cls.instances}
+
+    @classmethod
+    def invalidate_all(cls):
+        for cache in cls.instances:
+            cache.invalidate()
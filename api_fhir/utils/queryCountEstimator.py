@@ -0,0 +1,59 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from django.db import connections, DatabaseError
+
+
+class QueryCountEstimator(object):
+    # the approximate number of rows of a queryset: the estimate of the query planner where the database gives one
+    # (PostgreSQL), the exact count kept for `ttl` seconds otherwise; the counts are keyed by the SQL of the queryset,
+    # so the querysets filtered for different users don't share them
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def estimate(self, queryset, ttl):
+        count = self.get_planner_estimate(queryset)
+        if count is None:
+            count = self.get_cached_count(queryset, ttl)
+        return count
+
+    def get_planner_estimate(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = queryset.query.sql_with_params()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+                plan = cursor.fetchone()[0]
+        except DatabaseError:
+            return None
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def get_cached_count(self, queryset, ttl):
+        sql, params = queryset.query.sql_with_params()
+        key = (queryset.db, sql, str(params))
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(key)
+                return entry[1]
+        count = queryset.count()
+        with self.lock:
+            self.entries[key] = (now + ttl, count)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return count
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -1,3 +1,5 @@
+import datetime
+
 import core
 from dateutil import parser
 
@@ -14,5 +16,18 @@ class TimeUtils(object):
 
     @classmethod
     def str_to_date(cls, str_value):
-        py_date = parser.parse(str_value)
+        py_date = cls.parse_datetime(str_value)
         return core.datetime.datetime.from_ad_datetime(py_date)
+
+    @classmethod
+    def parse_datetime(cls, str_value):
+        # the full FHIR dates and dateTimes are parsed (and cached) by the `FHIRDate`, other values by dateutil
+        from api_fhir.models import FHIRDate  # the models import the utils through the exceptions
+        py_date = None
+        if FHIRDate.validate_type(str_value):
+            py_date = FHIRDate.parse(str_value)
+        if isinstance(py_date, datetime.datetime):
+            return py_date
+        elif isinstance(py_date, datetime.date) and len(str_value) == 10:
+            return datetime.datetime(py_date.year, py_date.month, py_date.day)
+        return parser.parse(str_value)
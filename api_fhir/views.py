@@ -1,4 +1,5 @@
-from api_fhir.converters import OperationOutcomeConverter
+from api_fhir.converters import OperationOutcomeConverter, PatientConverter, LocationConverter, PractitionerConverter, \
+    ClaimResponseConverter, SearchInclude
 from api_fhir.permissions import FHIRApiClaimPermissions, FHIRApiEligibilityRequestPermissions, \
     FHIRApiCoverageRequestPermissions, FHIRApiCommunicationRequestPermissions, FHIRApiPractitionerPermissions, \
     FHIRApiHFPermissions, FHIRApiInsureePermissions
@@ -15,12 +16,15 @@ from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 import datetime
 from api_fhir.paginations import FhirBundleResultsSetPagination
+from api_fhir.parsers import FHIRJSONParser
+from api_fhir.renderers import FHIRJSONRenderer, FHIRApplicationJSONRenderer
 from api_fhir.permissions import FHIRApiPermissions
 from api_fhir.configurations import Stu3EligibilityConfiguration as Config
 from api_fhir.serializers import PatientSerializer, LocationSerializer, PractitionerRoleSerializer, \
     PractitionerSerializer, ClaimSerializer, EligibilityRequestSerializer, PolicyEligibilityRequestSerializer, \
     ClaimResponseSerializer, CommunicationRequestSerializer
 from api_fhir.serializers.coverageSerializer import CoverageSerializer
+from api_fhir.utils import identity_map_scope, FhirUtils
 
 
 class CsrfExemptSessionAuthentication(SessionAuthentication):
@@ -32,6 +36,37 @@ class BaseFHIRView(APIView):
     pagination_class = FhirBundleResultsSetPagination
     permission_classes = (FHIRApiPermissions,)
     authentication_classes = [CsrfExemptSessionAuthentication] + APIView.settings.DEFAULT_AUTHENTICATION_CLASSES
+    renderer_classes = [FHIRJSONRenderer, FHIRApplicationJSONRenderer] + APIView.settings.DEFAULT_RENDERER_CLASSES
+    parser_classes = [FHIRJSONParser] + APIView.settings.DEFAULT_PARSER_CLASSES
+    # the `SearchInclude` of the supported `_include` and `_revinclude` values, e.g. `Claim:patient`
+    search_includes = {}
+    search_revincludes = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        # the IMIS objects of the FHIR references are loaded once per request
+        with identity_map_scope():
+            return super().dispatch(request, *args, **kwargs)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page:
+            self.paginator.included_resources = self.get_included_resources(page)
+        return page
+
+    def get_included_resources(self, imis_objs):
+        # the resources included by the search for the whole page, a resource included by several parameters is
+        # returned once; the values which aren't supported, or whose resources the user has no right to read, are
+        # ignored
+        included = {}
+        for param, search_includes in [('_include', self.search_includes),
+                                       ('_revinclude', self.search_revincludes)]:
+            for value in dict.fromkeys(self.request.query_params.getlist(param)):
+                search_include = search_includes.get(value)
+                if search_include is None or not search_include.has_permission(self.request.user):
+                    continue
+                for fhir_obj in search_include.load(imis_objs, self.request.user):
+                    included.setdefault((type(fhir_obj).__name__, fhir_obj.id), fhir_obj)
+        return list(included.values())
 
 
 class InsureeViewSet(BaseFHIRView, viewsets.ModelViewSet):
@@ -61,7 +96,12 @@ class InsureeViewSet(BaseFHIRView, viewsets.ModelViewSet):
         if identifier:
             queryset = queryset.filter(chf_id=identifier)
 
-        serializer = PatientSerializer(self.paginate_queryset(queryset), many=True)
+        # the relations read by the converter are joined to the page query, the columns which aren't read by the
+        # requested `_elements` (or the elements of `_summary=true`) aren't loaded
+        elements = FhirUtils.get_requested_elements(request.query_params, PatientConverter.get_summary_elements())
+        queryset = PatientConverter.load_related_objects(queryset, elements)
+        serializer = PatientSerializer(self.paginate_queryset(queryset), many=True,
+                                       context=self.get_serializer_context())
         return self.get_paginated_response(serializer.data)
 
     def get_queryset(self):
@@ -78,7 +118,10 @@ class HFViewSet(BaseFHIRView, viewsets.ModelViewSet):
         if identifier:
             queryset = queryset.filter(code=identifier)
 
-        serializer = LocationSerializer(self.paginate_queryset(queryset), many=True)
+        elements = FhirUtils.get_requested_elements(request.query_params, LocationConverter.get_summary_elements())
+        queryset = LocationConverter.load_related_objects(queryset, elements)
+        serializer = LocationSerializer(self.paginate_queryset(queryset), many=True,
+                                        context=self.get_serializer_context())
         return self.get_paginated_response(serializer.data)
 
     def get_queryset(self):
@@ -89,6 +132,10 @@ class PractitionerRoleViewSet(BaseFHIRView, viewsets.ModelViewSet):
     lookup_field = 'uuid'
     serializer_class = PractitionerRoleSerializer
     permission_classes = (FHIRApiPractitionerPermissions,)
+    search_includes = {
+        'PractitionerRole:location': SearchInclude(LocationConverter, HealthFacility, 'health_facility_id',
+                                                   FHIRApiHFPermissions)
+    }
 
     def perform_destroy(self, instance):
         instance.health_facility_id = None
@@ -109,7 +156,10 @@ class PractitionerViewSet(BaseFHIRView, viewsets.ModelViewSet):
         if identifier:
             queryset = queryset.filter(code=identifier)
 
-        serializer = PractitionerSerializer(self.paginate_queryset(queryset), many=True)
+        elements = FhirUtils.get_requested_elements(request.query_params, PractitionerConverter.get_summary_elements())
+        queryset = PractitionerConverter.load_related_objects(queryset, elements)
+        serializer = PractitionerSerializer(self.paginate_queryset(queryset), many=True,
+                                            context=self.get_serializer_context())
         return self.get_paginated_response(serializer.data)
 
     def get_queryset(self):
@@ -121,6 +171,16 @@ class ClaimViewSet(BaseFHIRView, mixins.RetrieveModelMixin, mixins.ListModelMixi
     lookup_field = 'uuid'
     serializer_class = ClaimSerializer
     permission_classes = (FHIRApiClaimPermissions,)
+    search_includes = {
+        'Claim:patient': SearchInclude(PatientConverter, Insuree, 'insuree_id', FHIRApiInsureePermissions),
+        'Claim:facility': SearchInclude(LocationConverter, HealthFacility, 'health_facility_id',
+                                        FHIRApiHFPermissions),
+        'Claim:enterer': SearchInclude(PractitionerConverter, ClaimAdmin, 'admin_id', FHIRApiPractitionerPermissions)
+    }
+    # the response of a claim is converted from the same IMIS claim
+    search_revincludes = {
+        'ClaimResponse:request': SearchInclude(ClaimResponseConverter, Claim, 'id', FHIRApiClaimPermissions)
+    }
 
     def get_queryset(self):
         return Claim.get_queryset(None, self.request.user)
@@ -0,0 +1,39 @@
+import copy
+import json
+import os
+import timeit
+
+import django
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_fhir', 'tests', 'test')
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'openIMIS.settings')
+    django.setup()
+
+
+def load_test_json(file_name):
+    with open(os.path.join(TEST_DATA_DIR, file_name)) as json_file:
+        return json_file.read()
+
+
+def build_bundle_dict(file_name, count):
+    resource = json.loads(load_test_json(file_name))
+    bundle = {'resourceType': 'Bundle', 'type': 'searchset', 'total': count, 'entry': []}
+    for index in range(count):
+        entry_resource = copy.deepcopy(resource)
+        entry_resource['id'] = str(index)
+        bundle['entry'].append({'fullUrl': 'http://localhost/api_fhir/{}/{}'.format(resource['resourceType'], index),
+                                'resource': entry_resource})
+    return bundle
+
+
+def build_bundle_json(file_name, count):
+    return json.dumps(build_bundle_dict(file_name, count))
+
+
+def measure(label, func, number=1000, repeat=5):
+    best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    print('{:<60} {:>12.4f} ms'.format(label, best * 1000))
+    return best
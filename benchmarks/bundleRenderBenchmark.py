@@ -0,0 +1,47 @@
+import tracemalloc
+
+from benchmarkUtils import setup_django, measure, build_bundle_json
+
+setup_django()
+
+from rest_framework.renderers import JSONRenderer
+
+from api_fhir.models import FHIRBaseObject
+from api_fhir.renderers import FHIRJSONRenderer
+
+
+def measure_peak_memory(label, func):
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('{:<60} {:>12.0f} bytes'.format(label, peak))
+    return peak
+
+
+def render_dict(bundle):
+    # rendering of the bundle before the `FHIRJSONRenderer`: `toDict()` rendered by the default `JSONRenderer`
+    return JSONRenderer().render(bundle.toDict())
+
+
+def render_streamed(bundle):
+    return FHIRJSONRenderer().render(bundle)
+
+
+def main():
+    for file_name in ['test_patient.json', 'test_claim.json']:
+        bundle = FHIRBaseObject.loads(build_bundle_json(file_name, 1000), 'json')
+        resource_type = bundle.entry[0].resource.__class__.__name__
+        assert render_dict(bundle) == render_streamed(bundle)
+        measure('render of a 1000 {} bundle, toDict()'.format(resource_type),
+                lambda: render_dict(bundle), number=3)
+        measure('render of a 1000 {} bundle, streamed'.format(resource_type),
+                lambda: render_streamed(bundle), number=3)
+        measure_peak_memory('peak memory of a 1000 {} bundle render, toDict()'.format(resource_type),
+                            lambda: render_dict(bundle))
+        measure_peak_memory('peak memory of a 1000 {} bundle render, streamed'.format(resource_type),
+                            lambda: render_streamed(bundle))
+
+
+if __name__ == '__main__':
+    main()
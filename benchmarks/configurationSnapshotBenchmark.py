@@ -0,0 +1,64 @@
+from unittest import mock
+
+from benchmarkUtils import setup_django, measure
+
+setup_django()
+
+from api_fhir.configurations import BaseConfiguration, GeneralConfiguration, Stu3ApiFhirConfig
+from api_fhir.converters import BaseFHIRConverter
+from api_fhir.converters.claimConverter import ClaimConverter
+from api_fhir.tests import ClaimTestMixin
+
+
+class GetterSection(object):
+    # reads every value through the getter of the configuration class, like the converters did before the snapshot
+
+    def __init__(self, configuration):
+        self.configuration = configuration
+
+    def __getattr__(self, name):
+        return getattr(self.configuration, 'get_' + name)()
+
+
+class GetterConfiguration(object):
+
+    def __init__(self):
+        self.general = GetterSection(GeneralConfiguration)
+        self.identifier = GetterSection(Stu3ApiFhirConfig.get_identifier_configuration())
+        self.claim = GetterSection(Stu3ApiFhirConfig.get_claim_configuration())
+
+
+def build_imis_claim(item_count):
+    claim_test_mixin = ClaimTestMixin()
+    claim_test_mixin.setUp()
+    imis_claim = claim_test_mixin.create_test_imis_instance()
+    imis_claim.fhir_claim_items = [claim_test_mixin.create_test_claim_item() for _ in range(item_count)]
+    imis_claim.fhir_claim_services = [claim_test_mixin.create_test_claim_service() for _ in range(item_count)]
+    return imis_claim
+
+
+def count_config_lookups(func):
+    with mock.patch.object(BaseConfiguration, 'get_config', side_effect=BaseConfiguration.get_config) as get_config:
+        func()
+    return get_config.call_count
+
+
+def main():
+    for item_count in [1, 10, 100]:
+        imis_claim = build_imis_claim(item_count)
+        label = 'Claim with {} items and {} services'.format(item_count, item_count)
+        with mock.patch.object(BaseFHIRConverter, 'get_configuration', return_value=GetterConfiguration()):
+            print('{:<60} {:>12} lookups'.format(label + ', getters',
+                                                 count_config_lookups(lambda: ClaimConverter.to_fhir_obj(imis_claim))))
+            measure(label + ', getters', lambda: ClaimConverter.to_fhir_obj(imis_claim), number=100)
+        print('{:<60} {:>12} lookups'.format(label + ', snapshot',
+                                             count_config_lookups(lambda: ClaimConverter.to_fhir_obj(imis_claim))))
+        measure(label + ', snapshot', lambda: ClaimConverter.to_fhir_obj(imis_claim), number=100)
+    snapshot = BaseConfiguration.get_snapshot()
+    measure('one value through the getter', Stu3ApiFhirConfig.get_claim_configuration().get_fhir_claim_item_code,
+            number=100000)
+    measure('one value of the snapshot', lambda: snapshot.claim.fhir_claim_item_code, number=100000)
+
+
+if __name__ == '__main__':
+    main()
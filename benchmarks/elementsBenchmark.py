@@ -0,0 +1,23 @@
+from benchmarkUtils import setup_django
+
+setup_django()
+
+from api_fhir.converters import PatientConverter
+from api_fhir.tests import PatientTestMixin
+from fieldMappingBenchmark import build_records, measure_records, RECORD_COUNT
+
+ELEMENTS = frozenset(['identifier', 'name'])
+
+
+def main():
+    records = build_records(PatientTestMixin())
+    print('columns read for Patient?_elements={}: {}'.format(
+        ','.join(sorted(ELEMENTS)), ', '.join(PatientConverter.get_elements_fields(ELEMENTS))))
+    measure_records('to_fhir_obj() of {} Patient, full resource'.format(RECORD_COUNT),
+                    PatientConverter.get_elements_converter(), records)
+    measure_records('to_fhir_obj() of {} Patient, _elements={}'.format(RECORD_COUNT, ','.join(sorted(ELEMENTS))),
+                    PatientConverter.get_elements_converter(ELEMENTS), records)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import re
+
+from benchmarkUtils import setup_django, measure
+
+setup_django()
+
+from dateutil import parser
+
+from api_fhir.models import FHIRDate
+from api_fhir.utils import TimeUtils
+
+VALUES = ['2019-03-24', '2019-03-24T10:15:30', '2019-03-24T10:15:30.123+01:00', '10:15:30', '2019-03']
+
+
+def search_validate_type(value):
+    # the unanchored validation used before the patterns were precompiled
+    valid = False
+    if value and isinstance(value, str):
+        if re.search(FHIRDate._datetime_regex, value):
+            valid = True
+        if not valid and re.search(FHIRDate._date_regex, value):
+            valid = True
+        if not valid and re.search(FHIRDate._time_regex, value):
+            valid = True
+    return valid
+
+
+def main():
+    measure('validate {} values, re.search'.format(len(VALUES)),
+            lambda: [search_validate_type(value) for value in VALUES], number=10000)
+    measure('validate {} values, FHIRDate'.format(len(VALUES)),
+            lambda: [FHIRDate.validate_type(value) for value in VALUES], number=10000)
+    values = VALUES[:3]
+    measure('parse {} values, dateutil'.format(len(values)),
+            lambda: [parser.parse(value) for value in values], number=10000)
+    measure('parse {} values, TimeUtils.parse_datetime'.format(len(values)),
+            lambda: [TimeUtils.parse_datetime(value) for value in values], number=10000)
+
+
+if __name__ == '__main__':
+    main()
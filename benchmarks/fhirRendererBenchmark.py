@@ -0,0 +1,43 @@
+from benchmarkUtils import setup_django, measure, build_bundle_json
+
+setup_django()
+
+from rest_framework.renderers import JSONRenderer
+
+from api_fhir.models import FHIRBaseObject
+from api_fhir.renderers import FHIRJSONRenderer, orjson
+
+
+class StdlibFHIRJSONRenderer(FHIRJSONRenderer):
+
+    def can_use_orjson(self, indent):
+        return False
+
+
+def print_size(label, payload):
+    print('{:<60} {:>12} bytes'.format(label, len(payload)))
+
+
+def main():
+    if orjson is None:
+        print('orjson is not installed, the FHIR renderer uses the stdlib encoder')
+    pretty_type = 'application/fhir+json; indent=2'
+    for file_name in ['test_patient.json', 'test_claim.json']:
+        bundle = FHIRBaseObject.loads(build_bundle_json(file_name, 1000), 'json')
+        resource_type = bundle.entry[0].resource.__class__.__name__
+        label = 'of a 1000 {} bundle'.format(resource_type)
+        renderers = [('FHIR renderer', FHIRJSONRenderer()), ('FHIR renderer, stdlib', StdlibFHIRJSONRenderer())]
+        measure('render {}, toDict() + JSONRenderer'.format(label),
+                lambda: JSONRenderer().render(bundle.toDict()), number=3)
+        measure('render {}, toJSON()'.format(label), bundle.toJSON, number=3)
+        for name, renderer in renderers:
+            measure('render {}, {}'.format(label, name), lambda: renderer.render(bundle), number=3)
+            measure('render {}, {}, _pretty'.format(label, name),
+                    lambda: renderer.render(bundle, pretty_type), number=3)
+        print_size('size {}, toJSON()'.format(label), bundle.toJSON().encode())
+        print_size('size {}, FHIR renderer'.format(label), FHIRJSONRenderer().render(bundle))
+        print_size('size {}, FHIR renderer, _pretty'.format(label), FHIRJSONRenderer().render(bundle, pretty_type))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+import timeit
+
+from benchmarkUtils import setup_django
+
+setup_django()
+
+from api_fhir.configurations import Stu3IdentifierConfig
+from api_fhir.converters import BaseFHIRConverter, PersonConverterMixin, LocationConverter, PatientConverter, \
+    PractitionerConverter
+from api_fhir.models import Location, Patient, Practitioner, ContactPointSystem, ContactPointUse, AddressType, \
+    AddressUse
+from api_fhir.tests import LocationTestMixin, PatientTestMixin, PractitionerTestMixin
+from api_fhir.utils import TimeUtils
+
+RECORD_COUNT = 10000
+
+
+class HandCodedConverter(BaseFHIRConverter, PersonConverterMixin):
+    # the field by field conversions of the converters before they were generated from the conversion plans
+
+    @classmethod
+    def build_identifiers(cls, imis_obj, values):
+        identifiers = []
+        cls.build_fhir_uuid_identifier(identifiers, imis_obj)
+        for value, type_code in values:
+            if value is not None:
+                identifiers.append(cls.build_fhir_identifier(value,
+                                                             Stu3IdentifierConfig.get_fhir_identifier_type_system(),
+                                                             type_code))
+        return identifiers
+
+    @classmethod
+    def practitioner_to_fhir(cls, imis_claim_admin):
+        fhir_practitioner = Practitioner()
+        cls.build_fhir_pk(fhir_practitioner, imis_claim_admin.uuid)
+        fhir_practitioner.identifier = cls.build_identifiers(
+            imis_claim_admin, [(imis_claim_admin.code or None, Stu3IdentifierConfig.get_fhir_claim_admin_code_type())])
+        fhir_practitioner.name = [cls.build_fhir_names_for_person(imis_claim_admin)]
+        fhir_practitioner.birthDate = imis_claim_admin.dob.isoformat()
+        fhir_practitioner.telecom = cls.build_fhir_telecom_for_person(phone=imis_claim_admin.phone,
+                                                                      email=imis_claim_admin.email_id)
+        return fhir_practitioner
+
+    @classmethod
+    def practitioner_to_imis(cls, fhir_practitioner, audit_user_id):
+        errors = []
+        imis_claim_admin = PractitionerConverter.create_default_claim_admin(audit_user_id)
+        value = cls.get_fhir_identifier_by_code(fhir_practitioner.identifier,
+                                                Stu3IdentifierConfig.get_fhir_claim_admin_code_type())
+        if value:
+            imis_claim_admin.code = value
+        cls.valid_condition(imis_claim_admin.code is None, 'Missing the claim admin code', errors)
+        imis_claim_admin.last_name, imis_claim_admin.other_names = \
+            cls.build_imis_last_and_other_name(fhir_practitioner.name)
+        if fhir_practitioner.birthDate:
+            imis_claim_admin.dob = TimeUtils.str_to_date(fhir_practitioner.birthDate)
+        imis_claim_admin.phone, imis_claim_admin.email_id = \
+            cls.build_imis_phone_num_and_email(fhir_practitioner.telecom)
+        cls.check_errors(errors)
+        return imis_claim_admin
+
+    @classmethod
+    def location_to_fhir(cls, imis_hf):
+        fhir_location = Location()
+        cls.build_fhir_pk(fhir_location, imis_hf.uuid)
+        identifiers = cls.build_identifiers(imis_hf, [])
+        identifiers.append(cls.build_fhir_identifier(imis_hf.code,
+                                                     Stu3IdentifierConfig.get_fhir_identifier_type_system(),
+                                                     Stu3IdentifierConfig.get_fhir_facility_id_type()))
+        fhir_location.identifier = identifiers
+        fhir_location.name = imis_hf.name
+        hf_level_map = LocationConverter.get_hf_level_map()
+        location_type = hf_level_map.get_fhir_value(imis_hf.level)
+        if location_type is None:
+            location_type = cls.build_constant_codeable_concept("", hf_level_map.system)
+        fhir_location.type = location_type
+        fhir_location.address = cls.build_fhir_address(imis_hf.address, AddressUse.HOME.value,
+                                                       AddressType.PHYSICAL.value)
+        telecom = []
+        for value, system in [(imis_hf.phone, ContactPointSystem.PHONE.value),
+                              (imis_hf.fax, ContactPointSystem.FAX.value),
+                              (imis_hf.email, ContactPointSystem.EMAIL.value)]:
+            if value is not None:
+                telecom.append(cls.build_fhir_contact_point(value, system, ContactPointUse.HOME.value))
+        fhir_location.telecom = telecom
+        return fhir_location
+
+    @classmethod
+    def patient_to_fhir(cls, imis_insuree):
+        fhir_patient = Patient()
+        cls.build_fhir_pk(fhir_patient, imis_insuree.uuid)
+        fhir_patient.name = [cls.build_fhir_names_for_person(imis_insuree)]
+        fhir_patient.identifier = cls.build_identifiers(
+            imis_insuree, [(imis_insuree.chf_id, Stu3IdentifierConfig.get_fhir_chfid_type_code()),
+                           (imis_insuree.passport, Stu3IdentifierConfig.get_fhir_passport_type_code())])
+        fhir_patient.birthDate = imis_insuree.dob.isoformat()
+        PatientConverter.build_fhir_gender(fhir_patient, imis_insuree)
+        if imis_insuree.marital is not None:
+            marital_status = PatientConverter.get_marital_status_map().get_fhir_value(imis_insuree.marital)
+            if marital_status is not None:
+                fhir_patient.maritalStatus = marital_status
+        fhir_patient.telecom = cls.build_fhir_telecom_for_person(phone=imis_insuree.phone, email=imis_insuree.email)
+        addresses = []
+        for value, address_type in [(imis_insuree.current_address, AddressType.PHYSICAL.value),
+                                    (imis_insuree.geolocation, AddressType.BOTH.value)]:
+            if value is not None:
+                addresses.append(cls.build_fhir_address(value, AddressUse.HOME.value, address_type))
+        fhir_patient.address = addresses
+        PatientConverter.build_fhir_extentions(fhir_patient, imis_insuree)
+        return fhir_patient
+
+
+def measure_records(label, func, records, repeat=3):
+    best = min(timeit.repeat(lambda: [func(record) for record in records], number=1, repeat=repeat))
+    print('{:<60} {:>12.0f} records/s'.format(label, len(records) / best))
+    return best
+
+
+def build_records(test_mixin):
+    test_mixin.setUp()
+    records = []
+    for index in range(RECORD_COUNT):
+        record = test_mixin.create_test_imis_instance()
+        record.uuid = '{:08x}-62eb-11ea-bb93-93ec0339a3dd'.format(index)
+        records.append(record)
+    return records
+
+
+def main():
+    for test_mixin, hand_coded, converter in [
+            (PractitionerTestMixin(), HandCodedConverter.practitioner_to_fhir, PractitionerConverter),
+            (LocationTestMixin(), HandCodedConverter.location_to_fhir, LocationConverter),
+            (PatientTestMixin(), HandCodedConverter.patient_to_fhir, PatientConverter)]:
+        records = build_records(test_mixin)
+        resource_type = converter.get_fhir_resource_type().__name__
+        assert hand_coded(records[0]).toDict() == converter.to_fhir_obj(records[0]).toDict()
+        measure_records('to_fhir_obj() of {} {}, hand coded'.format(RECORD_COUNT, resource_type), hand_coded, records)
+        measure_records('to_fhir_obj() of {} {}, conversion plan'.format(RECORD_COUNT, resource_type),
+                        converter.to_fhir_obj, records)
+    fhir_practitioners = [PractitionerConverter.to_fhir_obj(record) for record in build_records(PractitionerTestMixin())]
+    measure_records('to_imis_obj() of {} Practitioner, hand coded'.format(RECORD_COUNT),
+                    lambda fhir_practitioner: HandCodedConverter.practitioner_to_imis(fhir_practitioner, None),
+                    fhir_practitioners)
+    measure_records('to_imis_obj() of {} Practitioner, conversion plan'.format(RECORD_COUNT),
+                    lambda fhir_practitioner: PractitionerConverter.to_imis_obj(fhir_practitioner, None),
+                    fhir_practitioners)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+from benchmarkUtils import setup_django, measure
+
+setup_django()
+
+from api_fhir.models import ClaimResponse, ClaimResponseItem, ClaimResponseItemAdjudication, CodeableConcept, \
+    Coding, Money, fhir_flyweight_cache
+
+
+def build_codeable_concept(code, system=None, text=None):
+    codeable_concept = CodeableConcept()
+    if code or system:
+        coding = Coding()
+        coding.system = system
+        coding.code = str(code)
+        codeable_concept.coding = [coding]
+    codeable_concept.text = text
+    return codeable_concept
+
+
+def build_constant_codeable_concept(code, system=None, text=None):
+    return fhir_flyweight_cache.get((CodeableConcept.__name__, code, system, text),
+                                    lambda: build_codeable_concept(code, system, text))
+
+
+def build_claim_response(concept_builder, item_count=100):
+    # the shape of the `ClaimResponseConverter` items, every item has the adjudication with the configured category
+    claim_response = ClaimResponse(id='1')
+    for sequence in range(item_count):
+        adjudication = ClaimResponseItemAdjudication()
+        adjudication.category = concept_builder(None, None, 'general')
+        adjudication.reason = concept_builder(1, text='passed')
+        adjudication.value = Decimal('2.0')
+        adjudication.amount = Money(value=Decimal('10.50'))
+        claim_response.item.append(ClaimResponseItem(sequenceLinkId=sequence, adjudication=[adjudication]))
+    return claim_response
+
+
+def main():
+    fhir_flyweight_cache.clear()
+    assert build_claim_response(build_codeable_concept).toDict() == \
+        build_claim_response(build_constant_codeable_concept).toDict()
+    measure('build of a 100 items ClaimResponse, new concepts',
+            lambda: build_claim_response(build_codeable_concept), number=100)
+    measure('build of a 100 items ClaimResponse, flyweight concepts',
+            lambda: build_claim_response(build_constant_codeable_concept), number=100)
+    claim_response = build_claim_response(build_codeable_concept)
+    measure('toDict() of a 100 items ClaimResponse, new concepts', claim_response.toDict, number=100)
+    claim_response = build_claim_response(build_constant_codeable_concept)
+    measure('toDict() of a 100 items ClaimResponse, flyweight concepts', claim_response.toDict, number=100)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import inspect
+import json
+
+from benchmarkUtils import setup_django, measure, build_bundle_dict
+
+setup_django()
+
+from api_fhir.models import FHIRBaseObject, FHIRDate, Resource, fhir_type_registry
+
+
+def generic_from_dict(fhir_obj, object_dict):
+    # the reflective `FHIRBaseObject._fromDict()` used before parsers were compiled per model class
+    for attr, obj in object_dict.items():
+        prop, prop_type = fhir_obj._get_property_details_for_name(attr)
+        value = None
+        if inspect.isclass(prop_type) and issubclass(prop_type, Resource):
+            value = generic_from_dict(fhir_type_registry.get(obj.pop('resourceType'))(), obj)
+        elif isinstance(obj, dict):
+            value = generic_from_dict(prop_type(), obj)
+        elif isinstance(obj, list):
+            value = [generic_from_dict(prop_type(), i) if issubclass(prop_type, FHIRBaseObject) else i for i in obj]
+        elif prop_type is FHIRDate:
+            value = obj
+        elif obj is not None:
+            value = prop_type(obj)
+        if value is not None:
+            setattr(fhir_obj, prop.definition.name, value)
+    return fhir_obj
+
+
+def generic_loads(json_string):
+    json_dict = json.loads(json_string)
+    return generic_from_dict(fhir_type_registry.get(json_dict.pop('resourceType'))(), json_dict)
+
+
+def main():
+    for file_name in ['test_patient.json', 'test_claim.json', 'test_claimResponse.json']:
+        bundle_json = json.dumps(build_bundle_dict(file_name, 1000))
+        resource_type = json.loads(bundle_json)['entry'][0]['resource']['resourceType']
+        assert generic_loads(bundle_json).toDict() == FHIRBaseObject.loads(bundle_json, 'json').toDict()
+        measure('loads() of a 1000 {} bundle, generic'.format(resource_type),
+                lambda: generic_loads(bundle_json), number=3)
+        measure('loads() of a 1000 {} bundle, compiled'.format(resource_type),
+                lambda: FHIRBaseObject.loads(bundle_json, 'json'), number=3)
+
+
+if __name__ == '__main__':
+    main()
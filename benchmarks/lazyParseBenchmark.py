@@ -0,0 +1,73 @@
+import json
+import tracemalloc
+
+from benchmarkUtils import setup_django, measure, load_test_json
+
+setup_django()
+
+from api_fhir.models import FHIRBaseObject
+
+
+def read_claim(fhir_claim):
+    # reads the values `ClaimConverter.to_imis_obj()` uses
+    values = [fhir_claim.created, fhir_claim.facility.reference, fhir_claim.patient.reference,
+              fhir_claim.enterer.reference, fhir_claim.billablePeriod.start, fhir_claim.billablePeriod.end,
+              fhir_claim.total.value, fhir_claim.type.text]
+    for identifier in fhir_claim.identifier:
+        values.append(identifier.type.coding[0].code if identifier.type else None)
+        values.append(identifier.value)
+    for diagnosis in fhir_claim.diagnosis:
+        values.append(diagnosis.type[0].text)
+        values.append(diagnosis.diagnosisCodeableConcept.coding[0].code)
+    for information in fhir_claim.information:
+        values.append(information.category.text)
+        values.append(information.valueString)
+    for item in fhir_claim.item:
+        values.extend([item.category.text, item.service.text, item.quantity.value, item.unitPrice.value])
+    return values
+
+
+def read_patient(fhir_patient):
+    # reads the values `PatientConverter.to_imis_obj()` uses
+    values = [fhir_patient.birthDate, fhir_patient.gender, fhir_patient.maritalStatus.text]
+    for name in fhir_patient.name:
+        values.extend([name.use, name.family, name.given])
+    for identifier in fhir_patient.identifier:
+        values.append(identifier.value)
+    for telecom in fhir_patient.telecom:
+        values.append(telecom.value)
+    for address in fhir_patient.address:
+        values.append(address.text)
+    return values
+
+
+def parse_and_read(json_string, read, lazy):
+    return read(FHIRBaseObject.fromDict(json.loads(json_string), lazy=lazy))
+
+
+def measure_allocated(label, func, count=100):
+    tracemalloc.start()
+    for _ in range(count):
+        func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('{:<60} {:>12.0f} bytes'.format(label, peak))
+
+
+def main():
+    for file_name, read in [('test_claim.json', read_claim), ('test_patient.json', read_patient)]:
+        json_string = load_test_json(file_name)
+        resource_type = json.loads(json_string)['resourceType']
+        assert parse_and_read(json_string, read, False) == parse_and_read(json_string, read, True)
+        for lazy in [False, True]:
+            mode = 'lazy' if lazy else 'eager'
+            measure('parse {} and read the converted values, {}'.format(resource_type, mode),
+                    lambda: parse_and_read(json_string, read, lazy))
+            measure('parse {}, {}'.format(resource_type, mode),
+                    lambda: FHIRBaseObject.fromDict(json.loads(json_string), lazy=lazy))
+            measure_allocated('peak memory of parse {}, {}'.format(resource_type, mode),
+                              lambda: FHIRBaseObject.fromDict(json.loads(json_string), lazy=lazy))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import tracemalloc
+
+from benchmarkUtils import setup_django, load_test_json, build_bundle_json
+
+setup_django()
+
+from api_fhir.models import FHIRBaseObject
+
+
+def measure_memory(label, func, count=100):
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    objects = [func() for _ in range(count)]
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in snapshot_after.compare_to(snapshot_before, 'filename'))
+    print('{:<60} {:>12.0f} bytes'.format(label, allocated / count))
+    return objects
+
+
+def load_and_serialize(resource_json):
+    fhir_obj = FHIRBaseObject.loads(resource_json, 'json')
+    fhir_obj.toDict()
+    return fhir_obj
+
+
+def main():
+    for file_name in ['test_patient.json', 'test_claim.json', 'test_claimResponse.json']:
+        resource_json = load_test_json(file_name)
+        fhir_obj = FHIRBaseObject.loads(resource_json, 'json')
+        measure_memory('{} loaded from JSON'.format(type(fhir_obj).__name__),
+                       lambda: FHIRBaseObject.loads(resource_json, 'json'))
+        measure_memory('{} loaded from JSON after toDict()'.format(type(fhir_obj).__name__),
+                       lambda: load_and_serialize(resource_json))
+
+    bundle_json = build_bundle_json('test_claim.json', 100)
+    measure_memory('Bundle of 100 Claims loaded from JSON',
+                   lambda: FHIRBaseObject.loads(bundle_json, 'json'), count=5)
+
+
+if __name__ == '__main__':
+    main()
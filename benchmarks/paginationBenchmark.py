@@ -0,0 +1,51 @@
+from benchmarkUtils import setup_django, measure
+
+setup_django()
+
+from insuree.models import Insuree
+from rest_framework.pagination import Cursor
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api_fhir.paginations import FhirBundleResultsSetPagination, FhirBundleCursorPagination
+
+PAGE_SIZE = 10
+URL = 'http://localhost/api_fhir/Patient/'
+
+
+def build_request(query):
+    return Request(APIRequestFactory().get(URL + query))
+
+
+def build_cursor(queryset, offset):
+    # the cursor of the page starting at `offset`, like the `next` link of the page before it
+    cursor_pagination = FhirBundleCursorPagination()
+    cursor_pagination.base_url = URL
+    position = queryset.order_by('id').values_list('id', flat=True)[offset - 1]
+    next_link = cursor_pagination.encode_cursor(Cursor(offset=0, reverse=False, position=str(position)))
+    return next_link.split('_cursor=')[1]
+
+
+def fetch_page(queryset, request):
+    pagination = FhirBundleResultsSetPagination()
+    page = pagination.paginate_queryset(queryset, request)
+    pagination.get_next_link()
+    return page
+
+
+def main():
+    queryset = Insuree.objects.all()
+    count = queryset.count()
+    for offset in [PAGE_SIZE, 1000, 10000, 100000, 500000]:
+        if offset >= count:
+            break
+        page_request = build_request('?page-offset={}&_count={}'.format(offset // PAGE_SIZE + 1, PAGE_SIZE))
+        cursor_request = build_request('?_cursor={}&_count={}'.format(build_cursor(queryset, offset), PAGE_SIZE))
+        measure('page of {} Patient at offset {}, page-offset'.format(PAGE_SIZE, offset),
+                lambda: fetch_page(queryset, page_request), number=10)
+        measure('page of {} Patient at offset {}, cursor'.format(PAGE_SIZE, offset),
+                lambda: fetch_page(queryset, cursor_request), number=10)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+from benchmarkUtils import setup_django, measure, build_bundle_json
+
+setup_django()
+
+from api_fhir.models import FHIRBaseObject, Patient, Property
+
+
+def get_properties_by_dir_scan(cls):
+    # the lookup done by `FHIRBaseObject._get_properties()` before the per-class registry was introduced
+    properties_names = []
+    for attr in dir(cls):
+        attribute = getattr(cls, attr)
+        if isinstance(attribute, Property):
+            properties_names.append(attribute.definition.name)
+    return properties_names
+
+
+def main():
+    measure('Patient properties, dir() scan', lambda: get_properties_by_dir_scan(Patient))
+    measure('Patient properties, registry', Patient._get_properties)
+    measure('Patient attribute validation, dir() scan', lambda: 'gender' in get_properties_by_dir_scan(Patient))
+    measure('Patient attribute validation, registry', lambda: Patient.valid_fhir_attribute('gender'))
+
+    bundle_json = build_bundle_json('test_patient.json', 100)
+    measure('loads() of a 100 Patient bundle', lambda: FHIRBaseObject.loads(bundle_json, 'json'), number=10)
+    bundle = FHIRBaseObject.loads(bundle_json, 'json')
+    measure('toDict() of a 100 Patient bundle', bundle.toDict, number=10)
+
+
+if __name__ == '__main__':
+    main()
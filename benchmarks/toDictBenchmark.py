@@ -0,0 +1,39 @@
+from benchmarkUtils import setup_django, measure, build_bundle_json
+
+setup_django()
+
+from api_fhir.models import FHIRBaseObject, PropertyList, Resource
+
+
+def generic_to_dict(fhir_obj):
+    # the reflective `FHIRBaseObject.toDict()` used before serializers were generated per model class
+    retval = dict()
+    if isinstance(fhir_obj, Resource):
+        retval['resourceType'] = fhir_obj.__class__.__name__
+    for attr in fhir_obj._get_properties():
+        value = getattr(fhir_obj, attr)
+        if isinstance(value, FHIRBaseObject):
+            json_dict = generic_to_dict(value)
+            if json_dict:
+                retval[attr] = json_dict
+        elif isinstance(value, PropertyList):
+            results = [generic_to_dict(v) if isinstance(v, FHIRBaseObject) else v for v in value]
+            if results:
+                retval[attr] = results
+        elif value is not None:
+            retval[attr] = value
+    return retval
+
+
+def main():
+    for file_name in ['test_patient.json', 'test_claim.json', 'test_claimResponse.json']:
+        bundle = FHIRBaseObject.loads(build_bundle_json(file_name, 1000), 'json')
+        resource_type = bundle.entry[0].resource.__class__.__name__
+        assert generic_to_dict(bundle) == bundle.toDict()
+        measure('toDict() of a 1000 {} bundle, generic'.format(resource_type),
+                lambda: generic_to_dict(bundle), number=3)
+        measure('toDict() of a 1000 {} bundle, generated'.format(resource_type), bundle.toDict, number=3)
+
+
+if __name__ == '__main__':
+    main()
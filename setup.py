@@ -29,6 +29,9 @@ setup(
         'openimis-be-claim',
         'openimis-be-policy'
     ],
+    extras_require={
+        'orjson': ['orjson'],
+    },
     classifiers=[
         'Environment :: Web Environment',
         'Framework :: Django',